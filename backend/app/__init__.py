@@ -1,7 +1,7 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from app.extensions import mongo
+from app.extensions import mongo, mongo_manager
 
 def create_app():
     app = Flask(__name__)
@@ -60,7 +60,7 @@ def create_app():
 
     # ---- Initialize MongoDB ----
     try:
-        mongo.init_app(app)
+        mongo_manager.init_app(app)
         print(f"MongoDB initialized with URI: {app.config.get('MONGO_URI', 'default')}")
     except Exception as e:
         print(f"Warning: MongoDB initialization failed: {str(e)}")
@@ -69,9 +69,25 @@ def create_app():
     else:
         app.config["DB_AVAILABLE"] = True
 
+    # ---- Ensure MongoDB indexes ----
+    if app.config["DB_AVAILABLE"] and app.config.get("MONGO_AUTO_INDEX", True):
+        try:
+            from app.models.indexes import build_index_registry, ensure_indexes
+            ensure_indexes(mongo.db, build_index_registry(app.config))
+        except Exception as e:
+            print(f"Warning: MongoDB index creation failed: {str(e)}")
+
     # ---- JWT ----
     JWTManager(app)
 
+    # ---- Request latency metrics (served at /metrics) ----
+    from app.utils.metrics import init_metrics
+    init_metrics(app)
+
+    # ---- On-demand sampling profiler (admin only, see /api/admin/profiler) ----
+    from app.utils.profiler import init_profiler
+    init_profiler(app)
+
     # ---- Register routes ----
     try:
         from app.routes import register_routes
@@ -82,11 +98,15 @@ def create_app():
         from app.routes.ping_routes import ping_bp
         from app.routes.stock_routes import stock_bp
         from app.routes.predict_routes import predict_bp
+        from app.routes.metrics_routes import metrics_bp
+        from app.routes.profiler_routes import profiler_bp
 
         app.register_blueprint(auth_bp, url_prefix="/api/auth")
         app.register_blueprint(news_bp, url_prefix="/api/news")
         app.register_blueprint(ping_bp, url_prefix="/api")
         app.register_blueprint(stock_bp, url_prefix="/api/stocks")
         app.register_blueprint(predict_bp, url_prefix="/api/predict")
+        app.register_blueprint(metrics_bp)
+        app.register_blueprint(profiler_bp, url_prefix="/api/admin/profiler")
 
     return app
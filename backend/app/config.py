@@ -12,5 +12,100 @@ class Config:
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
     TESTING = False
     
+    # Defer heavy libraries (pandas, yfinance, matplotlib, selenium, ...) to first use
+    LAZY_IMPORTS = os.getenv("LAZY_IMPORTS", "True").lower() == "true"
+    
+    # Background warm-up after boot (news scrape only runs when stale)
+    STARTUP_WARMUP_ENABLED = os.getenv("STARTUP_WARMUP_ENABLED", "True").lower() == "true"
+    NEWS_STALE_AFTER_HOURS = float(os.getenv("NEWS_STALE_AFTER_HOURS", 5))
+    
+    # Cluster-wide job coordination (lease lock + run history in MongoDB)
+    JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 900))
+    JOB_MISFIRE_GRACE_SECONDS = int(os.getenv("JOB_MISFIRE_GRACE_SECONDS", 600))
+    JOB_HISTORY_TTL_DAYS = int(os.getenv("JOB_HISTORY_TTL_DAYS", 30))
+    
+    # Daily scrape -> detect -> publish pipeline
+    PIPELINE_STAGE_RETRIES = int(os.getenv("PIPELINE_STAGE_RETRIES", 1))
+    PIPELINE_RETRY_DELAY_SECONDS = int(os.getenv("PIPELINE_RETRY_DELAY_SECONDS", 60))
+    
+    # CPU-bound detector features and chart rendering run in this many processes (0 = inline).
+    # Every gunicorn worker starts its own pool, so keep workers x PROCESS_POOL_WORKERS
+    # within the cores left after the web workers. Scans download bars with SCAN_FETCH_WORKERS threads.
+    PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", 2))
+    PROCESS_POOL_START_METHOD = os.getenv("PROCESS_POOL_START_METHOD", "forkserver")
+    SCAN_FETCH_WORKERS = int(os.getenv("SCAN_FETCH_WORKERS", 8))
+    
+    # Local OHLCV store (one CSV per symbol) used by backtests and the universe screener
+    PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR")
+    
+    # Where the daily scan gets its candidates: "universe" screens the local price store, "chartink" scrapes
+    SCREENER_SOURCE = os.getenv("SCREENER_SOURCE", "universe")
+    
+    # IPO listing dates (ipo_registry collection, loaded with load_ipo_registry.py); the CSV backs offline runs
+    IPO_REGISTRY_CSV = os.getenv("IPO_REGISTRY_CSV")
+    IPO_REGISTRY_CACHE_SECONDS = int(os.getenv("IPO_REGISTRY_CACHE_SECONDS", 3600))
+    
+    # Prometheus-style /metrics (optional bearer token for the scraper)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    
+    # News ingestion: sources fetched concurrently (comma separated names, empty = all)
+    NEWS_SOURCES = [name.strip() for name in os.getenv("NEWS_SOURCES", "").split(",") if name.strip()]
+    NEWS_FETCH_TIMEOUT_SECONDS = float(os.getenv("NEWS_FETCH_TIMEOUT_SECONDS", 10))
+    NEWS_MAX_ITEMS_PER_SOURCE = int(os.getenv("NEWS_MAX_ITEMS_PER_SOURCE", 20))
+    NEWS_DEDUPE_DAYS = int(os.getenv("NEWS_DEDUPE_DAYS", 3))
+    NEWS_TTL_DAYS = int(os.getenv("NEWS_TTL_DAYS", 14))
+    NEWS_FEED_LIMIT = int(os.getenv("NEWS_FEED_LIMIT", 50))
+    
+    # Headline sentiment scorer: "textblob" or "lexicon" (built-in finance lexicon, no extra dependency)
+    SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "textblob")
+    # Headline sentiment cache (entries unused for this long are evicted)
+    SENTIMENT_CACHE_TTL_DAYS = int(os.getenv("SENTIMENT_CACHE_TTL_DAYS", 30))
+    
+    # Admin-only endpoints (comma separated account emails)
+    ADMIN_EMAILS = [email for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()]
+    
+    # On-demand sampling profiler (admin only, sessions end on their own)
+    PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "True").lower() == "true"
+    PROFILER_MAX_SECONDS = int(os.getenv("PROFILER_MAX_SECONDS", 120))
+    PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", 10))
+    PROFILER_MAX_REQUESTS = int(os.getenv("PROFILER_MAX_REQUESTS", 50))
+    
+    # MongoDB connection pool (one shared client per process)
+    MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 20))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 10000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 30000))
+    MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+    
+    # MongoDB index management
+    MONGO_AUTO_INDEX = os.getenv("MONGO_AUTO_INDEX", "True").lower() == "true"
+    STOCK_ANALYSIS_TTL_SECONDS = int(os.getenv("STOCK_ANALYSIS_TTL_SECONDS", 24 * 60 * 60))
+    # Report generations running at once (shared by all requests) and the watchlist batch size
+    REPORT_GENERATION_CONCURRENCY = int(os.getenv("REPORT_GENERATION_CONCURRENCY", 4))
+    BATCH_ANALYZE_MAX_SYMBOLS = int(os.getenv("BATCH_ANALYZE_MAX_SYMBOLS", 25))
+    
+    # Report warming: rank symbols by recent requests and watchlists, then
+    # regenerate the top ones before market open and after the close
+    REPORT_DEMAND_DAYS = int(os.getenv("REPORT_DEMAND_DAYS", 14))
+    REPORT_DEMAND_FLUSH_SECONDS = int(os.getenv("REPORT_DEMAND_FLUSH_SECONDS", 30))
+    WATCHLIST_MAX_SYMBOLS = int(os.getenv("WATCHLIST_MAX_SYMBOLS", 50))
+    WATCHLIST_FOLLOWER_WEIGHT = int(os.getenv("WATCHLIST_FOLLOWER_WEIGHT", 5))
+    REPORT_WARM_TOP_K = int(os.getenv("REPORT_WARM_TOP_K", 50))
+    REPORT_WARM_BUDGET_SECONDS = int(os.getenv("REPORT_WARM_BUDGET_SECONDS", 1200))
+    REPORT_WARM_WORKERS = int(os.getenv("REPORT_WARM_WORKERS", 2))
+    REPORT_WARM_PRE_OPEN = os.getenv("REPORT_WARM_PRE_OPEN", "08:30")
+    REPORT_WARM_POST_CLOSE = os.getenv("REPORT_WARM_POST_CLOSE", "16:00")
+    MARKET_CLOSE_TIME = os.getenv("MARKET_CLOSE_TIME", "15:30")
+    POPULAR_STOCKS_CACHE_SECONDS = int(os.getenv("POPULAR_STOCKS_CACHE_SECONDS", 300))
+    
+    # Fundamentals store: statements are refetched a day after the next expected
+    # results (quarter end + reporting lag) and at least every max-age days
+    FUNDAMENTALS_REPORTING_LAG_DAYS = int(os.getenv("FUNDAMENTALS_REPORTING_LAG_DAYS", 45))
+    FUNDAMENTALS_MAX_AGE_DAYS = int(os.getenv("FUNDAMENTALS_MAX_AGE_DAYS", 30))
+    
     # CORS settings for production
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "https://stocksensor.vercel.app").split(",")
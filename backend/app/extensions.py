@@ -1,5 +1,7 @@
 from flask_pymongo import PyMongo
 from flask_jwt_extended import JWTManager
+from app.utils.mongo_utils import MongoConnectionManager
 
 mongo = PyMongo()
+mongo_manager = MongoConnectionManager(mongo)
 jwt = JWTManager()
\ No newline at end of file
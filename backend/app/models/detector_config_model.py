@@ -0,0 +1,175 @@
+from datetime import datetime
+import math
+from typing import Dict, Any, List, Optional
+from pymongo.errors import DuplicateKeyError
+from app.extensions import mongo_manager
+import logging
+
+logger = logging.getLogger(__name__)
+
+DETECTOR_CONFIGS = "detector_configs"
+DEFAULT_CONFIG_NAME = "default"
+
+# Thresholds the detectors shipped with; a stored config overrides any subset
+DEFAULT_DETECTOR_PARAMS = {
+    "vcp": {
+        "min_contraction_percentage": 15,  # Minimum contraction required
+        "min_volume_contraction": 20,      # Minimum volume contraction
+        "min_pattern_length": 20,          # Minimum days for pattern
+        "max_pattern_length": 65,          # Maximum days for pattern
+        "max_atr_change": -10,             # ATR change over 20 days must be below this
+        "min_rsi": 40
+    },
+    "ipo_base": {
+        "max_weeks_post_ipo": 12,
+        "min_base_weeks": 3,
+        "max_base_weeks": 12,
+        "max_depth_percent": 25,
+        "volume_surge_threshold": 1.4,
+        "min_confidence": 70
+    }
+}
+
+
+def coerce_params(pattern: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check threshold overrides against DEFAULT_DETECTOR_PARAMS: names must be
+    known and values numbers of the same kind as the default (numeric strings
+    are converted). Raises ValueError.
+    """
+    if not isinstance(params, dict):
+        raise ValueError("params must be an object")
+    unknown = set(params) - set(DEFAULT_DETECTOR_PARAMS[pattern])
+    if unknown:
+        raise ValueError(f"Unknown {pattern} parameters: {', '.join(sorted(unknown))}")
+
+    coerced = {}
+    for name, value in params.items():
+        default = DEFAULT_DETECTOR_PARAMS[pattern][name]
+        try:
+            if isinstance(value, bool):
+                raise ValueError
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{pattern} parameter {name} must be a number, got {value!r}")
+        if not math.isfinite(number):
+            raise ValueError(f"{pattern} parameter {name} must be finite")
+        if isinstance(default, int):
+            if not number.is_integer():
+                raise ValueError(f"{pattern} parameter {name} must be a whole number, got {value!r}")
+            number = int(number)
+        coerced[name] = number
+    return coerced
+
+
+class DetectorConfig:
+    """A named, versioned set of detector thresholds"""
+
+    def __init__(self, pattern: str, name: str, params: Dict[str, Any], version: int = 0,
+                 is_default: bool = False, active: bool = True, description: str = "",
+                 created_at: Optional[datetime] = None):
+        self.pattern = pattern
+        self.name = name
+        # Stored configs may only override some thresholds
+        self.params = {**DEFAULT_DETECTOR_PARAMS[pattern], **params}
+        self.version = version
+        self.is_default = is_default
+        self.active = active
+        self.description = description
+        self.created_at = created_at or datetime.utcnow()
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@v{self.version}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pattern": self.pattern,
+            "name": self.name,
+            "version": self.version,
+            "params": self.params,
+            "is_default": self.is_default,
+            "active": self.active,
+            "description": self.description,
+            "created_at": self.created_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DetectorConfig':
+        return cls(
+            pattern=data["pattern"],
+            name=data["name"],
+            params=data.get("params", {}),
+            version=data.get("version", 0),
+            is_default=data.get("is_default", False),
+            active=data.get("active", True),
+            description=data.get("description", ""),
+            created_at=data.get("created_at")
+        )
+
+    @classmethod
+    def builtin(cls, pattern: str) -> 'DetectorConfig':
+        return cls(pattern, DEFAULT_CONFIG_NAME, {}, version=0, is_default=True,
+                   description="Built-in thresholds")
+
+
+class DetectorConfigModel:
+    @staticmethod
+    def get_collection():
+        return mongo_manager.get_collection(DETECTOR_CONFIGS)
+
+    @staticmethod
+    def get_active(pattern: str) -> List[DetectorConfig]:
+        """
+        Latest version of every active config for a pattern, default first.
+        Falls back to the built-in thresholds when no default is stored.
+        """
+        latest = {}
+        try:
+            for doc in DetectorConfigModel.get_collection().find({"pattern": pattern}).sort("version", -1):
+                latest.setdefault(doc["name"], doc)
+        except Exception as e:
+            logger.error(f"Error loading {pattern} detector configs, using built-in thresholds: {str(e)}")
+
+        configs = [DetectorConfig.from_dict(doc) for doc in latest.values() if doc.get("active", True)]
+        defaults = [c for c in configs if c.is_default]
+        # A stored non-default "default" (saved before the name was reserved) would clash with the builtin
+        others = sorted((c for c in configs if not c.is_default and c.name != DEFAULT_CONFIG_NAME),
+                        key=lambda c: c.name)
+        return (defaults[:1] or [DetectorConfig.builtin(pattern)]) + others
+
+    @staticmethod
+    def list_configs(pattern: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Every stored version, newest first"""
+        query = {"pattern": pattern} if pattern else {}
+        return list(DetectorConfigModel.get_collection().find(query, {"_id": 0})
+                    .sort([("pattern", 1), ("name", 1), ("version", -1)]))
+
+    @staticmethod
+    def save(pattern: str, name: str, params: Dict[str, Any], is_default: bool = False,
+             active: bool = True, description: str = "") -> DetectorConfig:
+        """Store a new version of a config; earlier versions are kept for history"""
+        if pattern not in DEFAULT_DETECTOR_PARAMS:
+            raise ValueError(f"Unknown pattern: {pattern}")
+        if name == DEFAULT_CONFIG_NAME:
+            # Reserved for the built-in thresholds; results are keyed by config name
+            raise ValueError(f"'{DEFAULT_CONFIG_NAME}' is reserved for the built-in thresholds, "
+                             f"save under another name with is_default to replace them")
+        params = coerce_params(pattern, params)
+
+        collection = DetectorConfigModel.get_collection()
+        latest = collection.find_one({"pattern": pattern, "name": name}, sort=[("version", -1)])
+        config = DetectorConfig(pattern, name, params,
+                                version=(latest["version"] + 1) if latest else 1,
+                                is_default=is_default, active=active, description=description)
+        try:
+            collection.insert_one(config.to_dict())
+        except DuplicateKeyError:
+            raise ValueError(f"Config {pattern}/{name} was updated concurrently, retry")
+
+        if is_default:
+            # Only one default per pattern
+            collection.update_many({"pattern": pattern, "is_default": True, "name": {"$ne": name}},
+                                   {"$set": {"is_default": False}})
+        logger.info(f"Saved detector config {pattern}/{config.key}")
+        return config
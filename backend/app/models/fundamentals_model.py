@@ -0,0 +1,49 @@
+from datetime import datetime
+import logging
+from app.extensions import mongo_manager
+
+logger = logging.getLogger(__name__)
+
+FUNDAMENTALS = "fundamentals"
+
+# Statement fields kept per symbol: stored name -> (statement, yfinance row label)
+FUNDAMENTAL_FIELDS = {
+    "revenue": ("financials", "Total Revenue"),
+    "net_income": ("financials", "Net Income"),
+    "total_equity": ("balance_sheet", "Total Equity Gross Minority Interest"),
+    "total_debt": ("balance_sheet", "Total Debt"),
+    "current_assets": ("balance_sheet", "Current Assets"),
+    "current_liabilities": ("balance_sheet", "Current Liabilities"),
+}
+
+
+class FundamentalsModel:
+    """
+    Latest statement figures per symbol (_id is the NSE symbol, TCS.NS),
+    with the time after which they should be fetched again
+    (``refresh_after``). Missing figures are stored as None.
+    """
+
+    @staticmethod
+    def get_collection():
+        return mongo_manager.get_collection(FUNDAMENTALS)
+
+    @classmethod
+    def get(cls, symbol):
+        return cls.get_collection().find_one({"_id": symbol.upper()})
+
+    @classmethod
+    def save(cls, symbol, values, period_end, next_report_date, refresh_after):
+        doc = {
+            **values,
+            "period_end": period_end,
+            "next_report_date": next_report_date,
+            "refresh_after": refresh_after,
+            "fetched_at": datetime.utcnow()
+        }
+        cls.get_collection().update_one({"_id": symbol.upper()}, {"$set": doc}, upsert=True)
+        return {"_id": symbol.upper(), **doc}
+
+    @classmethod
+    def postpone(cls, symbol, refresh_after):
+        cls.get_collection().update_one({"_id": symbol.upper()}, {"$set": {"refresh_after": refresh_after}})
@@ -0,0 +1,220 @@
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure, ConnectionFailure
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Error codes returned when an index with the same name/keys already exists
+# with different options (e.g. a changed TTL). These are reported, not fatal.
+INDEX_CONFLICT_CODES = (85, 86)
+DUPLICATE_KEY_CODE = 11000
+
+
+class IndexSpec:
+    """Declarative description of a single MongoDB index"""
+
+    def __init__(self, collection, keys, name, **options):
+        self.collection = collection
+        self.keys = keys
+        self.name = name
+        self.options = options
+
+    def to_dict(self):
+        return {
+            "collection": self.collection,
+            "keys": self.keys,
+            "name": self.name,
+            "options": self.options
+        }
+
+
+class QueryPlanCheck:
+    """A hot query whose plan is verified by the index check mode"""
+
+    def __init__(self, collection, filter, sort=None, description=""):
+        self.collection = collection
+        self.filter = filter
+        self.sort = sort
+        self.description = description
+
+
+def build_index_registry(config=None):
+    """Return the list of indexes the application relies on"""
+    config = config or {}
+    analysis_ttl = int(config.get("STOCK_ANALYSIS_TTL_SECONDS", 24 * 60 * 60))
+    job_history_ttl = int(config.get("JOB_HISTORY_TTL_DAYS", 30)) * 24 * 60 * 60
+    sentiment_cache_ttl = int(config.get("SENTIMENT_CACHE_TTL_DAYS", 30)) * 24 * 60 * 60
+    news_ttl = int(config.get("NEWS_TTL_DAYS", 14)) * 24 * 60 * 60
+    report_demand_ttl = int(config.get("REPORT_DEMAND_DAYS", 14)) * 24 * 60 * 60
+
+    return [
+        # Report cache: latest analysis per symbol. The TTL index replaces the
+        # old cleanup_old_analyses Celery task.
+        IndexSpec("stock_analyses", [("symbol", ASCENDING), ("created_at", DESCENDING)],
+                  "symbol_created_at"),
+        IndexSpec("stock_analyses", [("created_at", ASCENDING)],
+                  "created_at_ttl", expireAfterSeconds=analysis_ttl),
+
+        # Report requests per symbol-day, ranked over (and kept for) REPORT_DEMAND_DAYS
+        IndexSpec("report_demand", [("day", ASCENDING)],
+                  "day_ttl", expireAfterSeconds=report_demand_ttl),
+
+        # Auth
+        IndexSpec("users", [("email", ASCENDING)], "email_unique", unique=True),
+
+        # News feed: one document per canonical URL, kept for NEWS_TTL_DAYS
+        IndexSpec("news", [("created_at", DESCENDING)], "created_at_desc"),
+        IndexSpec("news", [("url_key", ASCENDING)], "url_key_unique", unique=True,
+                  partialFilterExpression={"url_key": {"$exists": True}}),
+        IndexSpec("news", [("created_at", ASCENDING)], "created_at_ttl", expireAfterSeconds=news_ttl),
+        # Headline sentiment memo; entries not seen for the TTL are evicted
+        IndexSpec("sentiment_cache", [("last_used_at", ASCENDING)],
+                  "last_used_at_ttl", expireAfterSeconds=sentiment_cache_ttl),
+
+        # Pattern detection samples and results
+        IndexSpec("VCP_sample", [("symbol", ASCENDING)], "symbol"),
+        IndexSpec("IPO_Base_sample", [("symbol", ASCENDING)], "symbol"),
+        IndexSpec("VCP_results", [("symbol", ASCENDING)], "symbol"),
+        IndexSpec("VCP_results", [("is_detected", ASCENDING)], "is_detected"),
+        IndexSpec("IPO_Base_results", [("symbol", ASCENDING)], "symbol"),
+        IndexSpec("IPO_Base_results", [("is_detected", ASCENDING)], "is_detected"),
+        # Detector configs (one document per version) and their screen results
+        IndexSpec("detector_configs", [("pattern", ASCENDING), ("name", ASCENDING), ("version", DESCENDING)],
+                  "pattern_name_version_unique", unique=True),
+        IndexSpec("pattern_screen_results", [("pattern", ASCENDING), ("config", ASCENDING), ("symbol", ASCENDING)],
+                  "pattern_config_symbol_unique", unique=True),
+        IndexSpec("pattern_screen_results", [("pattern", ASCENDING), ("config", ASCENDING), ("is_detected", ASCENDING)],
+                  "pattern_config_is_detected"),
+        # Incremental scans load every fingerprint of one scan at once
+        IndexSpec("scan_fingerprints", [("scan", ASCENDING)], "scan"),
+
+        # Scheduled job coordination: one run per job firing, bounded history
+        IndexSpec("job_runs", [("job_id", ASCENDING), ("slot", ASCENDING)],
+                  "job_slot_unique", unique=True),
+        IndexSpec("job_runs", [("job_id", ASCENDING), ("state", ASCENDING), ("started_at", DESCENDING)],
+                  "job_state_started_at"),
+        IndexSpec("job_runs", [("started_at", ASCENDING)],
+                  "started_at_ttl", expireAfterSeconds=job_history_ttl),
+        IndexSpec("pipeline_runs", [("started_at", ASCENDING)],
+                  "started_at_ttl", expireAfterSeconds=job_history_ttl),
+    ]
+
+
+def build_query_plan_checks():
+    """Return the hot queries that must be served by an index"""
+    return [
+        QueryPlanCheck("stock_analyses", {"symbol": "TCS.NS"}, [("created_at", -1)],
+                       "StockAnalysisService.get_cached_analysis"),
+        QueryPlanCheck("users", {"email": "user@example.com"},
+                       description="auth_service.login_user"),
+        QueryPlanCheck("news", {}, [("created_at", -1)],
+                       "NewsModel.get_all_news"),
+        QueryPlanCheck("VCP_results", {"is_detected": "Yes"},
+                       description="PredictService.get_vcp_results"),
+        QueryPlanCheck("IPO_Base_results", {"is_detected": "Yes"},
+                       description="PredictService.get_ipo_results"),
+        QueryPlanCheck("VCP_sample", {"symbol": "TCS"},
+                       description="PredictService.run_vcp_analysis"),
+        QueryPlanCheck("IPO_Base_sample", {"symbol": "TCS"},
+                       description="PredictService.run_ipo_analysis"),
+        QueryPlanCheck("detector_configs", {"pattern": "vcp"}, [("version", -1)],
+                       description="DetectorConfigModel.get_active"),
+        QueryPlanCheck("pattern_screen_results", {"pattern": "vcp", "config": "aggressive", "is_detected": "Yes"},
+                       description="PredictService.get_screen_results"),
+        QueryPlanCheck("scan_fingerprints", {"scan": "vcp"},
+                       description="ScanFingerprints"),
+    ]
+
+
+def ensure_indexes(db, specs=None):
+    """
+    Create every registered index. Safe to call on every startup: existing
+    indexes with identical definitions are a no-op on the server.
+    Returns a summary dict with created and failed index names.
+    """
+    if db is None:
+        logger.error("Cannot ensure indexes: MongoDB connection not established")
+        return {"success": False, "created": [], "failed": []}
+
+    specs = specs if specs is not None else build_index_registry()
+    created, failed = [], []
+
+    for position, spec in enumerate(specs):
+        label = f"{spec.collection}.{spec.name}"
+        try:
+            db[spec.collection].create_index(spec.keys, name=spec.name, **spec.options)
+            created.append(label)
+        except ConnectionFailure as e:
+            # Server unreachable: every remaining index would wait out the
+            # same selection timeout, so give up for this startup.
+            logger.error(f"Cannot ensure indexes, MongoDB unreachable: {str(e)}")
+            failed.extend(f"{s.collection}.{s.name}" for s in specs[position:])
+            break
+        except OperationFailure as e:
+            if e.code in INDEX_CONFLICT_CODES:
+                logger.warning(f"Index {label} exists with different options, drop it to apply the new definition: {e}")
+            elif e.code == DUPLICATE_KEY_CODE:
+                logger.warning(f"Index {label} not created, existing documents violate uniqueness: {e}")
+            else:
+                logger.error(f"Error creating index {label}: {e}")
+            failed.append(label)
+        except Exception as e:
+            logger.error(f"Error creating index {label}: {str(e)}")
+            failed.append(label)
+
+    logger.info(f"Ensured {len(created)} MongoDB indexes ({len(failed)} failed)")
+    return {"success": not failed, "created": created, "failed": failed}
+
+
+def _collect_stages(plan):
+    """Flatten the stage names of an explain() plan tree"""
+    stages = []
+    if not isinstance(plan, dict):
+        return stages
+    if "stage" in plan:
+        stages.append(plan["stage"])
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages.extend(_collect_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_collect_stages(child))
+    return stages
+
+
+def check_query_plans(db, checks=None):
+    """
+    Run explain() for every registered hot query and report the ones whose
+    winning plan still contains a collection scan.
+    """
+    if db is None:
+        logger.error("Cannot check query plans: MongoDB connection not established")
+        return []
+
+    checks = checks if checks is not None else build_query_plan_checks()
+    report = []
+
+    for check in checks:
+        try:
+            cursor = db[check.collection].find(check.filter)
+            if check.sort:
+                cursor = cursor.sort(check.sort)
+            explain = cursor.explain()
+            winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+            stages = _collect_stages(winning_plan)
+            report.append({
+                "collection": check.collection,
+                "query": check.description,
+                "stages": stages,
+                "collscan": "COLLSCAN" in stages
+            })
+        except Exception as e:
+            logger.error(f"Error explaining query on {check.collection}: {str(e)}")
+            report.append({
+                "collection": check.collection,
+                "query": check.description,
+                "stages": [],
+                "collscan": None,
+                "error": str(e)
+            })
+
+    return report
@@ -0,0 +1,141 @@
+from datetime import datetime
+import csv
+import os
+import time
+import threading
+import logging
+from pymongo import UpdateOne
+from app.config import Config
+from app.extensions import mongo_manager
+
+logger = logging.getLogger(__name__)
+
+IPO_REGISTRY = "ipo_registry"
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_IPO_REGISTRY_CSV = os.path.join(BACKEND_DIR, "data", "ipo_listings.csv")
+
+# Header spellings accepted for each field (our own CSV, NSE's EQUITY_L.csv, IPO trackers)
+CSV_FIELDS = {
+    "symbol": ("SYMBOL", "TICKER", "NSE SYMBOL"),
+    "listing_date": ("LISTING_DATE", "LISTING DATE", "DATE OF LISTING", "LISTED ON"),
+    "name": ("NAME", "NAME OF COMPANY", "COMPANY NAME", "COMPANY"),
+    "issue_price": ("ISSUE_PRICE", "ISSUE PRICE", "OFFER PRICE"),
+}
+DATE_FORMATS = ("%Y-%m-%d", "%d-%b-%Y", "%d-%m-%Y", "%d/%m/%Y", "%d %b %Y", "%b %d, %Y")
+
+
+def parse_listing_date(text):
+    text = (text or "").strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized listing date '{text}'")
+
+
+def read_listing_csv(path):
+    """Registry records from a CSV with at least a symbol and a listing date column"""
+    records, skipped = [], 0
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        reader = csv.DictReader(handle)
+        headers = {(header or "").strip().upper(): header for header in reader.fieldnames or []}
+        columns = {field: next((headers[alias] for alias in aliases if alias in headers), None)
+                   for field, aliases in CSV_FIELDS.items()}
+        if not columns["symbol"] or not columns["listing_date"]:
+            raise ValueError(f"{path} needs symbol and listing date columns, found: {', '.join(headers)}")
+
+        for row in reader:
+            symbol = (row.get(columns["symbol"]) or "").strip().upper()
+            try:
+                listing_date = parse_listing_date(row.get(columns["listing_date"]))
+            except ValueError:
+                skipped += 1
+                continue
+            if not symbol:
+                skipped += 1
+                continue
+            record = {"symbol": symbol, "listing_date": listing_date}
+            if columns["name"] and row.get(columns["name"]):
+                record["name"] = row[columns["name"]].strip()
+            if columns["issue_price"] and row.get(columns["issue_price"]):
+                try:
+                    record["issue_price"] = float(row[columns["issue_price"]].replace(",", ""))
+                except ValueError:
+                    pass
+            records.append(record)
+    if skipped:
+        logger.warning(f"Skipped {skipped} rows without a symbol or a readable listing date in {path}")
+    return records
+
+
+def csv_listing_dates(path=None):
+    """{symbol: listing datetime} from IPO_REGISTRY_CSV; empty when the file is missing"""
+    path = path or Config.IPO_REGISTRY_CSV or DEFAULT_IPO_REGISTRY_CSV
+    if not os.path.exists(path):
+        return {}
+    return {record["symbol"]: record["listing_date"] for record in read_listing_csv(path)}
+
+
+class IPORegistryModel:
+    """
+    Listing dates keyed by bare NSE symbol (the _id, so lookups are indexed).
+    Reads go through a process-wide cache of the whole registry, refreshed
+    every IPO_REGISTRY_CACHE_SECONDS; when MongoDB is unreachable the cache
+    is filled from IPO_REGISTRY_CSV instead.
+    """
+
+    _cache = None
+    _cache_loaded_at = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_collection():
+        return mongo_manager.get_collection(IPO_REGISTRY)
+
+    @classmethod
+    def bulk_load(cls, records, source="csv"):
+        """Upsert records ({'symbol', 'listing_date', ...}) in one bulk write"""
+        if not records:
+            return {"upserted": 0, "modified": 0}
+        now = datetime.utcnow()
+        result = cls.get_collection().bulk_write([
+            UpdateOne(
+                {"_id": record["symbol"]},
+                {"$set": {**record, "source": source, "updated_at": now}},
+                upsert=True
+            )
+            for record in records
+        ], ordered=False)
+        cls.invalidate()
+        logger.info(f"IPO registry: {result.upserted_count} added, {result.modified_count} updated from {source}")
+        return {"upserted": result.upserted_count, "modified": result.modified_count}
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._cache = None
+
+    @classmethod
+    def listing_dates(cls):
+        """{symbol: listing datetime} for the whole registry, cached"""
+        cache = cls._cache
+        if cache is not None and time.time() - cls._cache_loaded_at < Config.IPO_REGISTRY_CACHE_SECONDS:
+            return cache
+        with cls._lock:
+            if cls._cache is not None and time.time() - cls._cache_loaded_at < Config.IPO_REGISTRY_CACHE_SECONDS:
+                return cls._cache
+            try:
+                cache = {doc["_id"]: doc["listing_date"]
+                         for doc in cls.get_collection().find({}, {"listing_date": 1})}
+            except Exception as e:
+                logger.warning(f"IPO registry unavailable, using the listing CSV: {str(e)}")
+                cache = csv_listing_dates()
+            cls._cache = cache
+            cls._cache_loaded_at = time.time()
+            return cache
+
+    @classmethod
+    def get_listing_date(cls, symbol):
+        return cls.listing_dates().get(symbol.replace(".NS", "").replace(".BO", "").upper())
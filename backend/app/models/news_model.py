@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
 from app.extensions import mongo
 import logging
 
@@ -58,14 +59,103 @@ class NewsModel:
             return False
     
     @staticmethod
-    def get_all_news():
-        """Get all news items sorted by creation date (newest first)"""
+    def upsert_news(news_list):
+        """
+        Insert items whose url_key is not stored yet; existing items are left
+        untouched. Returns the number of new items, or None on failure.
+        """
+        try:
+            if not news_list:
+                return 0
+            
+            collection = NewsModel.get_collection()
+            if collection is None:
+                logger.error("Cannot upsert news: Collection not available")
+                return None
+            
+            now = datetime.utcnow()
+            result = collection.bulk_write([
+                UpdateOne(
+                    {'url_key': news['url_key']},
+                    {'$setOnInsert': {**news, 'created_at': now, 'scraped_at': now}},
+                    upsert=True
+                )
+                for news in news_list
+            ], ordered=False)
+            logger.info(f"Stored {result.upserted_count} new news items")
+            return result.upserted_count
+            
+        except Exception as e:
+            logger.error(f"Error upserting news: {str(e)}")
+            return None
+    
+    @staticmethod
+    def get_recent_fingerprints(days=3):
+        """url_keys and headline simhashes of items stored in the last ``days`` days"""
+        try:
+            collection = NewsModel.get_collection()
+            if collection is None:
+                return set(), []
+            since = datetime.utcnow() - timedelta(days=days)
+            url_keys, simhashes = set(), []
+            for doc in collection.find({'created_at': {'$gte': since}}, {'url_key': 1, 'headline_hash': 1, '_id': 0}):
+                if doc.get('url_key'):
+                    url_keys.add(doc['url_key'])
+                if doc.get('headline_hash'):
+                    simhashes.append(int(doc['headline_hash'], 16))
+            return url_keys, simhashes
+        except Exception as e:
+            logger.error(f"Error getting recent news fingerprints: {str(e)}")
+            return set(), []
+    
+    @staticmethod
+    def get_source_states():
+        """Conditional-fetch validators per source: {name: {'etag', 'last_modified', 'content_hash'}}"""
+        try:
+            if mongo.db is None:
+                return {}
+            return {doc['_id']: doc for doc in mongo.db.news_source_state.find(
+                {}, {'etag': 1, 'last_modified': 1, 'content_hash': 1})}
+        except Exception as e:
+            logger.error(f"Error getting news source state: {str(e)}")
+            return {}
+    
+    @staticmethod
+    def record_source_runs(runs):
+        """
+        Last fetch outcome per source ({name: {'error', 'fetched', 'new',
+        'unchanged', 'seconds', 'etag', 'last_modified', 'content_hash'}})
+        """
+        try:
+            if mongo.db is None or not runs:
+                return
+            now = datetime.utcnow()
+            updates = []
+            for name, run in runs.items():
+                fields = {'last_attempt_at': now, 'last_error': run.get('error'),
+                          'last_fetched': run.get('fetched', 0), 'last_new': run.get('new', 0),
+                          'last_unchanged': run.get('unchanged', False), 'last_seconds': run.get('seconds'),
+                          'etag': run.get('etag'), 'last_modified': run.get('last_modified'),
+                          'content_hash': run.get('content_hash')}
+                if not run.get('error'):
+                    fields['last_success_at'] = now
+                updates.append(UpdateOne({'_id': name}, {'$set': fields}, upsert=True))
+            mongo.db.news_source_state.bulk_write(updates, ordered=False)
+        except Exception as e:
+            logger.error(f"Error recording news source runs: {str(e)}")
+    
+    @staticmethod
+    def get_all_news(limit=None):
+        """Get news items sorted by creation date (newest first), at most ``limit``"""
         try:
             collection = NewsModel.get_collection()
             if collection is None:
                 logger.error("Cannot get news: Collection not available")
                 return []
-            return list(collection.find({}, {'_id': 0}).sort('created_at', -1))
+            cursor = collection.find({}, {'_id': 0}).sort('created_at', -1)
+            if limit:
+                cursor = cursor.limit(limit)
+            return list(cursor)
         except Exception as e:
             logger.error(f"Error getting all news: {str(e)}")
             return []
@@ -81,4 +171,26 @@ class NewsModel:
             return list(collection.find({}, {'_id': 0}).sort('created_at', -1).limit(limit))
         except Exception as e:
             logger.error(f"Error getting latest news: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+    
+    @staticmethod
+    def get_last_scraped_at():
+        """
+        Time of the last successful fetch of any source, or None. Runs that find
+        no new articles add no news items, so the newest item's created_at is
+        only the fallback.
+        """
+        try:
+            collection = NewsModel.get_collection()
+            if collection is None:
+                logger.error("Cannot get last scrape time: Collection not available")
+                return None
+            state = mongo.db.news_source_state.find_one(
+                {'last_success_at': {'$ne': None}}, {'last_success_at': 1}, sort=[('last_success_at', -1)])
+            if state:
+                return state['last_success_at']
+            latest = collection.find_one({}, {'created_at': 1}, sort=[('created_at', -1)])
+            return latest.get('created_at') if latest else None
+        except Exception as e:
+            logger.error(f"Error getting last scrape time: {str(e)}")
+            return None
@@ -0,0 +1,90 @@
+from collections import Counter
+from datetime import datetime, timedelta
+import atexit
+import os
+import time
+import threading
+import logging
+from pymongo import UpdateOne
+from app.config import Config
+from app.extensions import mongo_manager
+
+logger = logging.getLogger(__name__)
+
+REPORT_DEMAND = "report_demand"
+
+
+class ReportDemandModel:
+    """
+    Stock report requests per symbol per day (_id "SYMBOL|YYYY-MM-DD"), the
+    demand signal for report warming. Requests are counted in memory and a
+    background thread writes them as one bulk $inc every
+    REPORT_DEMAND_FLUSH_SECONDS, so the analyze endpoints never wait on the
+    write. Day documents expire after REPORT_DEMAND_DAYS.
+    """
+
+    _pending = Counter()
+    _flusher_pid = None
+    _exit_flush_registered = False
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_collection():
+        return mongo_manager.get_collection(REPORT_DEMAND)
+
+    @classmethod
+    def record(cls, symbol):
+        """Count one report request for a normalized symbol (TCS.NS)"""
+        day = datetime.utcnow().strftime("%Y-%m-%d")
+        with cls._lock:
+            cls._pending[(symbol.upper(), day)] += 1
+            if not cls._exit_flush_registered:
+                atexit.register(cls.flush)
+                cls._exit_flush_registered = True
+            # Threads do not survive a fork, so each process starts its own flusher
+            if cls._flusher_pid != os.getpid():
+                cls._flusher_pid = os.getpid()
+                threading.Thread(target=cls._flush_periodically, name="report-demand-flush", daemon=True).start()
+
+    @classmethod
+    def _flush_periodically(cls):
+        while True:
+            time.sleep(Config.REPORT_DEMAND_FLUSH_SECONDS)
+            cls.flush()
+
+    @classmethod
+    def flush(cls):
+        """Write the counted requests; returns the number of symbol-days written"""
+        with cls._lock:
+            pending, cls._pending = cls._pending, Counter()
+        if not pending:
+            return 0
+        try:
+            cls.get_collection().bulk_write([
+                UpdateOne(
+                    {"_id": f"{symbol}|{day}"},
+                    {"$inc": {"count": count},
+                     "$setOnInsert": {"symbol": symbol, "day": datetime.strptime(day, "%Y-%m-%d")}},
+                    upsert=True
+                )
+                for (symbol, day), count in pending.items()
+            ], ordered=False)
+        except Exception as e:
+            # Losing a few counts only makes the ranking slightly less exact
+            logger.warning(f"Could not write report demand for {len(pending)} symbol-days: {str(e)}")
+            return 0
+        return len(pending)
+
+    @classmethod
+    def top_symbols(cls, days=None, limit=None):
+        """[(symbol, requests)] over the last ``days`` days, most requested first"""
+        days = days or Config.REPORT_DEMAND_DAYS
+        since = datetime.combine(datetime.utcnow().date() - timedelta(days=days - 1), datetime.min.time())
+        pipeline = [
+            {"$match": {"day": {"$gte": since}}},
+            {"$group": {"_id": "$symbol", "requests": {"$sum": "$count"}}},
+            {"$sort": {"requests": -1, "_id": 1}}
+        ]
+        if limit:
+            pipeline.append({"$limit": int(limit)})
+        return [(doc["_id"], doc["requests"]) for doc in cls.get_collection().aggregate(pipeline)]
@@ -0,0 +1,61 @@
+from datetime import datetime
+import logging
+from app.config import Config
+from app.extensions import mongo_manager
+
+logger = logging.getLogger(__name__)
+
+WATCHLISTS = "watchlists"
+
+
+class WatchlistModel:
+    """One watchlist per user (_id is the JWT identity), symbols normalized as TCS.NS"""
+
+    @staticmethod
+    def get_collection():
+        return mongo_manager.get_collection(WATCHLISTS)
+
+    @classmethod
+    def get_symbols(cls, user_id):
+        doc = cls.get_collection().find_one({"_id": user_id}, {"symbols": 1})
+        return doc.get("symbols", []) if doc else []
+
+    @classmethod
+    def replace(cls, user_id, symbols):
+        """Set the whole watchlist; raises ValueError past WATCHLIST_MAX_SYMBOLS"""
+        symbols = list(dict.fromkeys(symbols))
+        if len(symbols) > Config.WATCHLIST_MAX_SYMBOLS:
+            raise ValueError(f"A watchlist holds at most {Config.WATCHLIST_MAX_SYMBOLS} symbols")
+        cls.get_collection().update_one(
+            {"_id": user_id},
+            {"$set": {"symbols": symbols, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return symbols
+
+    @classmethod
+    def add(cls, user_id, symbol):
+        symbols = cls.get_symbols(user_id)
+        if symbol in symbols:
+            return symbols
+        return cls.replace(user_id, symbols + [symbol])
+
+    @classmethod
+    def remove(cls, user_id, symbol):
+        cls.get_collection().update_one(
+            {"_id": user_id},
+            {"$pull": {"symbols": symbol}, "$set": {"updated_at": datetime.utcnow()}}
+        )
+        return cls.get_symbols(user_id)
+
+    @classmethod
+    def follower_counts(cls, limit=None):
+        """[(symbol, watchlists containing it)], most followed first"""
+        pipeline = [
+            {"$unwind": "$symbols"},
+            {"$group": {"_id": "$symbols", "followers": {"$sum": 1}}},
+            {"$sort": {"followers": -1, "_id": 1}}
+        ]
+        if limit:
+            pipeline.append({"$limit": int(limit)})
+        return [(doc["_id"], doc["followers"]) for doc in cls.get_collection().aggregate(pipeline)]
@@ -4,6 +4,8 @@ from .auth_routes import auth_bp
 from .predict_routes import predict_bp
 from .news_routes import news_bp
 from .stock_routes import stock_bp
+from .metrics_routes import metrics_bp
+from .profiler_routes import profiler_bp
 
 def register_routes(app):
     app.register_blueprint(ping_bp, url_prefix="/api")
@@ -11,3 +13,5 @@ def register_routes(app):
     app.register_blueprint(predict_bp, url_prefix="/api/predict")
     app.register_blueprint(news_bp, url_prefix="/api/news")
     app.register_blueprint(stock_bp, url_prefix="/api/stocks")
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(profiler_bp, url_prefix="/api/admin/profiler")
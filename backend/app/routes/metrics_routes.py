@@ -0,0 +1,19 @@
+from flask import Blueprint, Response, current_app, request, jsonify
+import hmac
+from app.utils.metrics import registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint (per-stage, per-dependency and per-route histograms)"""
+    if not current_app.config.get('METRICS_ENABLED', True):
+        return jsonify({'success': False, 'error': 'Resource not found'}), 404
+
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied, f"Bearer {token}"):
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
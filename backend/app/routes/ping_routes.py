@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, current_app
 from flask_cors import cross_origin
 from app.extensions import mongo
+from app.tasks.startup import startup_runner
 import logging
 
 logger = logging.getLogger(__name__)
@@ -63,3 +64,15 @@ def health_check():
             },
             'timestamp': '2025-08-25'
         }), 500
+
+
+@ping_bp.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe reporting background warm-up progress"""
+    warmup = startup_runner.status()
+    return jsonify({
+        'status': 'ready' if warmup['ready'] else 'warming_up',
+        'ready': warmup['ready'],
+        'progress': warmup['progress'],
+        'tasks': warmup['tasks']
+    }), 200 if warmup['ready'] else 503
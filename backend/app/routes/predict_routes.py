@@ -1,5 +1,9 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from app.services.predict_service import PredictService
+from app.models.detector_config_model import DetectorConfigModel
+from app.utils.auth_utils import admin_required
+from app.tasks.pipeline import build_daily_pipeline
+from app.tasks.job_coordinator import job_coordinator
 import logging
 from datetime import datetime
 import pytz
@@ -9,134 +13,59 @@ logger = logging.getLogger(__name__)
 predict_bp = Blueprint('predict', __name__)
 predict_service = PredictService()
 
+def _force_requested():
+    """``force`` from the JSON body or query string re-evaluates unchanged symbols"""
+    data = request.get_json(silent=True) or {}
+    force = data.get('force', request.args.get('force', False))
+    if isinstance(force, str):
+        return force.lower() in ('1', 'true', 'yes')
+    return bool(force)
+
+def _timeline(timestamp):
+    """Human readable age of a detection timestamp"""
+    if not timestamp:
+        return "Unknown"
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    
+    # Calculate time difference
+    now = datetime.now(pytz.UTC)
+    time_diff = now - timestamp.replace(tzinfo=pytz.UTC)
+    
+    if time_diff.days > 0:
+        return f"{time_diff.days} days"
+    elif time_diff.seconds > 3600:
+        hours = time_diff.seconds // 3600
+        return f"{hours} hours"
+    elif time_diff.seconds > 60:
+        minutes = time_diff.seconds // 60
+        return f"{minutes} minutes"
+    return "Just now"
+
 @predict_bp.route('/predicted-stocks', methods=['GET'])
 def get_predicted_stocks():
     """Get combined VCP and IPO Base results for the frontend PredictedStocksSection"""
     try:
-        # Get VCP results
-        vcp_result = predict_service.get_vcp_results()
-        ipo_result = predict_service.get_ipo_results()
-        
-        if not vcp_result['success'] or not ipo_result['success']:
+        # Served from the snapshot published by the daily pipeline
+        result = predict_service.get_predicted_stocks()
+        if not result['success']:
             return jsonify({
                 "success": False,
-                "message": "Failed to fetch pattern results"
+                "message": result.get('message', "Failed to fetch pattern results")
             }), 500
         
-        # Transform VCP results
-        transformed_vcp = []
-        for stock in vcp_result['data']:
-            # Extract confidence percentage
-            confidence_str = stock.get('confidence', '0%')
-            confidence = int(confidence_str.replace('%', '')) if isinstance(confidence_str, str) else 0
-            
-            # Calculate time ago from timestamp
-            timestamp = stock.get('timestamp')
-            if timestamp:
-                if isinstance(timestamp, str):
-                    timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                
-                # Calculate time difference
-                now = datetime.now(pytz.UTC)
-                time_diff = now - timestamp.replace(tzinfo=pytz.UTC)
-                
-                if time_diff.days > 0:
-                    timeline = f"{time_diff.days} days"
-                elif time_diff.seconds > 3600:
-                    hours = time_diff.seconds // 3600
-                    timeline = f"{hours} hours"
-                elif time_diff.seconds > 60:
-                    minutes = time_diff.seconds // 60
-                    timeline = f"{minutes} minutes"
-                else:
-                    timeline = "Just now"
-            else:
-                timeline = "Unknown"
-            
-            # Calculate target return based on confidence
-            if confidence >= 80:
-                target_return = "8-12%"
-            elif confidence >= 60:
-                target_return = "6-10%"
-            else:
-                target_return = "4-8%"
-            
-            transformed_vcp.append({
-                "id": str(stock.get('_id', len(transformed_vcp) + 1)),
-                "symbol": stock.get('symbol', ''),
-                "name": stock.get('stock_name', ''),
-                "price": stock.get('current_price', 0),  # Use current_price from database
-                "setup": "VCP",
-                "sector": stock.get('sector', 'Unknown'),
-                "targetReturn": target_return,
-                "timeline": timeline,
-                "confidence": confidence,
-                "original_data": stock
-            })
-        
-        # Transform IPO results
-        transformed_ipo = []
-        for stock in ipo_result['data']:
-            # Extract confidence percentage
-            confidence_str = stock.get('confidence', '0%')
-            confidence = int(confidence_str.replace('%', '')) if isinstance(confidence_str, str) else 0
-            
-            # Calculate time ago from timestamp
-            timestamp = stock.get('timestamp')
-            if timestamp:
-                if isinstance(timestamp, str):
-                    timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                
-                # Calculate time difference
-                now = datetime.now(pytz.UTC)
-                time_diff = now - timestamp.replace(tzinfo=pytz.UTC)
-                
-                if time_diff.days > 0:
-                    timeline = f"{time_diff.days} days"
-                elif time_diff.seconds > 3600:
-                    hours = time_diff.seconds // 3600
-                    timeline = f"{hours} hours"
-                elif time_diff.seconds > 60:
-                    minutes = time_diff.seconds // 60
-                    timeline = f"{minutes} minutes"
-                else:
-                    timeline = "Just now"
-            else:
-                timeline = "Unknown"
-            
-            # Calculate target return based on confidence
-            if confidence >= 80:
-                target_return = "8-12%"
-            elif confidence >= 60:
-                target_return = "6-10%"
-            else:
-                target_return = "4-8%"
-            
-            transformed_ipo.append({
-                "id": str(stock.get('_id', len(transformed_ipo) + 1)),
-                "symbol": stock.get('symbol', ''),
-                "name": stock.get('stock_name', ''),
-                "price": stock.get('current_price', 0),  # Use current_price from database
-                "setup": "IPO Base",
-                "sector": stock.get('sector', 'Unknown'),
-                "targetReturn": target_return,
-                "timeline": timeline,
-                "confidence": confidence,
-                "original_data": stock
-            })
-        
-        # Combine both results
-        all_stocks = transformed_vcp + transformed_ipo
-        
-        # Sort by confidence (highest first)
-        all_stocks.sort(key=lambda x: x['confidence'], reverse=True)
+        all_stocks = []
+        for stock in result['data']:
+            stock = dict(stock)
+            stock['timeline'] = _timeline(stock['original_data'].get('timestamp'))
+            all_stocks.append(stock)
         
         return jsonify({
             "success": True,
             "data": all_stocks,
             "count": len(all_stocks),
-            "vcp_count": len(transformed_vcp),
-            "ipo_count": len(transformed_ipo)
+            "vcp_count": result['vcp_count'],
+            "ipo_count": result['ipo_count']
         }), 200
         
     except Exception as e:
@@ -148,9 +77,9 @@ def get_predicted_stocks():
 
 @predict_bp.route('/scrape-stocks', methods=['POST'])
 def scrape_stocks():
-    """Trigger stock scraping manually"""
+    """Trigger stock scraping manually (?source=universe|chartink overrides SCREENER_SOURCE)"""
     try:
-        result = predict_service.run_stock_scraping()
+        result = predict_service.run_stock_scraping(source=request.args.get('source'))
         if result['success']:
             return jsonify({"success": True, "message": result['message']}), 200
         else:
@@ -163,7 +92,8 @@ def scrape_stocks():
 def run_vcp_analysis():
     """Trigger VCP pattern analysis manually"""
     try:
-        result = predict_service.run_vcp_analysis()
+        result = predict_service.run_vcp_analysis(force=_force_requested())
+        predict_service.publish_predicted_stocks_snapshot()
         if result['success']:
             return jsonify({"success": True, "message": result['message']}), 200
         else:
@@ -176,7 +106,8 @@ def run_vcp_analysis():
 def run_ipo_analysis():
     """Trigger IPO Base pattern analysis manually"""
     try:
-        result = predict_service.run_ipo_analysis()
+        result = predict_service.run_ipo_analysis(force=_force_requested())
+        predict_service.publish_predicted_stocks_snapshot()
         if result['success']:
             return jsonify({"success": True, "message": result['message']}), 200
         else:
@@ -211,6 +142,58 @@ def get_ipo_results():
         logger.error(f"Error in get_ipo_results endpoint: {str(e)}")
         return jsonify({"success": False, "message": f"Internal server error: {str(e)}"}), 500
 
+@predict_bp.route('/screen-results', methods=['GET'])
+def get_screen_results():
+    """Get detections of a named detector config (?pattern=vcp&config=aggressive)"""
+    try:
+        pattern = request.args.get('pattern', 'vcp')
+        config = request.args.get('config')
+        if not config:
+            return jsonify({"success": False, "message": "config is required"}), 400
+        result = predict_service.get_screen_results(pattern, config)
+        if result['success']:
+            return jsonify({"success": True, "data": result['data']}), 200
+        else:
+            return jsonify({"success": False, "message": result['message']}), 500
+    except Exception as e:
+        logger.error(f"Error in get_screen_results endpoint: {str(e)}")
+        return jsonify({"success": False, "message": f"Internal server error: {str(e)}"}), 500
+
+@predict_bp.route('/detector-configs', methods=['GET'])
+def list_detector_configs():
+    """List every stored detector config version"""
+    try:
+        configs = DetectorConfigModel.list_configs(request.args.get('pattern'))
+        return jsonify({"success": True, "data": configs}), 200
+    except Exception as e:
+        logger.error(f"Error in list_detector_configs endpoint: {str(e)}")
+        return jsonify({"success": False, "message": f"Internal server error: {str(e)}"}), 500
+
+@predict_bp.route('/detector-configs', methods=['POST'])
+@admin_required
+def save_detector_config():
+    """Store a new version of a detector config (admin only); it is evaluated from the next scan on"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if not data.get('pattern') or not data.get('name'):
+            return jsonify({"success": False, "message": "pattern and name are required"}), 400
+        
+        config = DetectorConfigModel.save(
+            data['pattern'],
+            data['name'],
+            data.get('params', {}),
+            is_default=bool(data.get('is_default', False)),
+            active=bool(data.get('active', True)),
+            description=data.get('description', '')
+        )
+        saved = config.to_dict()
+        return jsonify({"success": True, "data": saved}), 201
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in save_detector_config endpoint: {str(e)}")
+        return jsonify({"success": False, "message": f"Internal server error: {str(e)}"}), 500
+
 @predict_bp.route('/scraped-stocks', methods=['GET'])
 def get_scraped_stocks():
     """Get scraped stock data"""
@@ -228,11 +211,15 @@ def get_scraped_stocks():
 def run_complete_analysis():
     """Run both VCP and IPO Base analysis"""
     try:
+        force = _force_requested()
+        
         # Run VCP analysis
-        vcp_result = predict_service.run_vcp_analysis()
+        vcp_result = predict_service.run_vcp_analysis(force=force)
         
         # Run IPO analysis
-        ipo_result = predict_service.run_ipo_analysis()
+        ipo_result = predict_service.run_ipo_analysis(force=force)
+        
+        predict_service.publish_predicted_stocks_snapshot()
         
         return jsonify({
             "success": True,
@@ -243,6 +230,29 @@ def run_complete_analysis():
         logger.error(f"Error in run_complete_analysis endpoint: {str(e)}")
         return jsonify({"success": False, "message": f"Internal server error: {str(e)}"}), 500
 
+@predict_bp.route('/run-pipeline', methods=['POST'])
+def run_pipeline():
+    """
+    Run the scrape -> detect -> publish pipeline now. Pass the run_id of a
+    partial run to resume it; by default a new run is started. Shares the
+    scheduled job's lease, so it never runs alongside the 4:30 PM run.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        slot = f"manual-{datetime.now().strftime('%Y-%m-%dT%H:%M:%S')}"
+        run_id = data.get('run_id') or slot
+        resume = data.get('resume', True)
+        
+        pipeline = build_daily_pipeline(predict_service, current_app.config)
+        result = job_coordinator.run_exclusive('daily_pipeline_job', lambda: pipeline.run(run_id, resume=resume),
+                                               slot=slot)
+        if result is None:
+            return jsonify({"success": False, "message": "The daily pipeline is already running (or jobs cannot be coordinated)"}), 409
+        return jsonify(result), 200 if result['success'] else 500
+    except Exception as e:
+        logger.error(f"Error in run_pipeline endpoint: {str(e)}")
+        return jsonify({"success": False, "message": f"Internal server error: {str(e)}"}), 500
+
 @predict_bp.route('/status', methods=['GET'])
 def get_prediction_status():
     """Get status of prediction system"""
@@ -0,0 +1,110 @@
+from flask import Blueprint, Response, jsonify, request, current_app
+from flask_jwt_extended import get_jwt_identity
+from app.utils.auth_utils import admin_required
+from app.utils.profiler import profiler, ProfileSession, DURATION, REQUESTS, IDLE
+import logging
+
+logger = logging.getLogger(__name__)
+
+profiler_bp = Blueprint('profiler', __name__)
+
+# Sampling faster than this costs more than it tells
+MIN_INTERVAL_MS = 1
+
+def _disabled():
+    return jsonify({'success': False, 'error': 'Profiler is disabled'}), 404
+
+@profiler_bp.route('/start', methods=['POST'])
+@admin_required
+def start_profiler():
+    """
+    Start a session:
+      {"mode": "duration", "seconds": 30}
+      {"mode": "requests", "route": "/api/stocks/analyze", "count": 10}
+    Optional: interval_ms, include_idle
+    """
+    if not current_app.config.get('PROFILER_ENABLED', True):
+        return _disabled()
+
+    data = request.get_json(silent=True) or {}
+    mode = data.get('mode', DURATION)
+    max_seconds = current_app.config.get('PROFILER_MAX_SECONDS', 120)
+    try:
+        interval_ms = max(float(data.get('interval_ms', current_app.config.get('PROFILER_INTERVAL_MS', 10))), MIN_INTERVAL_MS)
+        if mode == DURATION:
+            seconds = float(data.get('seconds', 30))
+            if not 0 < seconds <= max_seconds:
+                return jsonify({'success': False, 'error': f'seconds must be between 0 and {max_seconds}'}), 400
+            session = ProfileSession(DURATION, seconds=seconds, interval_ms=interval_ms, max_seconds=max_seconds,
+                                     include_idle=bool(data.get('include_idle', False)), started_by=get_jwt_identity())
+        elif mode == REQUESTS:
+            route = data.get('route')
+            count = int(data.get('count', 10))
+            max_requests = current_app.config.get('PROFILER_MAX_REQUESTS', 50)
+            if not route or not route.startswith('/'):
+                return jsonify({'success': False, 'error': 'route must be a path such as /api/stocks/analyze'}), 400
+            if not 0 < count <= max_requests:
+                return jsonify({'success': False, 'error': f'count must be between 1 and {max_requests}'}), 400
+            session = ProfileSession(REQUESTS, route=route, count=count, interval_ms=interval_ms,
+                                     max_seconds=min(float(data.get('max_seconds', max_seconds)), max_seconds),
+                                     include_idle=bool(data.get('include_idle', False)), started_by=get_jwt_identity())
+        else:
+            return jsonify({'success': False, 'error': f"mode must be '{DURATION}' or '{REQUESTS}'"}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': f'Invalid profiler options: {str(e)}'}), 400
+
+    try:
+        profiler.start(session)
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e), 'session': profiler.session.summary()}), 409
+
+    return jsonify({'success': True, 'session': session.summary()}), 202
+
+@profiler_bp.route('/status', methods=['GET'])
+@admin_required
+def profiler_status():
+    """State of the current or last session"""
+    session = profiler.session
+    return jsonify({
+        'success': True,
+        'state': profiler.state,
+        'session': session.summary() if session else None
+    })
+
+@profiler_bp.route('/stop', methods=['POST'])
+@admin_required
+def stop_profiler():
+    """End the running session early; its samples stay available"""
+    session = profiler.stop()
+    if session is None:
+        return jsonify({'success': False, 'error': 'No profiling session'}), 404
+    return jsonify({'success': True, 'state': profiler.state, 'session': session.summary()})
+
+@profiler_bp.route('/result', methods=['GET'])
+@admin_required
+def profiler_result():
+    """
+    Collapsed stacks of the current or last session (?format=collapsed, the
+    default, for flamegraph.pl / speedscope) or a JSON summary (?format=json)
+    """
+    session = profiler.session
+    if profiler.state == IDLE or session is None:
+        return jsonify({'success': False, 'error': 'No profiling session'}), 404
+
+    if request.args.get('format', 'collapsed') == 'json':
+        try:
+            top = int(request.args.get('top', 20))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'top must be a positive integer'}), 400
+        if top <= 0:
+            return jsonify({'success': False, 'error': 'top must be a positive integer'}), 400
+        return jsonify({
+            'success': True,
+            'state': profiler.state,
+            'session': session.summary(top=top),
+            'stacks': session.snapshot()
+        })
+
+    filename = f"profile-{session.mode}-{int(session.started_at)}.folded"
+    return Response(session.collapsed() + "\n", content_type='text/plain; charset=utf-8',
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
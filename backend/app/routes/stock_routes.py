@@ -1,7 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_cors import cross_origin
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.stock_analysis_service import StockAnalysisService
+from app.services.report_warming_service import ReportWarmingService
+from app.models.report_demand_model import ReportDemandModel
+from app.models.watchlist_model import WatchlistModel
 from app.models.stock_analysis_model import StockAnalysisResponse
+from app.config import Config
 import logging
 
 stock_bp = Blueprint('stock', __name__)
@@ -28,6 +33,7 @@ def analyze_stock():
                 'success': False,
                 'error': 'Stock symbol cannot be empty'
             }), 400
+        ReportDemandModel.record(StockAnalysisService.normalize_symbol(symbol))
         
         # Check for cached analysis first (within last 1 hour)
         cached_response = StockAnalysisService.get_cached_analysis(symbol)
@@ -35,7 +41,7 @@ def analyze_stock():
             return jsonify(cached_response.to_dict()), 200
         
         # Generate new analysis
-        response = StockAnalysisService.generate_stock_report(symbol)
+        response = StockAnalysisService.generate_within_budget(symbol)
         return jsonify(response.to_dict()), 200 if response.success else 500
         
     except Exception as e:
@@ -45,6 +51,58 @@ def analyze_stock():
             'error': f'Internal server error occurred: {str(e)}'
         }), 500
 
+@stock_bp.route('/analyze/batch', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def analyze_stock_batch():
+    """
+    Reports for a watchlist in one request: {"symbols": ["TCS", "INFY.NS", ...]}.
+    Streams NDJSON, one {"symbol", "cached", "success", "data" | "error"} line
+    per symbol as soon as it is ready (cache hits first).
+    """
+    try:
+        # Handle OPTIONS request for CORS preflight
+        if request.method == 'OPTIONS':
+            return jsonify({'status': 'ok'}), 200
+
+        data = request.get_json(silent=True) or {}
+        symbols = data.get('symbols')
+        if not isinstance(symbols, list) or not symbols:
+            return jsonify({
+                'success': False,
+                'error': 'symbols must be a non-empty list'
+            }), 400
+
+        # Normalize like GET /analyze/<symbol> and drop duplicates, keeping order
+        symbols = list(dict.fromkeys(
+            StockAnalysisService.normalize_symbol(symbol) for symbol in symbols if isinstance(symbol, str)
+        ))
+        symbols = [symbol for symbol in symbols if symbol]
+        max_symbols = Config.BATCH_ANALYZE_MAX_SYMBOLS
+        if not symbols or len(symbols) > max_symbols:
+            return jsonify({
+                'success': False,
+                'error': f'Between 1 and {max_symbols} valid symbols are allowed'
+            }), 400
+        for symbol in symbols:
+            ReportDemandModel.record(symbol)
+
+        app = current_app._get_current_object()
+
+        def stream():
+            for symbol, response, cached in StockAnalysisService.analyze_batch(symbols, app):
+                line = {'symbol': symbol, 'cached': cached, **response.to_dict()}
+                yield app.json.dumps(line) + "\n"
+
+        return Response(stream_with_context(stream()), mimetype='application/x-ndjson',
+                        headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
+    except Exception as e:
+        logging.error(f"Error in batch stock analysis: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error occurred: {str(e)}'
+        }), 500
+
 @stock_bp.route('/analyze/<path:symbol>', methods=['GET', 'OPTIONS'])
 @cross_origin()
 def get_stock_analysis(symbol):
@@ -65,6 +123,7 @@ def get_stock_analysis(symbol):
         # If user sends TCS, make it TCS.NS by default
         if not symbol.endswith(".NS") and not symbol.endswith(".BO"):
             symbol = f"{symbol}.NS"
+        ReportDemandModel.record(symbol)
 
         # Check for cached analysis
         cached_response = StockAnalysisService.get_cached_analysis(symbol)
@@ -72,7 +131,7 @@ def get_stock_analysis(symbol):
             return jsonify(cached_response.to_dict()), 200
 
         # Generate new analysis
-        response = StockAnalysisService.generate_stock_report(symbol)
+        response = StockAnalysisService.generate_within_budget(symbol)
         return jsonify(response.to_dict()), 200 if response.success else 500
 
     except Exception as e:
@@ -125,20 +184,9 @@ def search_stocks():
 
 @stock_bp.route('/popular', methods=['GET'])
 def get_popular_stocks():
-    """Get list of popular stocks"""
+    """Most requested and most followed stocks (a default list until there is demand to rank)"""
     try:
-        popular_stocks = [
-            {'symbol': 'TCS', 'name': 'Tata Consultancy Services Limited', 'sector': 'Technology'},
-            {'symbol': 'RELIANCE', 'name': 'Reliance Industries Limited', 'sector': 'Oil & Gas'},
-            {'symbol': 'INFY', 'name': 'Infosys Limited', 'sector': 'Technology'},
-            {'symbol': 'HDFC', 'name': 'HDFC Bank Limited', 'sector': 'Banks'},
-            {'symbol': 'ITC', 'name': 'ITC Limited', 'sector': 'FMCG'},
-            {'symbol': 'ICICIBANK', 'name': 'ICICI Bank Limited', 'sector': 'Banks'},
-            {'symbol': 'HINDUNILVR', 'name': 'Hindustan Unilever Limited', 'sector': 'FMCG'},
-            {'symbol': 'SBIN', 'name': 'State Bank of India', 'sector': 'Banks'},
-            {'symbol': 'BHARTIARTL', 'name': 'Bharti Airtel Limited', 'sector': 'Telecom'},
-            {'symbol': 'AXISBANK', 'name': 'Axis Bank Limited', 'sector': 'Banks'}
-        ]
+        popular_stocks = ReportWarmingService.popular_stocks(limit=10)
         
         return jsonify({
             'success': True,
@@ -152,6 +200,73 @@ def get_popular_stocks():
             'error': 'Internal server error occurred'
         }), 500
 
+@stock_bp.route('/watchlist', methods=['GET', 'PUT', 'OPTIONS'])
+@cross_origin()
+@jwt_required()
+def watchlist():
+    """The signed-in user's watchlist; PUT {"symbols": [...]} replaces it"""
+    try:
+        # Handle OPTIONS request for CORS preflight
+        if request.method == 'OPTIONS':
+            return jsonify({'status': 'ok'}), 200
+
+        user_id = get_jwt_identity()
+        if request.method == 'GET':
+            return jsonify({'success': True, 'data': WatchlistModel.get_symbols(user_id)}), 200
+
+        data = request.get_json(silent=True) or {}
+        symbols = data.get('symbols')
+        if not isinstance(symbols, list):
+            return jsonify({
+                'success': False,
+                'error': 'symbols must be a list'
+            }), 400
+        symbols = [StockAnalysisService.normalize_symbol(symbol) for symbol in symbols if isinstance(symbol, str)]
+        symbols = WatchlistModel.replace(user_id, [symbol for symbol in symbols if symbol])
+        return jsonify({'success': True, 'data': symbols}), 200
+
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error updating watchlist: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error occurred'
+        }), 500
+
+@stock_bp.route('/watchlist/<path:symbol>', methods=['POST', 'DELETE', 'OPTIONS'])
+@cross_origin()
+@jwt_required()
+def watchlist_symbol(symbol):
+    """Follow (POST) or unfollow (DELETE) one symbol"""
+    try:
+        # Handle OPTIONS request for CORS preflight
+        if request.method == 'OPTIONS':
+            return jsonify({'status': 'ok'}), 200
+
+        symbol = StockAnalysisService.normalize_symbol(symbol)
+        if not symbol:
+            return jsonify({
+                'success': False,
+                'error': 'Stock symbol cannot be empty'
+            }), 400
+
+        user_id = get_jwt_identity()
+        if request.method == 'POST':
+            symbols = WatchlistModel.add(user_id, symbol)
+        else:
+            symbols = WatchlistModel.remove(user_id, symbol)
+        return jsonify({'success': True, 'data': symbols}), 200
+
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error updating watchlist: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error occurred'
+        }), 500
+
 @stock_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for stock service"""
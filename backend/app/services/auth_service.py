@@ -1,4 +1,5 @@
 from werkzeug.security import generate_password_hash, check_password_hash
+from pymongo.errors import DuplicateKeyError
 from app.models.user_model import user_schema
 from app.extensions import mongo
 
@@ -25,7 +26,11 @@ def register_user(full_name, email, phone, password, confirm_password, terms):
     # Save user
     hashed_pw = generate_password_hash(password)
     new_user = user_schema(full_name, email, phone, hashed_pw)
-    db.users.insert_one(new_user)
+    try:
+        db.users.insert_one(new_user)
+    except DuplicateKeyError:
+        # Unique index on users.email catches concurrent signups
+        return {"error": "Email already registered"}, 400
 
     return {"message": "User registered successfully"}, 201
 
@@ -0,0 +1,172 @@
+from app.utils.lazy_import import lazy_import
+import time
+import logging
+from app.models.detector_config_model import DetectorConfig
+from app.models.ipo_registry_model import csv_listing_dates
+from app.services.predict_service import VCPDetector, IPOPatternDetector
+from app.utils.price_store import LocalPriceStore
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZONS = (5, 10, 20)
+PATTERNS = ("vcp", "ipo_base")
+
+
+class BacktestService:
+    """
+    Replays the pattern detectors over stored history. Features are computed
+    for every date of a symbol in one vectorized pass (compute_feature_series),
+    each config's thresholds are applied to those arrays, and the signals are
+    scored by forward returns. Runs entirely against a LocalPriceStore.
+    """
+
+    def __init__(self, store=None, horizons=DEFAULT_HORIZONS, onset_only=True, sample_size=10):
+        self.store = store or LocalPriceStore()
+        self.horizons = tuple(horizons)
+        # Count a run of consecutive detections as one signal (its first day)
+        self.onset_only = onset_only
+        self.sample_size = sample_size
+        # Listing dates come from the registry CSV so backtests never need MongoDB
+        self.detectors = {"vcp": VCPDetector(), "ipo_base": IPOPatternDetector(listing_dates=csv_listing_dates())}
+
+    def _feature_frame(self, pattern, bars, symbol):
+        """Indicator frame and per-date features for one symbol"""
+        detector = self.detectors[pattern]
+        if pattern == "vcp":
+            frame = detector.add_indicators(bars.copy())
+            return frame, detector.compute_feature_series(frame)
+        frame = detector.calculate_technical_indicators(bars)
+        return frame, detector.compute_feature_series(frame, symbol)
+
+    def _forward_returns(self, close):
+        return {h: np.concatenate([close[h:] / close[:-h] - 1, np.full(min(h, len(close)), np.nan)])[:len(close)] * 100
+                for h in self.horizons}
+
+    @staticmethod
+    def _return_stats(returns, baseline):
+        returns = returns[~np.isnan(returns)]
+        baseline = baseline[~np.isnan(baseline)]
+        stats = {
+            "count": int(len(returns)),
+            "baseline_mean_pct": round(float(baseline.mean()), 2) if len(baseline) else None
+        }
+        if len(returns):
+            stats.update({
+                "mean_pct": round(float(returns.mean()), 2),
+                "median_pct": round(float(np.median(returns)), 2),
+                "hit_rate_pct": round(float((returns > 0).mean() * 100), 1),
+                "worst_pct": round(float(returns.min()), 2),
+                "best_pct": round(float(returns.max()), 2)
+            })
+        return stats
+
+    def run(self, symbols=None, patterns=PATTERNS, configs=None, start=None, end=None):
+        """
+        Backtest ``patterns`` over ``symbols`` (default: every stored symbol).
+        ``configs`` maps pattern -> list of DetectorConfig; the built-in
+        thresholds are used when a pattern has none. Signals are only taken
+        between ``start`` and ``end``; earlier bars still feed the indicators.
+        """
+        symbols = symbols or self.store.symbols()
+        configs = {pattern: (configs or {}).get(pattern) or [DetectorConfig.builtin(pattern)]
+                   for pattern in patterns}
+        start = pd.Timestamp(start) if start else None
+        end = pd.Timestamp(end) if end else None
+
+        accumulators = {
+            pattern: {
+                "symbol_days": 0,
+                "seconds": 0.0,
+                "baseline": {h: [] for h in self.horizons},
+                "configs": {config.key: {"returns": {h: [] for h in self.horizons}, "signals": []}
+                            for config in configs[pattern]}
+            }
+            for pattern in patterns
+        }
+
+        load_seconds = 0.0
+        loaded = 0
+        for symbol in symbols:
+            started = time.perf_counter()
+            bars = self.store.load(symbol)
+            load_seconds += time.perf_counter() - started
+            if bars is None or bars.empty:
+                logger.warning(f"No stored bars for {symbol}, skipping")
+                continue
+            loaded += 1
+
+            for pattern in patterns:
+                acc = accumulators[pattern]
+                started = time.perf_counter()
+
+                frame, features = self._feature_frame(pattern, bars, symbol)
+                dates = frame.index
+                in_window = np.ones(len(frame), dtype=bool)
+                if start is not None:
+                    in_window &= dates >= start
+                if end is not None:
+                    in_window &= dates <= end
+                forward = self._forward_returns(frame['Close'].to_numpy(dtype=float))
+
+                for h in self.horizons:
+                    acc["baseline"][h].append(forward[h][in_window])
+
+                detector = self.detectors[pattern]
+                for config in configs[pattern]:
+                    detected, confidence = detector.evaluate_arrays(features, config.params)
+                    if self.onset_only:
+                        detected = detected & ~np.concatenate([[False], detected[:-1]])
+                    rows = np.flatnonzero(detected & in_window)
+                    config_acc = acc["configs"][config.key]
+                    for h in self.horizons:
+                        config_acc["returns"][h].append(forward[h][rows])
+                    config_acc["signals"].extend(
+                        (symbol, dates[row], int(confidence[row])) for row in rows
+                    )
+
+                acc["seconds"] += time.perf_counter() - started
+                acc["symbol_days"] += int(in_window.sum())
+
+        report = {
+            "symbols": loaded,
+            "start": start.date().isoformat() if start is not None else None,
+            "end": end.date().isoformat() if end is not None else None,
+            "horizons": list(self.horizons),
+            "onset_only": self.onset_only,
+            "load_seconds": round(load_seconds, 3),
+            "patterns": {}
+        }
+        for pattern in patterns:
+            acc = accumulators[pattern]
+            baseline = {h: np.concatenate(acc["baseline"][h]) if acc["baseline"][h] else np.array([])
+                        for h in self.horizons}
+            pattern_report = {
+                "throughput": {
+                    "symbol_days": acc["symbol_days"],
+                    "seconds": round(acc["seconds"], 3),
+                    "symbol_days_per_sec": round(acc["symbol_days"] / acc["seconds"]) if acc["seconds"] else None
+                },
+                "configs": {}
+            }
+            for config in configs[pattern]:
+                config_acc = acc["configs"][config.key]
+                signals = sorted(config_acc["signals"], key=lambda signal: signal[1])
+                pattern_report["configs"][config.key] = {
+                    "params": config.params,
+                    "signals": len(signals),
+                    "returns": {
+                        h: self._return_stats(
+                            np.concatenate(config_acc["returns"][h]) if config_acc["returns"][h] else np.array([]),
+                            baseline[h])
+                        for h in self.horizons
+                    },
+                    "recent_signals": [
+                        {"symbol": symbol, "date": date.date().isoformat(), "confidence": confidence}
+                        for symbol, date, confidence in signals[-self.sample_size:]
+                    ]
+                }
+            report["patterns"][pattern] = pattern_report
+        return report
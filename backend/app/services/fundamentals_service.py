@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, date
+import math
+import logging
+from app.config import Config
+from app.models.fundamentals_model import FundamentalsModel, FUNDAMENTAL_FIELDS
+from app.utils.lazy_import import lazy_import
+from app.utils.metrics import span, dependency
+
+yf = lazy_import("yfinance")
+
+logger = logging.getLogger(__name__)
+
+# Indian quarters end on these (month, day); results are due within FUNDAMENTALS_REPORTING_LAG_DAYS
+QUARTER_ENDS = ((3, 31), (6, 30), (9, 30), (12, 31))
+
+
+def statement_value(frame, label):
+    """Latest-period value of a statement row as a float, None when missing or NaN"""
+    if frame is None or frame.empty or label not in frame.index:
+        return None
+    try:
+        value = float(frame.loc[label].iloc[0])
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def latest_period(*frames):
+    periods = [column for frame in frames if frame is not None and not frame.empty for column in frame.columns]
+    return max(periods).to_pydatetime().replace(tzinfo=None) if periods else None
+
+
+def expected_report_date(now=None):
+    """Deadline for the next quarterly results: the next quarter end + FUNDAMENTALS_REPORTING_LAG_DAYS"""
+    now = now or datetime.utcnow()
+    lag = timedelta(days=Config.FUNDAMENTALS_REPORTING_LAG_DAYS)
+    for year in (now.year - 1, now.year, now.year + 1):
+        for month, day in QUARTER_ENDS:
+            due = datetime(year, month, day) + lag
+            if due > now:
+                return due
+
+
+def calendar_report_date(stock, now=None):
+    """Next announced earnings date from Yahoo's calendar, if it has one"""
+    now = now or datetime.utcnow()
+    try:
+        with dependency("yahoo_finance", "calendar"):
+            calendar = stock.calendar
+        dates = calendar.get("Earnings Date", []) if isinstance(calendar, dict) else []
+    except Exception as e:
+        logger.debug(f"No earnings calendar for {stock.ticker}: {str(e)}")
+        return None
+    upcoming = [datetime.combine(value, datetime.min.time()) if type(value) is date else value.replace(tzinfo=None)
+                for value in dates if isinstance(value, (date, datetime))]
+    upcoming = [value for value in upcoming if value > now]
+    return min(upcoming) if upcoming else None
+
+
+class FundamentalsService:
+    """
+    Statement figures for stock reports, read from the fundamentals store.
+    Financials and balance sheets change at most once a quarter, so they are
+    fetched from Yahoo Finance only when the stored copy is past
+    ``refresh_after``: a day after the next expected results (the announced
+    earnings date, or the quarter-end filing deadline), and never later than
+    FUNDAMENTALS_MAX_AGE_DAYS after the last fetch.
+    """
+
+    @staticmethod
+    def refresh_after(next_report_date, now=None):
+        now = now or datetime.utcnow()
+        return min(next_report_date + timedelta(days=1), now + timedelta(days=Config.FUNDAMENTALS_MAX_AGE_DAYS))
+
+    @staticmethod
+    def fetch(symbol, stock=None, stored=None):
+        """
+        Fetch and store the figures for ``symbol``; returns the new document.
+        An empty answer (throttling, missing statements) is retried a day
+        later and never replaces figures already stored.
+        """
+        stock = stock or yf.Ticker(symbol)
+        with dependency("yahoo_finance", "financials"):
+            financials = stock.financials
+        with dependency("yahoo_finance", "balance_sheet"):
+            balance_sheet = stock.balance_sheet
+
+        statements = {"financials": financials, "balance_sheet": balance_sheet}
+        values = {field: statement_value(statements[statement], label)
+                  for field, (statement, label) in FUNDAMENTAL_FIELDS.items()}
+        now = datetime.utcnow()
+        empty = all(value is None for value in values.values())
+        if empty and stored:
+            FundamentalsModel.postpone(symbol, now + timedelta(days=1))
+            return stored
+
+        next_report_date = calendar_report_date(stock, now) or expected_report_date(now)
+        period_end = latest_period(financials, balance_sheet)
+        refresh_after = now + timedelta(days=1) if empty else FundamentalsService.refresh_after(next_report_date, now)
+        try:
+            return FundamentalsModel.save(symbol, values, period_end, next_report_date, refresh_after)
+        except Exception as e:
+            logger.warning(f"Could not store fundamentals for {symbol}: {str(e)}")
+            return {"_id": symbol.upper(), **values, "period_end": period_end,
+                    "next_report_date": next_report_date, "refresh_after": refresh_after, "fetched_at": now}
+
+    @staticmethod
+    def get(symbol, stock=None):
+        """
+        Stored figures for ``symbol`` (TCS.NS), refreshed first when due. A
+        failed refresh falls back to the stored copy; with no stored copy the
+        error is raised.
+        """
+        try:
+            stored = FundamentalsModel.get(symbol)
+        except Exception as e:
+            logger.warning(f"Fundamentals store unavailable for {symbol}: {str(e)}")
+            stored = None
+        if stored and stored.get("refresh_after") and stored["refresh_after"] > datetime.utcnow():
+            return stored
+
+        with span("fundamentals", "refresh") as timer:
+            try:
+                return FundamentalsService.fetch(symbol, stock, stored)
+            except Exception as e:
+                timer.fail()
+                if stored is None:
+                    raise
+                logger.warning(f"Could not refresh fundamentals for {symbol}, using the stored copy: {str(e)}")
+                return stored
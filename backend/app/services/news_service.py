@@ -1,44 +1,144 @@
+from app.config import Config
 from app.models.news_model import NewsModel
-from app.utils.scraper_utils import scrape_economic_times_news
-from app.utils.sentiment_utils import analyze_sentiment
+from app.utils.news_sources import build_sources, fetch_sources, url_key, headline_simhash, SIMHASH_DISTANCE
+from app.utils.sentiment_utils import analyze_sentiment_batch
+from app.utils.metrics import span, dependency, trace
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+class HeadlineIndex:
+    """
+    Near-duplicate lookup over 64-bit headline simhashes. Hashes are split
+    into SIMHASH_DISTANCE + 1 bands; two hashes within that distance share
+    at least one band exactly, so only same-band hashes are compared.
+    """
+
+    def __init__(self, simhashes=(), distance=SIMHASH_DISTANCE):
+        self.distance = distance
+        self.bands = distance + 1
+        self.width = 64 // self.bands
+        self._buckets = [{} for _ in range(self.bands)]
+        for simhash in simhashes:
+            self.add(simhash)
+
+    def _band_values(self, simhash):
+        mask = (1 << self.width) - 1
+        return [(simhash >> (band * self.width)) & mask for band in range(self.bands)]
+
+    def add(self, simhash):
+        for bucket, value in zip(self._buckets, self._band_values(simhash)):
+            bucket.setdefault(value, []).append(simhash)
+
+    def contains_near(self, simhash):
+        for bucket, value in zip(self._buckets, self._band_values(simhash)):
+            for other in bucket.get(value, ()):
+                if bin(simhash ^ other).count('1') <= self.distance:
+                    return True
+        return False
+
+
 class NewsService:
     @staticmethod
     def scrape_and_store_news():
-        """Scrape news from Economic Times and store in database"""
+        """Fetch every configured news source concurrently and store the articles not seen before"""
+        with trace("News refresh"), span("news", "total") as timer:
+            result = NewsService._refresh_news()
+            if not result['success']:
+                timer.fail()
+        return result
+
+    @staticmethod
+    def deduplicate(news_items, known_url_keys=(), known_simhashes=()):
+        """
+        Items whose canonical URL or (near-identical) headline is neither
+        stored already nor earlier in ``news_items``. Adds url_key and
+        headline_hash to the items kept.
+        """
+        seen_urls = set(known_url_keys)
+        headlines = HeadlineIndex(known_simhashes)
+        fresh = []
+        for news in news_items:
+            key = url_key(news['url'])
+            simhash = headline_simhash(news['headline'])
+            if key in seen_urls or (simhash and headlines.contains_near(simhash)):
+                continue
+            seen_urls.add(key)
+            headlines.add(simhash)
+            fresh.append({**news, 'url_key': key, 'headline_hash': f"{simhash:016x}"})
+        return fresh
+
+    @staticmethod
+    def _refresh_news():
         try:
-            # Scrape news headlines and URLs
-            news_items = scrape_economic_times_news()
-            logger.info(f"Scraped {len(news_items)} news items")
-            
-            # Analyze sentiment for each news headline
-            for news in news_items:
-                sentiment = analyze_sentiment(news['headline'])
-                news['sentiment'] = sentiment
-            
-            # Clear existing news and store new ones
-            clear_success = NewsModel.clear_all_news()
-            if not clear_success:
-                logger.warning("Failed to clear existing news, but continuing...")
-            
-            insert_success = NewsModel.insert_news(news_items)
-            if not insert_success:
-                logger.error("Failed to insert news items")
+            sources = build_sources(
+                Config.NEWS_SOURCES,
+                timeout=Config.NEWS_FETCH_TIMEOUT_SECONDS,
+                max_items=Config.NEWS_MAX_ITEMS_PER_SOURCE
+            )
+            if not sources:
+                return {'success': False, 'message': 'No news sources configured'}
+
+            # All sources at once: the run takes as long as the slowest one.
+            # Unchanged sources (304 or same body) come back without items.
+            with span("news", "fetch"):
+                fetched = fetch_sources(sources, states=NewsModel.get_source_states())
+            news_items = [news for source in sources for news in fetched[source.name]['items']]
+            failed = [name for name, run in fetched.items() if run['error']]
+            unchanged = [name for name, run in fetched.items() if run.get('unchanged')]
+            logger.info(f"Fetched {len(news_items)} news items from {len(sources) - len(failed)}/{len(sources)} sources"
+                        f" ({len(unchanged)} unchanged)")
+            if len(failed) == len(sources):
+                NewsModel.record_source_runs({name: {**run, 'fetched': 0} for name, run in fetched.items()})
+                errors = '; '.join(f"{name}: {fetched[name]['error']}" for name in failed)
+                return {'success': False, 'message': f'All news sources failed: {errors}'}
+
+            with span("news", "dedupe"):
+                known_url_keys, known_simhashes = NewsModel.get_recent_fingerprints(Config.NEWS_DEDUPE_DAYS)
+                new_items = NewsService.deduplicate(news_items, known_url_keys, known_simhashes)
+
+            # Only new headlines are scored; repeats come from the sentiment cache anyway
+            with span("news", "sentiment"):
+                sentiments = analyze_sentiment_batch(news['headline'] for news in new_items)
+                for news, sentiment in zip(new_items, sentiments):
+                    news['sentiment'] = sentiment
+
+            with dependency("mongodb", "news.upsert") as store_timer:
+                stored = NewsModel.upsert_news(new_items)
+                if stored is None:
+                    store_timer.fail()
+
+            new_keys = {news['url_key'] for news in new_items}
+            runs = {}
+            for source in sources:
+                run = {key: value for key, value in fetched[source.name].items() if key != 'items'}
+                run['fetched'] = len(fetched[source.name]['items'])
+                run['new'] = sum(1 for news in fetched[source.name]['items'] if url_key(news['url']) in new_keys)
+                if stored is None and run['fetched']:
+                    # Nothing was saved, so the next run must not treat this content as seen
+                    run.update(etag=None, last_modified=None, content_hash=None)
+                runs[source.name] = run
+            NewsModel.record_source_runs(runs)
+
+            if stored is None:
+                logger.error("Failed to store news items")
                 return {
                     'success': False,
-                    'message': 'News scraped but failed to store in database',
-                    'count': len(news_items)
+                    'message': 'News fetched but failed to store in database',
+                    'count': len(new_items)
                 }
-            
+
             return {
                 'success': True,
-                'message': f'Successfully scraped and stored {len(news_items)} news items',
-                'count': len(news_items)
+                'message': f'Fetched {len(news_items)} news items, stored {stored} new',
+                'count': stored,
+                'fetched': len(news_items),
+                'duplicates': len(news_items) - len(new_items),
+                'unchanged_sources': unchanged,
+                'failed_sources': failed
             }
-            
+
         except Exception as e:
             logger.error(f"Error in scrape_and_store_news: {str(e)}")
             return {
@@ -48,9 +148,9 @@ class NewsService:
     
     @staticmethod
     def get_all_news():
-        """Get all news items from database"""
+        """Get the newest NEWS_FEED_LIMIT news items from database"""
         try:
-            return NewsModel.get_all_news()
+            return NewsModel.get_all_news(Config.NEWS_FEED_LIMIT)
         except Exception as e:
             logger.error(f"Error getting all news: {str(e)}")
             return []
@@ -1,44 +1,98 @@
-import yfinance as yf
-import pandas as pd
-import numpy as np
-try:
-    import talib
-    TALIB_AVAILABLE = True
-except ImportError:
-    TALIB_AVAILABLE = False
+from app.utils.lazy_import import lazy_import, module_available
+
+yf = lazy_import("yfinance")
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+TALIB_AVAILABLE = module_available("talib")
+if TALIB_AVAILABLE:
+    talib = lazy_import("talib")
+else:
     print("Warning: TA-Lib not available. Some technical indicators will be disabled.")
 from datetime import datetime, timedelta
 import warnings
-import os
+import json
+import hashlib
+import pytz
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import UpdateOne
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from app.models.predict_model import VCPPattern, IPOBasePattern
+from app.models.detector_config_model import DetectorConfigModel, DEFAULT_DETECTOR_PARAMS
+from app.models.ipo_registry_model import IPORegistryModel
 from app.utils.scraper_utils import ChartinkScraper
+from app.services.screener_service import UniverseScreener
+from app.utils.price_store import LocalPriceStore
+from app.config import Config
+from app.utils.metrics import span, dependency
+from app.utils.price_series import PriceSeries, as_price_series, epoch_day, rolling_mean
+from app.utils.process_pool import run_series
+from app.extensions import mongo_manager
 
 warnings.filterwarnings('ignore')
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# MongoDB Connection
-MONGO_URI = os.getenv("MONGO_URI")
-client = MongoClient(MONGO_URI)
-db = client["stocksensor"]
+# Collections (resolved on the shared client at call time, never at import)
+VCP_SAMPLE = "VCP_sample"
+IPO_BASE_SAMPLE = "IPO_Base_sample"
+VCP_RESULTS = "VCP_results"
+IPO_BASE_RESULTS = "IPO_Base_results"
+PATTERN_SCREEN_RESULTS = "pattern_screen_results"
+PREDICTED_STOCKS_SNAPSHOT = "predicted_stocks_snapshot"
+SCAN_FINGERPRINTS = "scan_fingerprints"
 
-# Collections
-VCP_sample = db["VCP_sample"]
-IPO_Base_sample = db["IPO_Base_sample"]
-VCP_results = db["VCP_results"]
-IPO_Base_results = db["IPO_Base_results"]
+# NSE session hours; bars for a day are final after the close
+MARKET_TIMEZONE = pytz.timezone("Asia/Kolkata")
+MARKET_OPEN_HOUR, MARKET_OPEN_MINUTE = 9, 15
+MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE = 15, 30
+
+# IPOPatternDetector.compute_features needs this many sessions since listing
+MIN_LISTED_SESSIONS = 40
+
+
+def get_collection(name):
+    return mongo_manager.get_collection(name)
+
+
+def is_market_open(now=None):
+    """True during a weekday NSE session (holidays are not known)"""
+    now = now or datetime.now(MARKET_TIMEZONE)
+    return now.weekday() < 5 and \
+        (MARKET_OPEN_HOUR, MARKET_OPEN_MINUTE) <= (now.hour, now.minute) < (MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE)
+
+
+def latest_session_date(now=None):
+    """Date of the most recent weekday session that has closed (holidays are not known)"""
+    now = now or datetime.now(MARKET_TIMEZONE)
+    day = now.date()
+    if (now.hour, now.minute) < (MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE):
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day.isoformat()
+
+
+def detector_params_hash(configs):
+    """Short hash of the configs a scan evaluates; changing any of them invalidates fingerprints"""
+    params = json.dumps([[c.name, c.version, c.params] for c in configs], sort_keys=True, default=str)
+    return hashlib.sha1(params.encode()).hexdigest()[:12]
 
 
 class VCPDetector:
-    def __init__(self):
-        self.min_contraction_percentage = 15  # Minimum contraction required
-        self.min_volume_contraction = 20     # Minimum volume contraction
-        self.min_pattern_length = 20         # Minimum days for pattern
-        self.max_pattern_length = 65         # Maximum days for pattern
+    """
+    Detection is split in two: compute_features() does the expensive,
+    threshold-independent work once per symbol, evaluate() applies one
+    config's thresholds to those features.
+    """
+
+    def __init__(self, params=None):
+        self.params = {**DEFAULT_DETECTOR_PARAMS["vcp"], **(params or {})}
+
+    def fingerprint_context(self, symbol):
+        """Inputs besides the bars that change the result; VCP depends on bars only"""
+        return None
 
     def get_stock_data(self, symbol, period='6mo'):
         """Fetch stock data"""
@@ -47,39 +101,49 @@ class VCPDetector:
                 symbol += '.NS'
 
             stock = yf.Ticker(symbol)
-            df = stock.history(period=period)
+            with dependency("yahoo_finance", "history"):
+                df = stock.history(period=period)
 
             if df.empty:
                 return None
 
-            # Technical indicators - only if talib is available
-            if TALIB_AVAILABLE:
-                df['SMA_20'] = talib.SMA(df['Close'], timeperiod=20)
-                df['SMA_50'] = talib.SMA(df['Close'], timeperiod=50)
-                df['RSI'] = talib.RSI(df['Close'], timeperiod=14)
-                df['ATR'] = talib.ATR(df['High'], df['Low'], df['Close'], timeperiod=14)
-            else:
-                # Fallback calculations without talib
-                df['SMA_20'] = df['Close'].rolling(window=20).mean()
-                df['SMA_50'] = df['Close'].rolling(window=50).mean()
-                # Simple RSI calculation
-                delta = df['Close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                rs = gain / loss
-                df['RSI'] = 100 - (100 / (1 + rs))
-                # Simple ATR calculation
-                high_low = df['High'] - df['Low']
-                high_close = np.abs(df['High'] - df['Close'].shift())
-                low_close = np.abs(df['Low'] - df['Close'].shift())
-                ranges = pd.concat([high_low, high_close, low_close], axis=1)
-                true_range = np.max(ranges, axis=1)
-                df['ATR'] = true_range.rolling(window=14).mean()
-
-            return df
+            return self.add_indicators(PriceSeries.from_frame(df, symbol))
         except Exception:
             return None
 
+    def add_indicators(self, df):
+        """
+        SMA/RSI/ATR columns used by the features (causal, so usable on any
+        history). Works on a PriceSeries or a DataFrame; both are updated
+        in place and returned.
+        """
+        close = np.asarray(df['Close'], dtype=np.float64)
+        high = np.asarray(df['High'], dtype=np.float64)
+        low = np.asarray(df['Low'], dtype=np.float64)
+
+        # Technical indicators - only if talib is available
+        if TALIB_AVAILABLE:
+            df['SMA_20'] = talib.SMA(close, timeperiod=20)
+            df['SMA_50'] = talib.SMA(close, timeperiod=50)
+            df['RSI'] = talib.RSI(close, timeperiod=14)
+            df['ATR'] = talib.ATR(high, low, close, timeperiod=14)
+        else:
+            # Fallback calculations without talib
+            df['SMA_20'] = rolling_mean(close, 20)
+            df['SMA_50'] = rolling_mean(close, 50)
+            # Simple RSI calculation
+            delta = np.diff(close, prepend=np.nan)
+            gain = rolling_mean(np.where(delta > 0, delta, 0.0), 14)
+            loss = rolling_mean(np.where(delta < 0, -delta, 0.0), 14)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                df['RSI'] = 100 - (100 / (1 + gain / loss))
+            # Simple ATR calculation
+            previous_close = np.concatenate([[np.nan], close[:-1]])
+            true_range = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+            df['ATR'] = rolling_mean(true_range, 14)
+
+        return df
+
     def calculate_price_contraction(self, highs, lows):
         if len(highs) < 2:
             return 0
@@ -99,79 +163,170 @@ class VCPDetector:
         return ((initial_volume - final_volume) / initial_volume) * 100
 
     def find_swing_highs_lows(self, df, window=5):
-        highs, lows, dates = [], [], []
-        for i in range(window, len(df) - window):
-            current_high = df['High'].iloc[i]
-            current_low = df['Low'].iloc[i]
-            if current_high == df['High'].iloc[i-window:i+window+1].max():
-                highs.append(current_high)
-                dates.append(df.index[i])
-            if current_low == df['Low'].iloc[i-window:i+window+1].min():
-                lows.append(current_low)
-        return highs, lows, dates
-
-    def detect_vcp_pattern(self, df):
+        """Bars that are the high (low) of their centered 2 * window + 1 bar span"""
+        high = np.asarray(df['High'], dtype=np.float64)
+        low = np.asarray(df['Low'], dtype=np.float64)
+        span = 2 * window + 1
+        if len(high) < span:
+            return [], [], []
+        # Span extremes skip NaNs like Series.max(); one span per centre row window .. n - window - 1
+        windows_high = np.lib.stride_tricks.sliding_window_view(high, span)
+        windows_low = np.lib.stride_tricks.sliding_window_view(low, span)
+        centre_high = high[window:len(high) - window]
+        centre_low = low[window:len(low) - window]
+        high_rows = np.flatnonzero(centre_high == np.fmax.reduce(windows_high, axis=1))
+        low_rows = np.flatnonzero(centre_low == np.fmin.reduce(windows_low, axis=1))
+        dates = df.index[high_rows + window]
+        return centre_high[high_rows].tolist(), centre_low[low_rows].tolist(), list(dates)
+
+    def compute_features(self, df):
+        """Measurements shared by every config (PriceSeries or frame with indicators); None when no VCP is possible"""
         if df is None or len(df) < 30:
-            return False, 0
+            return None
 
-        recent_df = df.tail(90)
-        highs, lows, dates = self.find_swing_highs_lows(recent_df)
+        # A view on the last 90 bars, no copy
+        recent = as_price_series(df).tail(90)
+        highs, lows, dates = self.find_swing_highs_lows(recent)
 
         if len(highs) < 3 or len(lows) < 3:
-            return False, 0
-
-        price_contraction = self.calculate_price_contraction(highs[-3:], lows[-3:])
-        volume_contraction = self.calculate_volume_contraction(recent_df['Volume'].values[-20:])
-
-        current_price = recent_df['Close'].iloc[-1]
-        sma_20 = recent_df['SMA_20'].iloc[-1]
-        sma_50 = recent_df['SMA_50'].iloc[-1]
+            return None
 
-        price_above_sma50 = current_price > sma_50
-        atr_contraction = (recent_df['ATR'].iloc[-1] / recent_df['ATR'].iloc[-20] - 1) * 100
+        atr = recent['ATR']
+        return {
+            "price_contraction": self.calculate_price_contraction(highs[-3:], lows[-3:]),
+            "volume_contraction": self.calculate_volume_contraction(recent['Volume'][-20:]),
+            "price_above_sma50": bool(recent['Close'][-1] > recent['SMA_50'][-1]),
+            "atr_change": (atr[-1] / atr[-20] - 1) * 100,
+            "rsi": recent['RSI'][-1],
+            "length": len(recent)
+        }
 
-        conditions = [
-            price_contraction >= self.min_contraction_percentage,
-            volume_contraction >= self.min_volume_contraction,
-            price_above_sma50,
-            atr_contraction < -10,
-            recent_df['RSI'].iloc[-1] > 40,
-            len(recent_df) >= self.min_pattern_length
-        ]
+    def compute_feature_series(self, df, window=5, lookback=90):
+        """
+        compute_features() for every row of ``df`` at once, for backtests.
+        Row t only sees bars up to t; rows where no VCP is possible are NaN.
+        """
+        n = len(df)
+        t = np.arange(n)
+        high = df['High'].to_numpy(dtype=float)
+        low = df['Low'].to_numpy(dtype=float)
+        volume = df['Volume'].to_numpy(dtype=float)
+        start = np.maximum(0, t - (lookback - 1))
+
+        # A swing point is a centered 11-bar extreme. At row t only swings whose
+        # whole window lies inside that row's lookback window count.
+        span = 2 * window + 1
+        swing_highs = np.flatnonzero(high == df['High'].rolling(span, center=True).max().to_numpy())
+        swing_lows = np.flatnonzero(low == df['Low'].rolling(span, center=True).min().to_numpy())
+
+        def last_three(swings):
+            """(first, last) of the last 3 swings visible at each row, and validity"""
+            if len(swings) == 0:
+                return t, t, np.zeros(n, dtype=bool)
+            upper = np.searchsorted(swings, t - window, side='right')
+            lower = np.searchsorted(swings, start + window, side='left')
+            valid = (upper - lower) >= 3
+            return swings[np.clip(upper - 3, 0, None)], swings[np.clip(upper - 1, 0, None)], valid
+
+        first_high, last_high, valid_highs = last_three(swing_highs)
+        first_low, last_low, valid_lows = last_three(swing_lows)
+        valid = valid_highs & valid_lows & (t + 1 >= 30)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            initial_range = high[first_high] - low[first_low]
+            final_range = high[last_high] - low[last_low]
+            price_contraction = np.where(initial_range == 0, 0.0,
+                                         (initial_range - final_range) / initial_range * 100)
+
+            volume_mean3 = df['Volume'].rolling(3).mean().to_numpy()
+            initial_volume = np.concatenate([np.full(min(17, n), np.nan), volume_mean3[:-17]])[:n]
+            volume_contraction = np.where(initial_volume == 0, 0.0,
+                                          (initial_volume - volume_mean3) / initial_volume * 100)
+
+            atr = df['ATR'].to_numpy(dtype=float)
+            atr_19_ago = np.concatenate([np.full(min(19, n), np.nan), atr[:-19]])[:n]
+            atr_change = (atr / atr_19_ago - 1) * 100
+
+            price_above_sma50 = df['Close'].to_numpy(dtype=float) > df['SMA_50'].to_numpy(dtype=float)
+
+        return {
+            "price_contraction": np.where(valid, price_contraction, np.nan),
+            "volume_contraction": np.where(valid, volume_contraction, np.nan),
+            "price_above_sma50": valid & price_above_sma50,
+            "atr_change": np.where(valid, atr_change, np.nan),
+            "rsi": np.where(valid, df['RSI'].to_numpy(dtype=float), np.nan),
+            "length": np.minimum(lookback, t + 1)
+        }
 
-        if all(conditions):
-            confidence = min(100, int((price_contraction + volume_contraction) / 2))
-            return True, confidence
-        else:
+    def evaluate_arrays(self, features, params=None):
+        """evaluate() over feature arrays; returns (detected, confidence) arrays"""
+        params = params or self.params
+        price_contraction = np.asarray(features["price_contraction"], dtype=float)
+        volume_contraction = np.asarray(features["volume_contraction"], dtype=float)
+
+        with np.errstate(invalid='ignore'):
+            detected = (
+                (price_contraction >= params["min_contraction_percentage"])
+                & (volume_contraction >= params["min_volume_contraction"])
+                & np.asarray(features["price_above_sma50"], dtype=bool)
+                & (np.asarray(features["atr_change"], dtype=float) < params["max_atr_change"])
+                & (np.asarray(features["rsi"], dtype=float) > params["min_rsi"])
+                & (np.asarray(features["length"]) >= params["min_pattern_length"])
+            )
+            confidence = np.where(detected, np.minimum(100, np.trunc((price_contraction + volume_contraction) / 2)), 0)
+        return detected, confidence.astype(int)
+
+    def evaluate(self, features, params=None):
+        """Apply one config's thresholds; returns (detected, confidence)"""
+        if features is None:
             return False, 0
+        detected, confidence = self.evaluate_arrays(features, params)
+        return bool(detected), int(confidence)
+
+    def detect_vcp_pattern(self, df):
+        return self.evaluate(self.compute_features(df))
 
 
 class IPOPatternDetector:
-    def __init__(self):
-        self.max_weeks_post_ipo = 12
-        self.min_base_weeks = 3
-        self.max_base_weeks = 12
-        self.max_depth_percent = 25
-        self.volume_surge_threshold = 1.4
-
-        # Predefined IPO dates (extendable)
-        self.ipo_dates = {
-            'ZOMATO': '2021-07-23',
-            'PAYTM': '2021-11-18',
-            'NYKAA': '2021-11-10',
-            'LICI': '2022-05-17',
-            'MOTHERSON': '2022-05-09',
-            'LATENTVIEW': '2021-11-23',
-            'DEEPAKNTR': '2021-08-23',
-            'BAJAJ-ENERGY': '2021-10-11',
-            'ROLEXRINGS': '2022-02-16',
-            'TARC': '2021-10-11'
-        }
+    """Same compute_features() / evaluate() split as VCPDetector"""
+
+    def __init__(self, params=None, listing_dates=None):
+        self.params = {**DEFAULT_DETECTOR_PARAMS["ipo_base"], **(params or {})}
+        # {symbol: listing date} overrides the IPO registry (backtests, fixtures)
+        self.listing_dates = listing_dates
+
+    @property
+    def ipo_dates(self):
+        return self.listing_dates if self.listing_dates is not None else IPORegistryModel.listing_dates()
 
     def get_ipo_date(self, symbol):
-        """Fetch IPO date from predefined list"""
-        symbol_clean = symbol.replace('.NS', '').replace('.BO', '').upper()
-        return pd.to_datetime(self.ipo_dates.get(symbol_clean)) if symbol_clean in self.ipo_dates else None
+        """Listing date from the IPO registry, None for unknown symbols"""
+        listing_date = self.ipo_dates.get(symbol.replace('.NS', '').replace('.BO', '').upper())
+        return pd.Timestamp(listing_date) if listing_date is not None else None
+
+    def listing_age_filter(self, symbols, configs, today=None):
+        """
+        Symbols whose listing age lets some config detect a base: listed at
+        least MIN_LISTED_SESSIONS sessions ago (compute_features needs that
+        much history) and no more than the largest max_weeks_post_ipo.
+        Runs before any price download.
+        """
+        today = pd.Timestamp(today or datetime.now().date())
+        max_days = max(config.params["max_weeks_post_ipo"] for config in configs) * 7 + 6
+        min_days = MIN_LISTED_SESSIONS * 7 // 5
+        eligible = []
+        for symbol in symbols:
+            ipo_date = self.get_ipo_date(symbol)
+            if ipo_date is not None and min_days <= (today - ipo_date).days <= max_days:
+                eligible.append(symbol)
+        return eligible
+
+    def fingerprint_context(self, symbol):
+        """Weeks since listing also gates detection, so it is part of the fingerprint"""
+        ipo_date = self.get_ipo_date(symbol)
+        if ipo_date is None:
+            return None
+        return (datetime.now().date() - ipo_date.date()).days // 7
 
     def get_stock_data(self, symbol):
         """Fetch stock data with fallback NSE/BO"""
@@ -181,90 +336,335 @@ class IPOPatternDetector:
             start_date = end_date - timedelta(days=400)
 
             for sym in symbols_to_try:
-                stock = yf.download(sym, start=start_date, end=end_date, progress=False)
+                # Ticker.history keeps no module-level state (unlike yf.download),
+                # so IPO scans can run in parallel with VCP scans
+                with dependency("yahoo_finance", "history"):
+                    stock = yf.Ticker(sym).history(start=start_date, end=end_date)
                 if not stock.empty and len(stock) > 30:
-                    return stock
+                    return PriceSeries.from_frame(stock, symbol)
             return None
         except Exception:
             return None
 
+    @staticmethod
+    def volume_ratio(volume, window=20):
+        """
+        Volume over its trailing ``window``-day mean (min_periods=1, NaNs
+        skipped like rolling().mean()); 1.0 where that mean is not positive
+        """
+        volume = np.asarray(volume, dtype=np.float64)
+        present = ~np.isnan(volume)
+        sums = np.cumsum(np.where(present, volume, 0.0))
+        counts = np.cumsum(present)
+        sums[window:] = sums[window:] - sums[:-window]
+        counts[window:] = counts[window:] - counts[:-window]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = sums / counts
+            return np.where(mean > 0, volume / mean, 1.0)
+
     def calculate_technical_indicators(self, df):
         """Add indicators safely"""
         df = df.copy()
         df['SMA_20'] = df['Close'].rolling(window=20, min_periods=1).mean()
         df['SMA_50'] = df['Close'].rolling(window=50, min_periods=1).mean()
         df['Volume_MA'] = df['Volume'].rolling(window=20, min_periods=1).mean()
-
-        volume_ma = df['Volume_MA'].values
-        volume = df['Volume'].values
-        ratio = np.array([volume[i] / volume_ma[i] if volume_ma[i] > 0 else 1.0 for i in range(len(volume))])
-        df['Volume_Ratio'] = ratio
+        df['Volume_Ratio'] = self.volume_ratio(df['Volume'].to_numpy())
 
         df['Daily_Return'] = df['Close'].pct_change()
         df['Volatility'] = df['Daily_Return'].rolling(window=10, min_periods=1).std()
 
         return df.dropna()
 
-    def detect_breakout(self, df, ipo_high):
-        try:
-            if len(df) < 5 or ipo_high <= 0:
-                return False, False
-            recent_data = df.tail(5)
-            current_price = df['Close'].iloc[-1]
-            price_crossed = any(recent_data['High'] > ipo_high)
-            volume_surge = False
-            if price_crossed:
-                breakout_days = recent_data[recent_data['High'] > ipo_high * 0.99]
-                if len(breakout_days) > 0:
-                    volume_surge = any(breakout_days['Volume_Ratio'] > self.volume_surge_threshold)
-            breakout_occurred = price_crossed and volume_surge
-            near_breakout = current_price >= ipo_high * 0.98
-            return breakout_occurred, near_breakout
-        except:
-            return False, False
+    def price_arrays(self, df):
+        """
+        Contiguous float64 High / Low / Close / Volume_Ratio arrays and the
+        epoch days of a PriceSeries (or frame), holding the rows
+        calculate_technical_indicators(df) would keep (its dropna loses the
+        first two rows and rows with missing bars) without building that frame
+        """
+        series = as_price_series(df)
+        high = np.asarray(series['High'], dtype=np.float64)
+        low = np.asarray(series['Low'], dtype=np.float64)
+        close = np.asarray(series['Close'], dtype=np.float64)
+        volume = np.asarray(series['Volume'], dtype=np.float64)
+        ratio = self.volume_ratio(volume)
+
+        keep = np.isfinite(high) & np.isfinite(low) & np.isfinite(close) & np.isfinite(volume)
+        if 'Open' in series:
+            keep &= np.isfinite(series['Open'])
+        keep[:2] = False
+        return {
+            "days": series.days[keep],
+            "high": np.ascontiguousarray(high[keep]),
+            "low": np.ascontiguousarray(low[keep]),
+            "close": np.ascontiguousarray(close[keep]),
+            "volume_ratio": np.ascontiguousarray(ratio[keep])
+        }
 
-    def detect_ipo_base_pattern(self, df, symbol):
-        """Core IPO base detection"""
-        if df is None or len(df) < 40:
-            return False, 0
+    def features_from_arrays(self, arrays, ipo_date, today=None):
+        """compute_features() on price_arrays() output; None when no IPO base is possible"""
+        n = len(arrays["close"])
+        if n < MIN_LISTED_SESSIONS or ipo_date is None:
+            return None
+
+        first = int(arrays["days"].searchsorted(epoch_day(ipo_date), side='left'))
+        if n - first < 20:
+            return None
+
+        high, low, close = arrays["high"], arrays["low"], arrays["close"]
+        # argmax is the first occurrence, like idxmax
+        high_row = first + int(np.argmax(high[first:]))
+        ipo_high = high[high_row]
+        if n - high_row < 15:
+            return None
+
+        today = today or datetime.now().date()
+        features = {
+            "weeks_since_ipo": (today - ipo_date.date()).days // 7,
+            "consolidation_weeks": (n - high_row) // 5,
+            "depth_percent": float((ipo_high - low[high_row:].min()) / ipo_high * 100),
+            "price_crossed": False,
+            "breakout_volume_ratio": 0.0,
+            "near_breakout": False
+        }
+
+        # Price/volume behaviour around the IPO high over the last 5 sessions
+        if ipo_high > 0:
+            recent_high = high[-5:]
+            crossed = recent_high > ipo_high
+            if crossed.any():
+                features["price_crossed"] = True
+                breakout_days = recent_high > ipo_high * 0.99
+                features["breakout_volume_ratio"] = float(arrays["volume_ratio"][-5:][breakout_days].max())
+            features["near_breakout"] = bool(close[-1] >= ipo_high * 0.98)
+        return features
+
+    def compute_features(self, df, symbol):
+        """Measurements shared by every config from raw bars (PriceSeries or frame); None when no IPO base is possible"""
+        if df is None or len(df) < MIN_LISTED_SESSIONS:
+            return None
+        return self.features_for_listing(df, self.get_ipo_date(symbol))
 
+    def features_for_listing(self, df, ipo_date):
+        """compute_features() with the listing date given, so process pool workers need no registry"""
+        if df is None or len(df) < MIN_LISTED_SESSIONS or ipo_date is None:
+            return None
+        return self.features_from_arrays(self.price_arrays(df), ipo_date)
+
+    def compute_features_batch(self, frames):
+        """
+        compute_features() for {symbol: raw bars} at once, stacked into one
+        array per feature (NaN / False where no base is possible) so that
+        evaluate_arrays() judges every symbol in a single call.
+        Returns (symbols, features).
+        """
+        symbols = list(frames)
+        n = len(symbols)
+        features = {
+            "weeks_since_ipo": np.full(n, np.nan),
+            "consolidation_weeks": np.full(n, np.nan),
+            "depth_percent": np.full(n, np.nan),
+            "price_crossed": np.zeros(n, dtype=bool),
+            "breakout_volume_ratio": np.zeros(n),
+            "near_breakout": np.zeros(n, dtype=bool)
+        }
+        today = datetime.now().date()
+        for row, symbol in enumerate(symbols):
+            df = frames[symbol]
+            if df is None or len(df) < MIN_LISTED_SESSIONS:
+                continue
+            ipo_date = self.get_ipo_date(symbol)
+            if ipo_date is None:
+                continue
+            single = self.features_from_arrays(self.price_arrays(df), ipo_date, today)
+            if single is not None:
+                for name, value in single.items():
+                    features[name][row] = value
+        return symbols, features
+
+    def compute_feature_series(self, df, symbol):
+        """
+        compute_features() for every row of ``df`` at once, for backtests.
+        Row t only sees bars up to t and is evaluated as of that row's date.
+        """
+        n = len(df)
+        t = np.arange(n)
+        features = {
+            "weeks_since_ipo": np.full(n, np.nan),
+            "consolidation_weeks": np.full(n, np.nan),
+            "depth_percent": np.full(n, np.nan),
+            "price_crossed": np.zeros(n, dtype=bool),
+            "breakout_volume_ratio": np.zeros(n),
+            "near_breakout": np.zeros(n, dtype=bool)
+        }
         ipo_date = self.get_ipo_date(symbol)
-        if ipo_date is None:
+        if ipo_date is None or n == 0:
+            return features
+
+        dates = df.index
+        first = int(dates.searchsorted(ipo_date, side='left'))
+        if first >= n:
+            return features
+
+        high = df['High'].to_numpy(dtype=float)
+        low = df['Low'].to_numpy(dtype=float)
+        close = df['Close'].to_numpy(dtype=float)
+        volume_ratio = df['Volume_Ratio'].to_numpy(dtype=float)
+
+        # Running post-IPO high and the (first) row it was set on
+        post_high = high[first:]
+        running_high = np.maximum.accumulate(post_high)
+        new_high = np.concatenate([[True], post_high[1:] > running_high[:-1]])
+        high_row = np.maximum.accumulate(np.where(new_high, np.arange(len(post_high)), 0))
+
+        ipo_high = np.full(n, np.nan)
+        ipo_high[first:] = running_high
+        ipo_high_row = np.full(n, n)
+        ipo_high_row[first:] = first + high_row
+        # Lowest low since the post-IPO high, restarting whenever a new high is set
+        low_since_high = np.full(n, np.nan)
+        low_since_high[first:] = pd.Series(low[first:]).groupby(high_row).cummin().to_numpy()
+
+        valid = (t + 1 >= MIN_LISTED_SESSIONS) & (t - first + 1 >= 20) & (t - ipo_high_row + 1 >= 15)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            days_listed = (dates.normalize() - ipo_date).days.to_numpy()
+            features["weeks_since_ipo"] = np.where(valid, days_listed // 7, np.nan)
+            features["consolidation_weeks"] = np.where(valid, (t - ipo_high_row + 1) // 5, np.nan)
+            features["depth_percent"] = np.where(valid, (ipo_high - low_since_high) / ipo_high * 100, np.nan)
+
+            # Breakout over the last 5 sessions of each row, against that row's IPO high
+            if n >= 5:
+                windows_high = np.lib.stride_tricks.sliding_window_view(high, 5)
+                windows_ratio = np.lib.stride_tricks.sliding_window_view(volume_ratio, 5)
+                row_high = ipo_high[4:, None]
+                crossed = (windows_high > row_high).any(axis=1)
+                breakout_days = windows_high > row_high * 0.99
+                ratio = np.where(breakout_days, windows_ratio, -np.inf).max(axis=1)
+                positive = ipo_high[4:] > 0
+                features["price_crossed"][4:] = valid[4:] & positive & crossed
+                features["breakout_volume_ratio"][4:] = np.where(valid[4:] & positive & crossed, ratio, 0.0)
+                features["near_breakout"][4:] = valid[4:] & positive & (close[4:] >= ipo_high[4:] * 0.98)
+
+        return features
+
+    def evaluate_arrays(self, features, params=None):
+        """evaluate() over feature arrays; returns (detected, confidence) arrays"""
+        params = params or self.params
+        weeks_since_ipo = np.asarray(features["weeks_since_ipo"], dtype=float)
+        consolidation_weeks = np.asarray(features["consolidation_weeks"], dtype=float)
+        depth_percent = np.asarray(features["depth_percent"], dtype=float)
+
+        with np.errstate(invalid='ignore'):
+            in_base = (params["min_base_weeks"] <= consolidation_weeks) & (consolidation_weeks <= params["max_base_weeks"])
+            shallow = depth_percent <= params["max_depth_percent"]
+            qualifies = (weeks_since_ipo <= params["max_weeks_post_ipo"]) & in_base & shallow
+
+            breakout = (np.asarray(features["price_crossed"], dtype=bool)
+                        & (np.asarray(features["breakout_volume_ratio"], dtype=float) > params["volume_surge_threshold"]))
+            near_breakout = np.asarray(features["near_breakout"], dtype=bool)
+
+            confidence = (
+                20 * ((1 <= weeks_since_ipo) & (weeks_since_ipo <= 12))
+                + 20 * in_base
+                + 20 * shallow
+                + np.where(breakout, 30, np.where(near_breakout, 15, 0))
+            )
+            confidence = np.where(qualifies, np.minimum(confidence, 100), 0)
+        return qualifies & (confidence >= params["min_confidence"]), confidence.astype(int)
+
+    def evaluate(self, features, params=None):
+        """Apply one config's thresholds; returns (detected, confidence)"""
+        if features is None:
             return False, 0
+        detected, confidence = self.evaluate_arrays(features, params)
+        return bool(detected), int(confidence)
 
-        post_ipo_data = df[df.index >= ipo_date]
-        if len(post_ipo_data) < 20:
-            return False, 0
+    def detect_ipo_base_pattern(self, df, symbol):
+        """Core IPO base detection on raw OHLCV bars"""
+        return self.evaluate(self.compute_features(df, symbol))
 
-        weeks_since_ipo = (datetime.now().date() - ipo_date.date()).days // 7
-        if weeks_since_ipo > self.max_weeks_post_ipo:
-            return False, 0
 
-        ipo_high = post_ipo_data['High'].max()
-        ipo_high_date = post_ipo_data['High'].idxmax()
-        post_high_data = post_ipo_data[post_ipo_data.index >= ipo_high_date]
-        if len(post_high_data) < 15:
-            return False, 0
+def vcp_features_task(series):
+    """Process pool entry point for VCP features (they do not depend on thresholds)"""
+    return VCPDetector().compute_features(series)
 
-        consolidation_weeks = len(post_high_data) // 5
-        if not (self.min_base_weeks <= consolidation_weeks <= self.max_base_weeks):
-            return False, 0
 
-        depth_percent = ((ipo_high - post_high_data['Low'].min()) / ipo_high) * 100
-        if depth_percent > self.max_depth_percent:
-            return False, 0
+def ipo_features_task(series, ipo_date):
+    """Process pool entry point for IPO Base features; the listing date comes from the parent"""
+    return IPOPatternDetector(listing_dates={}).features_for_listing(series, ipo_date)
 
-        breakout, near_breakout = self.detect_breakout(df, ipo_high)
 
-        confidence = 0
-        if 1 <= weeks_since_ipo <= 12: confidence += 20
-        if self.min_base_weeks <= consolidation_weeks <= self.max_base_weeks: confidence += 20
-        if depth_percent <= self.max_depth_percent: confidence += 20
-        if breakout: confidence += 30
-        elif near_breakout: confidence += 15
+class ScanFingerprints:
+    """
+    Per-symbol record of what a scan last evaluated: the date of the last
+    bar plus a hash of the detector configs. A symbol whose fingerprint is
+    unchanged would produce the same results, so the scan skips it.
+    """
 
-        confidence = min(confidence, 100)
-        return (confidence >= 70), confidence
+    def __init__(self, scan, detector, configs, force=False):
+        self.scan = scan
+        self.detector = detector
+        self.params_hash = detector_params_hash(configs)
+        self.session = latest_session_date()
+        self._stored = {} if force else {
+            doc["symbol"]: doc for doc in get_collection(SCAN_FINGERPRINTS).find({"scan": scan})
+        }
+        self._pending = []
+
+    @staticmethod
+    def last_bar_date(df):
+        """Date of the last bar of a PriceSeries or frame"""
+        return pd.Timestamp(df.index[-1]).date().isoformat()
+
+    def _matches(self, symbol, last_bar=None):
+        stored = self._stored.get(symbol)
+        if stored is None:
+            return False
+        if stored.get("params_hash") != self.params_hash:
+            return False
+        if stored.get("context") != self.detector.fingerprint_context(symbol):
+            return False
+        if last_bar is None:
+            # Without fetching we only know the bars are unchanged if the
+            # last evaluation already covered the latest closed session
+            return stored.get("last_bar", "") >= self.session
+        return stored.get("last_bar") == last_bar
+
+    def is_current(self, symbol):
+        """True if the symbol can be skipped without downloading its bars"""
+        return self._matches(symbol)
+
+    def is_unchanged(self, symbol, df):
+        """True if freshly downloaded bars end on the same day as last time"""
+        return self._matches(symbol, self.last_bar_date(df))
+
+    def detected_configs(self, symbol):
+        """Names of the configs that detected the pattern at the last evaluation"""
+        return self._stored.get(symbol, {}).get("detected", [])
+
+    def record(self, symbol, df, detected_configs):
+        # A bar of a session that has not closed yet is partial: record the
+        # last closed session instead, so the post-close scan re-evaluates it
+        last_bar = min(self.last_bar_date(df), self.session)
+        self._pending.append(UpdateOne(
+            {"_id": f"{self.scan}:{symbol}"},
+            {"$set": {
+                "scan": self.scan,
+                "symbol": symbol,
+                "last_bar": last_bar,
+                "params_hash": self.params_hash,
+                "context": self.detector.fingerprint_context(symbol),
+                "detected": detected_configs,
+                "evaluated_at": datetime.utcnow()
+            }},
+            upsert=True
+        ))
+
+    def flush(self):
+        if self._pending:
+            get_collection(SCAN_FINGERPRINTS).bulk_write(self._pending, ordered=False)
+            self._pending = []
 
 
 class PredictService:
@@ -272,137 +672,263 @@ class PredictService:
         self.vcp_detector = VCPDetector()
         self.ipo_detector = IPOPatternDetector()
 
-    def run_stock_scraping(self):
-        """Run Chartink stock scraping"""
+    def refresh_price_store(self):
+        """Append the latest bars to the local price store the universe screen reads"""
+        if Config.SCREENER_SOURCE.lower() != "universe":
+            return {"success": True, "message": "Universe screen disabled, price store not refreshed"}
+        store = LocalPriceStore()
+        with span("price_store", "refresh") as timer:
+            result = store.refresh()
+            if result["failed"] and not result["updated"]:
+                timer.fail()
+        if result["failed"]:
+            logger.warning(f"No new bars for {len(result['failed'])} stored symbols")
+        return {
+            # An empty store is not a failure: the screen falls back to Chartink
+            "success": bool(result["updated"]) or not result["failed"],
+            "message": f"Refreshed {len(result['updated'])} of "
+                       f"{len(result['updated']) + len(result['failed'])} stored symbols",
+        }
+
+    def run_stock_scraping(self, source=None):
+        """
+        Fill VCP_sample / IPO_Base_sample. SCREENER_SOURCE 'universe' screens
+        the local price store (see UniverseScreener) and falls back to the
+        Chartink scrape while the store is empty or stale; 'chartink' always
+        scrapes.
+        """
+        source = (source or Config.SCREENER_SOURCE).lower()
+        if source == "universe":
+            try:
+                with span("universe_screen", "total") as timer:
+                    result = UniverseScreener().run()
+                    if not result["success"]:
+                        timer.fail()
+                if result["success"]:
+                    return result
+                logger.warning(f"Universe screen unavailable ({result['message']}), scraping Chartink instead")
+            except Exception as e:
+                logger.error(f"Error in universe screen, scraping Chartink instead: {str(e)}")
+
         try:
             logger.info("Starting Chartink stock scraping...")
-            scraper = ChartinkScraper()
-            scraper.run_scraping()
+            with span("chartink", "total"):
+                scraper = ChartinkScraper()
+                scraper.run_scraping()
             logger.info("Chartink stock scraping completed successfully")
             return {"success": True, "message": "Stock scraping completed"}
         except Exception as e:
             logger.error(f"Error in stock scraping: {str(e)}")
             return {"success": False, "message": f"Stock scraping failed: {str(e)}"}
 
-    def run_vcp_analysis(self):
-        """Run VCP pattern analysis"""
+    @staticmethod
+    def _get_stock_info(symbol):
+        """Name and sector from Yahoo Finance"""
+        stock = yf.Ticker(symbol + ".NS" if not symbol.endswith(('.NS', '.BO')) else symbol)
+        with dependency("yahoo_finance", "info"):
+            info = stock.info
+        return info.get("longName", symbol), info.get("sector", "Unknown")
+
+    def _run_pattern_scan(self, pattern, label, sample_collection, results_collection,
+                          detector, feature_task, force=False, prefilter=None):
+        """
+        Evaluate every active config of ``pattern`` against the sample symbols.
+        Price data and features are computed once per symbol and shared by all
+        configs. The default config writes ``results_collection`` as before;
+        the other configs write PATTERN_SCREEN_RESULTS tagged with their name.
+        ``prefilter(symbols, configs)`` drops symbols no config could detect
+        before any price data is fetched. Bars are downloaded by
+        SCAN_FETCH_WORKERS threads; ``feature_task(symbol)`` returns the
+        (picklable function, extra args) that computes a symbol's features
+        from its PriceSeries in the process pool.
+        """
+        component = f"{pattern}_scan"
+        with span(component, "total") as timer:
+            result = self._scan_symbols(pattern, label, sample_collection, results_collection,
+                                        detector, feature_task, force, component, prefilter)
+            if not result["success"]:
+                timer.fail()
+        return result
+
+    def _scan_symbols(self, pattern, label, sample_collection, results_collection,
+                      detector, feature_task, force, component, prefilter=None):
         try:
-            logger.info("Starting VCP pattern analysis...")
+            logger.info(f"Starting {label} pattern analysis...")
             
-            symbols = VCP_sample.distinct("symbol")
+            symbols = get_collection(sample_collection).distinct("symbol")
             if not symbols:
-                logger.warning("No stocks found in VCP_sample collection")
-                return {"success": False, "message": "No stocks found for VCP analysis"}
-
-            detected_count = 0
+                logger.warning(f"No stocks found in {sample_collection} collection")
+                return {"success": False, "message": f"No stocks found for {label} analysis"}
+
+            configs = DetectorConfigModel.get_active(pattern)
+            default_config = configs[0]
+            sampled = len(symbols)
+            if prefilter:
+                symbols = prefilter(symbols, configs)
+                logger.info(f"{label}: {len(symbols)} of {sampled} symbols pass the pre-filter")
+            # Current prices from the sample collection, one query for all symbols
+            prices = {doc["symbol"]: doc.get("price", 0)
+                      for doc in get_collection(sample_collection).find({}, {"symbol": 1, "price": 1})}
+            fingerprints = ScanFingerprints(pattern, detector, configs, force=force)
+
+            detected_counts = {config.name: 0 for config in configs}
+            skipped = {}
+            result_updates, screen_updates = [], []
+            to_fetch = []
             for symbol in symbols:
+                if fingerprints.is_current(symbol):
+                    skipped[symbol] = fingerprints.detected_configs(symbol)
+                else:
+                    to_fetch.append(symbol)
+
+            # Downloads overlap in threads; each symbol's features start in the
+            # process pool as soon as its bars arrive
+            feature_jobs = {}
+            with ThreadPoolExecutor(max_workers=max(1, Config.SCAN_FETCH_WORKERS),
+                                    thread_name_prefix=f"{pattern}-fetch") as fetchers:
+                downloads = {fetchers.submit(detector.get_stock_data, symbol): symbol for symbol in to_fetch}
+                for download in as_completed(downloads):
+                    symbol = downloads[download]
+                    try:
+                        df = download.result()
+                        if df is None:
+                            continue
+                        if fingerprints.is_unchanged(symbol, df):
+                            skipped[symbol] = fingerprints.detected_configs(symbol)
+                            continue
+                        func, args = feature_task(symbol)
+                        feature_jobs[symbol] = (df, run_series(func, df, *args))
+                    except Exception as e:
+                        logger.error(f"Error preparing {label} analysis for {symbol}: {e}")
+
+            for symbol, (df, job) in feature_jobs.items():
                 try:
-                    df = self.vcp_detector.get_stock_data(symbol)
-                    if df is None:
-                        continue
-
-                    detected, confidence = self.vcp_detector.detect_vcp_pattern(df)
-
-                    if detected:
-                        # Get stock info from Yahoo Finance
-                        stock = yf.Ticker(symbol + ".NS" if not symbol.endswith(('.NS', '.BO')) else symbol)
-                        info = stock.info
-                        stock_name = info.get("longName", symbol)
-                        sector = info.get("sector", "Unknown")
-                        
-                        # Get current price from VCP_sample collection
-                        sample_data = VCP_sample.find_one({"symbol": symbol})
-                        current_price = sample_data.get("price", 0) if sample_data else 0
-
-                        VCP_results.update_one(
-                            {"symbol": symbol},
-                            {"$set": {
-                                "is_detected": "Yes",
-                                "symbol": symbol,
-                                "stock_name": stock_name,
-                                "sector": sector,
-                                "confidence": f"{confidence}%",
-                                "current_price": current_price,
-                                "timestamp": datetime.now()
-                            }},
+                    # Every config judges the same features; only thresholds differ
+                    with span(component, "features"):
+                        features = job.result()
+                    with span(component, "evaluate"):
+                        outcomes = {config.name: detector.evaluate(features, config.params) for config in configs}
+                    detected_names = [name for name, (detected, _) in outcomes.items() if detected]
+                    fingerprints.record(symbol, df, detected_names)
+
+                    current_price = prices.get(symbol, 0)
+                    stock_name, sector = self._get_stock_info(symbol) if detected_names else (symbol, "Unknown")
+                    now = datetime.now()
+
+                    for config in configs:
+                        detected, confidence = outcomes[config.name]
+                        if detected:
+                            detected_counts[config.name] += 1
+
+                        if config is default_config:
+                            if detected:
+                                result_updates.append(UpdateOne(
+                                    {"symbol": symbol},
+                                    {"$set": {
+                                        "is_detected": "Yes",
+                                        "symbol": symbol,
+                                        "stock_name": stock_name,
+                                        "sector": sector,
+                                        "confidence": f"{confidence}%",
+                                        "current_price": current_price,
+                                        "timestamp": now
+                                    }},
+                                    upsert=True
+                                ))
+                                logger.info(f"{label} Pattern detected for {symbol} - {confidence}% confidence, Price: ₹{current_price}")
+                            continue
+
+                        screen_fields = {
+                            "pattern": pattern,
+                            "config": config.name,
+                            "config_version": config.version,
+                            "symbol": symbol,
+                            "is_detected": "Yes" if detected else "No",
+                            "confidence": f"{confidence}%",
+                            "current_price": current_price,
+                            "timestamp": now
+                        }
+                        if detected:
+                            screen_fields.update({"stock_name": stock_name, "sector": sector})
+                        screen_updates.append(UpdateOne(
+                            {"pattern": pattern, "config": config.name, "symbol": symbol},
+                            {"$set": screen_fields},
                             upsert=True
-                        )
-                        detected_count += 1
-                        logger.info(f"VCP Pattern detected for {symbol} - {confidence}% confidence, Price: ₹{current_price}")
+                        ))
 
                 except Exception as e:
-                    logger.error(f"Error analyzing VCP for {symbol}: {e}")
+                    logger.error(f"Error analyzing {label} for {symbol}: {e}")
                     continue
 
-            logger.info(f"VCP analysis completed. Detected {detected_count} patterns.")
-            return {"success": True, "message": f"VCP analysis completed. Detected {detected_count} patterns."}
-
-        except Exception as e:
-            logger.error(f"Error in VCP analysis: {str(e)}")
-            return {"success": False, "message": f"VCP analysis failed: {str(e)}"}
-
-    def run_ipo_analysis(self):
-        """Run IPO Base pattern analysis"""
-        try:
-            logger.info("Starting IPO Base pattern analysis...")
-            
-            symbols = IPO_Base_sample.distinct("symbol")
-            if not symbols:
-                logger.warning("No stocks found in IPO_Base_sample collection")
-                return {"success": False, "message": "No stocks found for IPO analysis"}
-
-            detected_count = 0
-            for symbol in symbols:
-                try:
-                    df = self.ipo_detector.get_stock_data(symbol)
-                    if df is None:
+            with dependency("mongodb", f"{component}.write"):
+                if result_updates:
+                    get_collection(results_collection).bulk_write(result_updates, ordered=False)
+                if screen_updates:
+                    get_collection(PATTERN_SCREEN_RESULTS).bulk_write(screen_updates, ordered=False)
+                fingerprints.flush()
+
+            # Skipped symbols keep their earlier detections; only the scraped price may have moved
+            price_updates = {results_collection: [], PATTERN_SCREEN_RESULTS: []}
+            for symbol, detected_names in skipped.items():
+                price = prices.get(symbol, 0)
+                for name in detected_names:
+                    if name not in detected_counts:
                         continue
-
-                    df = self.ipo_detector.calculate_technical_indicators(df)
-                    detected, confidence = self.ipo_detector.detect_ipo_base_pattern(df, symbol)
-
-                    if detected:
-                        # Get stock info from Yahoo Finance
-                        stock = yf.Ticker(symbol + ".NS" if not symbol.endswith(('.NS', '.BO')) else symbol)
-                        info = stock.info
-                        stock_name = info.get("longName", symbol)
-                        sector = info.get("sector", "Unknown")
-                        
-                        # Get current price from IPO_Base_sample collection
-                        sample_data = IPO_Base_sample.find_one({"symbol": symbol})
-                        current_price = sample_data.get("price", 0) if sample_data else 0
-
-                        IPO_Base_results.update_one(
-                            {"symbol": symbol},
-                            {"$set": {
-                                "is_detected": "Yes",
-                                "symbol": symbol,
-                                "stock_name": stock_name,
-                                "sector": sector,
-                                "confidence": f"{confidence}%",
-                                "current_price": current_price,
-                                "timestamp": datetime.now()
-                            }},
-                            upsert=True
-                        )
-                        detected_count += 1
-                        logger.info(f"IPO Base Pattern detected for {symbol} - {confidence}% confidence, Price: ₹{current_price}")
-
-                except Exception as e:
-                    logger.error(f"Error analyzing IPO Base for {symbol}: {e}")
-                    continue
-
-            logger.info(f"IPO Base analysis completed. Detected {detected_count} patterns.")
-            return {"success": True, "message": f"IPO Base analysis completed. Detected {detected_count} patterns."}
+                    detected_counts[name] += 1
+                    if name == default_config.name:
+                        collection, query = results_collection, {"symbol": symbol}
+                    else:
+                        collection, query = PATTERN_SCREEN_RESULTS, {"pattern": pattern, "config": name, "symbol": symbol}
+                    price_updates[collection].append(UpdateOne(
+                        {**query, "current_price": {"$ne": price}},
+                        {"$set": {"current_price": price}}
+                    ))
+            with dependency("mongodb", f"{component}.price_refresh"):
+                for collection, updates in price_updates.items():
+                    if updates:
+                        get_collection(collection).bulk_write(updates, ordered=False)
+
+            detected_count = detected_counts[default_config.name]
+            message = (f"{label} analysis completed. Detected {detected_count} patterns, "
+                       f"skipped {len(skipped)} unchanged symbols"
+                       + (f" and {sampled - len(symbols)} filtered out." if prefilter else "."))
+            logger.info(f"{message} Screens: {detected_counts}")
+            return {
+                "success": True,
+                "message": message,
+                "detected": detected_count,
+                "skipped": len(skipped),
+                "prefiltered": sampled - len(symbols),
+                "configs": {config.name: {"version": config.version, "detected": detected_counts[config.name]}
+                            for config in configs}
+            }
 
         except Exception as e:
-            logger.error(f"Error in IPO Base analysis: {str(e)}")
-            return {"success": False, "message": f"IPO Base analysis failed: {str(e)}"}
+            logger.error(f"Error in {label} analysis: {str(e)}")
+            return {"success": False, "message": f"{label} analysis failed: {str(e)}"}
+
+    def run_vcp_analysis(self, force=False):
+        """Run VCP pattern analysis for every active config; unchanged symbols are skipped unless forced"""
+        return self._run_pattern_scan(
+            "vcp", "VCP", VCP_SAMPLE, VCP_RESULTS, self.vcp_detector,
+            lambda symbol: (vcp_features_task, ()),
+            force=force
+        )
+
+    def run_ipo_analysis(self, force=False):
+        """Run IPO Base pattern analysis for every active config; unchanged symbols are skipped unless forced"""
+        return self._run_pattern_scan(
+            "ipo_base", "IPO Base", IPO_BASE_SAMPLE, IPO_BASE_RESULTS, self.ipo_detector,
+            lambda symbol: (ipo_features_task, (self.ipo_detector.get_ipo_date(symbol),)),
+            force=force,
+            # Only recent listings can form an IPO base; skip the rest before downloading prices
+            prefilter=self.ipo_detector.listing_age_filter
+        )
 
     def get_vcp_results(self):
         """Get VCP pattern detection results"""
         try:
-            results = list(VCP_results.find({"is_detected": "Yes"}))
+            results = list(get_collection(VCP_RESULTS).find({"is_detected": "Yes"}))
             return {"success": True, "data": results}
         except Exception as e:
             logger.error(f"Error fetching VCP results: {str(e)}")
@@ -411,17 +937,27 @@ class PredictService:
     def get_ipo_results(self):
         """Get IPO Base pattern detection results"""
         try:
-            results = list(IPO_Base_results.find({"is_detected": "Yes"}))
+            results = list(get_collection(IPO_BASE_RESULTS).find({"is_detected": "Yes"}))
             return {"success": True, "data": results}
         except Exception as e:
             logger.error(f"Error fetching IPO results: {str(e)}")
             return {"success": False, "message": f"Error fetching IPO results: {str(e)}"}
 
+    def get_screen_results(self, pattern, config):
+        """Detections of a non-default detector config"""
+        try:
+            results = list(get_collection(PATTERN_SCREEN_RESULTS).find(
+                {"pattern": pattern, "config": config, "is_detected": "Yes"}, {"_id": 0}))
+            return {"success": True, "data": results}
+        except Exception as e:
+            logger.error(f"Error fetching {pattern} screen results for {config}: {str(e)}")
+            return {"success": False, "message": f"Error fetching screen results: {str(e)}"}
+
     def get_scraped_stocks(self):
         """Get scraped stock data"""
         try:
-            vcp_stocks = list(VCP_sample.find())
-            ipo_stocks = list(IPO_Base_sample.find())
+            vcp_stocks = list(get_collection(VCP_SAMPLE).find())
+            ipo_stocks = list(get_collection(IPO_BASE_SAMPLE).find())
             return {
                 "success": True, 
                 "data": {
@@ -432,3 +968,90 @@ class PredictService:
         except Exception as e:
             logger.error(f"Error fetching scraped stocks: {str(e)}")
             return {"success": False, "message": f"Error fetching scraped stocks: {str(e)}"}
+
+    @staticmethod
+    def _transform_pattern_results(results, setup):
+        """Shape stored pattern results for the frontend PredictedStocksSection"""
+        transformed = []
+        for stock in results:
+            # Extract confidence percentage
+            confidence_str = stock.get('confidence', '0%')
+            confidence = int(confidence_str.replace('%', '')) if isinstance(confidence_str, str) else 0
+            
+            # Calculate target return based on confidence
+            if confidence >= 80:
+                target_return = "8-12%"
+            elif confidence >= 60:
+                target_return = "6-10%"
+            else:
+                target_return = "4-8%"
+            
+            transformed.append({
+                "id": str(stock.get('_id', len(transformed) + 1)),
+                "symbol": stock.get('symbol', ''),
+                "name": stock.get('stock_name', ''),
+                "price": stock.get('current_price', 0),  # Use current_price from database
+                "setup": setup,
+                "sector": stock.get('sector', 'Unknown'),
+                "targetReturn": target_return,
+                "confidence": confidence,
+                "original_data": stock
+            })
+        return transformed
+
+    def build_predicted_stocks(self):
+        """Combine VCP and IPO Base results, highest confidence first"""
+        vcp_result = self.get_vcp_results()
+        ipo_result = self.get_ipo_results()
+        if not vcp_result['success'] or not ipo_result['success']:
+            return {"success": False, "message": "Failed to fetch pattern results"}
+
+        transformed_vcp = self._transform_pattern_results(vcp_result['data'], "VCP")
+        transformed_ipo = self._transform_pattern_results(ipo_result['data'], "IPO Base")
+
+        all_stocks = transformed_vcp + transformed_ipo
+        all_stocks.sort(key=lambda x: x['confidence'], reverse=True)
+        return {
+            "success": True,
+            "data": all_stocks,
+            "vcp_count": len(transformed_vcp),
+            "ipo_count": len(transformed_ipo)
+        }
+
+    def publish_predicted_stocks_snapshot(self):
+        """Store the combined predicted-stocks list so reads skip the transform"""
+        try:
+            result = self.build_predicted_stocks()
+            if not result['success']:
+                return result
+            get_collection(PREDICTED_STOCKS_SNAPSHOT).replace_one(
+                {"_id": "latest"},
+                {
+                    "_id": "latest",
+                    "data": result['data'],
+                    "vcp_count": result['vcp_count'],
+                    "ipo_count": result['ipo_count'],
+                    "published_at": datetime.utcnow()
+                },
+                upsert=True
+            )
+            logger.info(f"Published predicted stocks snapshot with {len(result['data'])} stocks")
+            return {"success": True, "message": f"Published {len(result['data'])} predicted stocks"}
+        except Exception as e:
+            logger.error(f"Error publishing predicted stocks snapshot: {str(e)}")
+            return {"success": False, "message": f"Error publishing predicted stocks snapshot: {str(e)}"}
+
+    def get_predicted_stocks(self):
+        """Latest published snapshot, falling back to building it live"""
+        try:
+            snapshot = get_collection(PREDICTED_STOCKS_SNAPSHOT).find_one({"_id": "latest"})
+            if snapshot:
+                return {
+                    "success": True,
+                    "data": snapshot['data'],
+                    "vcp_count": snapshot['vcp_count'],
+                    "ipo_count": snapshot['ipo_count']
+                }
+        except Exception as e:
+            logger.error(f"Error reading predicted stocks snapshot: {str(e)}")
+        return self.build_predicted_stocks()
@@ -0,0 +1,188 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta, timezone
+import time
+import threading
+import logging
+from app.config import Config
+from app.extensions import mongo
+from app.models.report_demand_model import ReportDemandModel
+from app.models.watchlist_model import WatchlistModel
+from app.services.stock_analysis_service import StockAnalysisService
+from app.utils.metrics import span, dependency
+
+logger = logging.getLogger(__name__)
+
+# Shown by /api/stocks/popular until there is enough demand to rank, and used to pad short rankings
+DEFAULT_POPULAR_STOCKS = [
+    {'symbol': 'TCS', 'name': 'Tata Consultancy Services Limited', 'sector': 'Technology'},
+    {'symbol': 'RELIANCE', 'name': 'Reliance Industries Limited', 'sector': 'Oil & Gas'},
+    {'symbol': 'INFY', 'name': 'Infosys Limited', 'sector': 'Technology'},
+    {'symbol': 'HDFC', 'name': 'HDFC Bank Limited', 'sector': 'Banks'},
+    {'symbol': 'ITC', 'name': 'ITC Limited', 'sector': 'FMCG'},
+    {'symbol': 'ICICIBANK', 'name': 'ICICI Bank Limited', 'sector': 'Banks'},
+    {'symbol': 'HINDUNILVR', 'name': 'Hindustan Unilever Limited', 'sector': 'FMCG'},
+    {'symbol': 'SBIN', 'name': 'State Bank of India', 'sector': 'Banks'},
+    {'symbol': 'BHARTIARTL', 'name': 'Bharti Airtel Limited', 'sector': 'Telecom'},
+    {'symbol': 'AXISBANK', 'name': 'Axis Bank Limited', 'sector': 'Banks'}
+]
+
+
+def bare_symbol(symbol):
+    return symbol.replace(".NS", "").replace(".BO", "")
+
+
+class ReportWarmingService:
+    """
+    Regenerates stock reports ahead of demand. Symbols are ranked by recent
+    report requests plus WATCHLIST_FOLLOWER_WEIGHT per watchlist following
+    them; the top REPORT_WARM_TOP_K whose cached report predates the last
+    market close are regenerated, REPORT_WARM_WORKERS at a time, until
+    REPORT_WARM_BUDGET_SECONDS runs out. Generations also hold the shared
+    report slots, so warming never takes more than its share of the
+    browsers and CPU that user requests need.
+    """
+
+    _popular_cache = None
+    _popular_cached_at = 0.0
+    _popular_lock = threading.Lock()
+
+    @staticmethod
+    def rank_symbols(limit=None):
+        """[{'symbol', 'requests', 'followers', 'score'}], highest score first"""
+        ReportDemandModel.flush()
+        with dependency("mongodb", "report_demand.aggregate"):
+            requests = dict(ReportDemandModel.top_symbols())
+        with dependency("mongodb", "watchlists.aggregate"):
+            followers = dict(WatchlistModel.follower_counts())
+
+        ranked = [{
+            "symbol": symbol,
+            "requests": requests.get(symbol, 0),
+            "followers": followers.get(symbol, 0),
+            "score": requests.get(symbol, 0) + Config.WATCHLIST_FOLLOWER_WEIGHT * followers.get(symbol, 0)
+        } for symbol in requests.keys() | followers.keys()]
+        ranked.sort(key=lambda entry: (-entry["score"], entry["symbol"]))
+        return ranked[:limit] if limit else ranked
+
+    @staticmethod
+    def last_market_close(now=None):
+        """Most recent weekday MARKET_CLOSE_TIME (server local time), as naive UTC like created_at"""
+        now = now or datetime.now()
+        hour, minute = (int(part) for part in Config.MARKET_CLOSE_TIME.split(":"))
+        close = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if close > now:
+            close -= timedelta(days=1)
+        while close.weekday() >= 5:
+            close -= timedelta(days=1)
+        return close.astimezone(timezone.utc).replace(tzinfo=None)
+
+    @staticmethod
+    def fresh_symbols(symbols, since):
+        """Symbols with a cached report created at or after ``since``, in one query"""
+        with dependency("mongodb", "stock_analyses.find"):
+            return {doc["symbol"] for doc in mongo.db.stock_analyses.find(
+                {"symbol": {"$in": list(symbols)}, "created_at": {"$gte": since}},
+                {"symbol": 1}
+            )}
+
+    @classmethod
+    def warm(cls, limit=None, budget_seconds=None, workers=None):
+        """
+        Regenerate stale reports for the top-ranked symbols within the
+        budget. Reports still running when the budget ends are finished;
+        symbols not started by then are reported as deferred.
+        """
+        limit = limit or Config.REPORT_WARM_TOP_K
+        budget_seconds = budget_seconds or Config.REPORT_WARM_BUDGET_SECONDS
+        workers = max(1, min(workers or Config.REPORT_WARM_WORKERS, Config.REPORT_GENERATION_CONCURRENCY))
+        deadline = time.monotonic() + budget_seconds
+
+        with span("report_warm", "rank"):
+            ranked = [entry["symbol"] for entry in cls.rank_symbols(limit)]
+            fresh = cls.fresh_symbols(ranked, cls.last_market_close()) if ranked else set()
+        pending = [symbol for symbol in ranked if symbol not in fresh]
+
+        generated, failed = [], []
+        with span("report_warm", "generate"), ThreadPoolExecutor(max_workers=workers,
+                                                                 thread_name_prefix="report-warm") as executor:
+            running = {}
+            while pending or running:
+                while pending and len(running) < workers and time.monotonic() < deadline:
+                    symbol = pending.pop(0)
+                    running[executor.submit(StockAnalysisService.generate_within_budget, symbol)] = symbol
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    symbol = running.pop(future)
+                    try:
+                        response = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to warm report for {symbol}: {str(e)}")
+                        failed.append(symbol)
+                        continue
+                    (generated if response.success else failed).append(symbol)
+
+        cls.invalidate_popular()
+        logger.info(f"Report warming: {len(generated)} generated, {len(failed)} failed, "
+                    f"{len(fresh)} already fresh, {len(pending)} deferred (budget {budget_seconds}s)")
+        return {
+            "success": True,
+            "message": f"Warmed {len(generated)} of {len(ranked)} ranked symbols",
+            "ranked": len(ranked),
+            "fresh": len(fresh),
+            "generated": generated,
+            "failed": failed,
+            "deferred": pending
+        }
+
+    @classmethod
+    def invalidate_popular(cls):
+        with cls._popular_lock:
+            cls._popular_cache = None
+
+    @classmethod
+    def popular_stocks(cls, limit=10):
+        """
+        Most wanted symbols with their name and sector from the cached
+        report, padded with DEFAULT_POPULAR_STOCKS; cached for
+        POPULAR_STOCKS_CACHE_SECONDS
+        """
+        with cls._popular_lock:
+            if cls._popular_cache is not None and \
+                    time.time() - cls._popular_cached_at < Config.POPULAR_STOCKS_CACHE_SECONDS:
+                return cls._popular_cache[:limit]
+
+        try:
+            ranked = cls.rank_symbols(limit)
+            headings = {}
+            if ranked:
+                for doc in mongo.db.stock_analyses.find(
+                        {"symbol": {"$in": [entry["symbol"] for entry in ranked]}},
+                        {"symbol": 1, "data.heading": 1}
+                ).sort("created_at", -1):
+                    headings.setdefault(doc["symbol"], doc.get("data", {}).get("heading", {}))
+        except Exception as e:
+            logger.warning(f"Could not rank popular stocks, using the default list: {str(e)}")
+            ranked, headings = [], {}
+
+        defaults = {stock["symbol"]: stock for stock in DEFAULT_POPULAR_STOCKS}
+        stocks = []
+        for entry in ranked:
+            symbol = bare_symbol(entry["symbol"])
+            heading = headings.get(entry["symbol"], {})
+            default = defaults.get(symbol, {})
+            stocks.append({
+                "symbol": symbol,
+                "name": heading.get("full_name") or default.get("name", symbol),
+                "sector": heading.get("sector") or default.get("sector", "N/A"),
+                "requests": entry["requests"],
+                "followers": entry["followers"]
+            })
+        listed = {stock["symbol"] for stock in stocks}
+        stocks += [stock for stock in DEFAULT_POPULAR_STOCKS if stock["symbol"] not in listed]
+
+        with cls._popular_lock:
+            cls._popular_cache = stocks
+            cls._popular_cached_at = time.time()
+        return stocks[:limit]
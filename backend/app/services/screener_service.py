@@ -0,0 +1,206 @@
+from app.utils.lazy_import import lazy_import
+import time
+import logging
+import warnings
+from datetime import datetime, timedelta
+from app.extensions import mongo_manager
+from app.utils.metrics import span, dependency
+from app.utils.price_store import LocalPriceStore
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+# Trading days in a year: the 52-week high window and the panel width
+YEAR_BARS = 252
+
+# Pre-filters per screen; None disables a bound. A request may override any subset.
+DEFAULT_SCREEN_FILTERS = {
+    "vcp": {
+        "collection": "VCP_sample",
+        "source": "Universe_VCP",
+        "min_percent_change": 0.0,       # Chartink kept only positive % Chg rows
+        "max_percent_change": None,
+        "min_price": 20.0,
+        "max_price": None,
+        "min_volume_ratio": 1.2,         # last volume / average of the previous volume_lookback bars
+        "volume_lookback": 50,
+        "max_distance_from_high": 25.0,  # % below the 52-week high
+        "min_bars": 200,                 # VCP needs most of a year of history
+        "max_bars": None,
+        "max_stale_days": 5,             # skip symbols whose last stored bar is older than this
+        "limit": 300
+    },
+    "ipo_base": {
+        "collection": "IPO_Base_sample",
+        "source": "Universe_IPO_Base",
+        "min_percent_change": 0.0,
+        "max_percent_change": None,
+        "min_price": 20.0,
+        "max_price": None,
+        "min_volume_ratio": 1.0,
+        "volume_lookback": 20,
+        "max_distance_from_high": 30.0,
+        "min_bars": 15,
+        "max_bars": 120,                 # recent listings only: about six months of bars
+        "max_stale_days": 5,
+        "limit": 300
+    }
+}
+
+
+class UniverseScreener:
+    """
+    Shortlists pattern candidates from every symbol in a LocalPriceStore.
+    The last YEAR_BARS bars of all symbols are stacked into one right-aligned
+    (symbols x bars) panel, so each pre-filter is a single array expression
+    over the whole universe. Shortlists replace VCP_sample / IPO_Base_sample
+    in the shape ChartinkScraper wrote them.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or LocalPriceStore()
+
+    def load_panel(self, symbols=None, bars=YEAR_BARS + 1):
+        """
+        {'symbols', 'last_dates', 'close', 'high', 'volume'}: float64 arrays of
+        shape (symbols, bars), NaN-padded on the left for short histories
+        """
+        symbols = symbols or self.store.symbols()
+        close = np.full((len(symbols), bars), np.nan)
+        high = np.full((len(symbols), bars), np.nan)
+        volume = np.full((len(symbols), bars), np.nan)
+        loaded, last_dates = [], []
+        for symbol in symbols:
+            frame = self.store.load(symbol)
+            if frame is None or frame.empty or not {"Close", "High", "Volume"} <= set(frame.columns):
+                continue
+            frame = frame.iloc[-bars:]
+            row = len(loaded)
+            close[row, bars - len(frame):] = frame["Close"].to_numpy(dtype=float)
+            high[row, bars - len(frame):] = frame["High"].to_numpy(dtype=float)
+            volume[row, bars - len(frame):] = frame["Volume"].to_numpy(dtype=float)
+            loaded.append(symbol)
+            last_dates.append(frame.index[-1])
+        count = len(loaded)
+        return {
+            "symbols": loaded,
+            "last_dates": pd.DatetimeIndex(last_dates),
+            "close": close[:count],
+            "high": high[:count],
+            "volume": volume[:count]
+        }
+
+    @staticmethod
+    def compute_metrics(panel, volume_lookback=50):
+        """Per-symbol screening metrics, one array each"""
+        close, high, volume = panel["close"], panel["high"], panel["volume"]
+        last_close = close[:, -1]
+        with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+            # All-NaN rows (histories shorter than the window) just yield NaN
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            average_volume = np.nanmean(volume[:, -volume_lookback - 1:-1], axis=1)
+            year_high = np.nanmax(high[:, -YEAR_BARS:], axis=1)
+            return {
+                "price": last_close,
+                "percent_change": (last_close / close[:, -2] - 1) * 100,
+                "volume_ratio": volume[:, -1] / average_volume,
+                "distance_from_high": (year_high - last_close) / year_high * 100,
+                "bars": np.count_nonzero(~np.isnan(close), axis=1)
+            }
+
+    @staticmethod
+    def apply_filters(metrics, last_dates, filters, as_of=None):
+        """Boolean mask of symbols passing every enabled bound; NaN metrics never pass"""
+        mask = ~np.isnan(metrics["price"])
+        bounds = (
+            ("percent_change", "min_percent_change", np.greater_equal),
+            ("percent_change", "max_percent_change", np.less_equal),
+            ("price", "min_price", np.greater_equal),
+            ("price", "max_price", np.less_equal),
+            ("volume_ratio", "min_volume_ratio", np.greater_equal),
+            ("distance_from_high", "max_distance_from_high", np.less_equal),
+            ("bars", "min_bars", np.greater_equal),
+            ("bars", "max_bars", np.less_equal),
+        )
+        with np.errstate(invalid="ignore"):
+            for metric, bound, compare in bounds:
+                if filters.get(bound) is not None:
+                    mask &= compare(metrics[metric], float(filters[bound]))
+        if filters.get("max_stale_days") is not None and len(last_dates):
+            as_of = pd.Timestamp(as_of or datetime.now()).normalize()
+            mask &= np.asarray(last_dates >= as_of - timedelta(days=int(filters["max_stale_days"])))
+        return mask
+
+    def screen(self, screen, panel=None, overrides=None, as_of=None):
+        """Shortlist records for ``screen`` ('vcp' or 'ipo_base'), best % change first"""
+        filters = {**DEFAULT_SCREEN_FILTERS[screen], **(overrides or {})}
+        panel = panel or self.load_panel()
+        if not panel["symbols"]:
+            return []
+
+        metrics = self.compute_metrics(panel, int(filters["volume_lookback"]))
+        rows = np.flatnonzero(self.apply_filters(metrics, panel["last_dates"], filters, as_of))
+        rows = rows[np.argsort(-metrics["percent_change"][rows], kind="stable")]
+        if filters.get("limit"):
+            rows = rows[:int(filters["limit"])]
+
+        scraped_at = time.time()
+        return [{
+            "stock_name": panel["symbols"][row],
+            "symbol": panel["symbols"][row],
+            "percent_change": round(float(metrics["percent_change"][row]), 2),
+            "price": round(float(metrics["price"][row]), 2),
+            "volume_ratio": round(float(metrics["volume_ratio"][row]), 2),
+            "distance_from_high": round(float(metrics["distance_from_high"][row]), 2),
+            "scraped_at": scraped_at,
+            "source": filters["source"]
+        } for row in rows]
+
+    @staticmethod
+    def store_shortlist(collection_name, records):
+        """Replace a sample collection; an empty shortlist leaves it untouched"""
+        if not records:
+            logger.warning(f"No data to store for {collection_name}")
+            return 0
+        collection = mongo_manager.get_collection(collection_name)
+        with dependency("mongodb", f"{collection_name}.replace"):
+            collection.delete_many({})
+            collection.insert_many(records)
+        logger.info(f"Inserted {len(records)} records into {collection_name}")
+        return len(records)
+
+    def run(self, screens=("vcp", "ipo_base"), overrides=None):
+        """
+        Screen the stored universe once for every screen and write the
+        shortlists. ``overrides`` maps screen -> filter overrides.
+        """
+        with span("universe_screen", "load_panel"):
+            panel = self.load_panel()
+        if not panel["symbols"]:
+            return {"success": False, "message": f"No stored prices in {self.store.root}"}
+
+        # Screening a store nobody refreshes would keep yesterday's shortlists forever
+        max_stale_days = max((DEFAULT_SCREEN_FILTERS[screen].get("max_stale_days") or 0) for screen in screens)
+        fresh_since = pd.Timestamp(datetime.now()).normalize() - timedelta(days=max_stale_days)
+        if not (panel["last_dates"] >= fresh_since).any():
+            latest = panel["last_dates"].max().date()
+            logger.warning(f"Price store {self.store.root} is stale: newest bar is {latest}, "
+                           f"none of {len(panel['symbols'])} symbols has a bar since {fresh_since.date()}")
+            return {"success": False, "message": f"Stored prices are stale (newest bar {latest})"}
+
+        counts = {}
+        for screen in screens:
+            with span("universe_screen", screen):
+                records = self.screen(screen, panel, (overrides or {}).get(screen))
+            counts[screen] = self.store_shortlist(DEFAULT_SCREEN_FILTERS[screen]["collection"], records)
+
+        logger.info(f"Screened {len(panel['symbols'])} symbols: " +
+                    ", ".join(f"{screen}={count}" for screen, count in counts.items()))
+        return {
+            "success": True,
+            "message": f"Screened {len(panel['symbols'])} stored symbols",
+            "universe": len(panel["symbols"]),
+            "shortlisted": counts
+        }
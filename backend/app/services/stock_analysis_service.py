@@ -1,31 +1,56 @@
-import yfinance as yf
-import pandas as pd
-from alpha_vantage.timeseries import TimeSeries
-from alpha_vantage.techindicators import TechIndicators
-import mplfinance as mpf
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 import time
 import threading
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
+from app.config import Config
 from app.models.stock_analysis_model import StockAnalysis, StockAnalysisResponse
+from app.models.fundamentals_model import FUNDAMENTAL_FIELDS
+from app.services.fundamentals_service import FundamentalsService
 from app.extensions import mongo
+from app.utils.lazy_import import lazy_import
+from app.utils.metrics import span, dependency, trace
+from app.utils.price_series import PriceSeries
+from app.utils.process_pool import run_series
 import base64
 import io
+import logging
+
+yf = lazy_import("yfinance")
+pd = lazy_import("pandas")
+mpf = lazy_import("mplfinance")
+plt = lazy_import("matplotlib.pyplot")
+
+logger = logging.getLogger(__name__)
 
 # ----------------------------
 # CONFIGURATION
 # ----------------------------
-ALPHA_VANTAGE_API_KEY = 'LOEJV96LZZ7I03HU'
+ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY", 'LOEJV96LZZ7I03HU')
+
+# Bars the report chart draws (candles + volume)
+CHART_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Report generations running at once across all requests and batches; each
+# one is several Yahoo Finance calls, a shareholding scrape and a chart
+_generation_slots = threading.BoundedSemaphore(max(1, Config.REPORT_GENERATION_CONCURRENCY))
+
+# API clients are created on first use, not at import time
+_alpha_vantage_clients = None
+_alpha_vantage_lock = threading.Lock()
 
-# Initialize API clients
-ts = TimeSeries(key=ALPHA_VANTAGE_API_KEY, output_format='pandas', indexing_type='date')
-ti = TechIndicators(key=ALPHA_VANTAGE_API_KEY, output_format='pandas', indexing_type='date')
+
+def get_alpha_vantage_clients():
+    """Return the shared (TimeSeries, TechIndicators) Alpha Vantage clients"""
+    global _alpha_vantage_clients
+    with _alpha_vantage_lock:
+        if _alpha_vantage_clients is None:
+            from alpha_vantage.timeseries import TimeSeries
+            from alpha_vantage.techindicators import TechIndicators
+            ts = TimeSeries(key=ALPHA_VANTAGE_API_KEY, output_format='pandas', indexing_type='date')
+            ti = TechIndicators(key=ALPHA_VANTAGE_API_KEY, output_format='pandas', indexing_type='date')
+            _alpha_vantage_clients = (ts, ti)
+    return _alpha_vantage_clients
 
 # ----------------------------
 # SECTOR P/E MAPPING
@@ -136,6 +161,12 @@ class StockAnalysisService:
     def get_shareholding_pattern(symbol):
         """Scrape shareholding pattern data from Trendlyne"""
         def scrape_shareholding():
+            from selenium import webdriver
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support.ui import WebDriverWait
+            from selenium.webdriver.support import expected_conditions as EC
+            from selenium.webdriver.chrome.options import Options
+
             try:
                 options = Options()
                 options.add_argument("--headless")
@@ -223,10 +254,15 @@ class StockAnalysisService:
         
         # Run scraping in background thread
         result = {}
-        thread = threading.Thread(target=lambda: result.update(scrape_shareholding()))
-        thread.daemon = True
-        thread.start()
-        thread.join(timeout=20)
+        with dependency("trendlyne", "shareholding") as timer:
+            thread = threading.Thread(target=lambda: result.update(scrape_shareholding()))
+            thread.daemon = True
+            thread.start()
+            thread.join(timeout=20)
+            if thread.is_alive():
+                timer.fail("timeout")
+            elif not result or all(value == 'N/A' for value in result.values()):
+                timer.fail()
         
         return result if result else {
             'promoter': 'N/A',
@@ -239,23 +275,22 @@ class StockAnalysisService:
     def generate_chart_base64(hist_data, symbol, company_name):
         """Generate chart and return as base64 string"""
         try:
-            # Create the plot
-            fig, ax = plt.subplots(figsize=(12, 8))
-            
-            # Plot candlestick chart
-            mpf.plot(hist_data.tail(30), type='candle', style='charles',
+            # Candles plus a volume panel; mplfinance only draws volume on
+            # figures it creates itself, so let it build (and return) the figure
+            fig, _ = mpf.plot(hist_data.tail(30), type='candle', style='charles',
                     title=f'{company_name} Price Chart',
                     ylabel='Price (₹)',
                     volume=True,
-                    ax=ax,
-                    show_nontrading=False)
+                    figsize=(12, 8),
+                    show_nontrading=False,
+                    returnfig=True)
             
             # Convert plot to base64
             buffer = io.BytesIO()
-            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+            fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
             buffer.seek(0)
             chart_base64 = base64.b64encode(buffer.getvalue()).decode()
-            plt.close()
+            plt.close(fig)
             
             return chart_base64
         except Exception as e:
@@ -263,7 +298,15 @@ class StockAnalysisService:
 
     @staticmethod
     def generate_stock_report(symbol):
-        """Generate complete stock analysis report"""
+        """Generate complete stock analysis report (per-stage timings go to /metrics)"""
+        with trace(f"Stock report {symbol}", logging.DEBUG), span("stock_report", "total") as timer:
+            response = StockAnalysisService._build_stock_report(symbol)
+            if not response.success:
+                timer.fail()
+        return response
+
+    @staticmethod
+    def _build_stock_report(symbol):
         try:
             # Handle symbol format - ensure it has .NS suffix for NSE
             if not symbol.endswith('.NS'):
@@ -273,14 +316,20 @@ class StockAnalysisService:
             
             # Fetch data from Yahoo Finance
             stock = yf.Ticker(nse_symbol)
-            info = stock.info
-            hist = stock.history(period="1mo")
-            financials = stock.financials
-            balance_sheet = stock.balance_sheet
+            with dependency("yahoo_finance", "info"):
+                info = stock.info
+            with dependency("yahoo_finance", "history"):
+                hist = stock.history(period="1mo")
             
             if hist.empty:
                 return StockAnalysisResponse(False, error="No data found for symbol")
             
+            # Statement figures come from the fundamentals store; Yahoo is
+            # only asked again once new quarterly results are due
+            fundamentals = FundamentalsService.get(nse_symbol, stock)
+            figures = {field: fundamentals.get(field) if fundamentals.get(field) is not None else 'N/A'
+                       for field in FUNDAMENTAL_FIELDS}
+            
             latest_data = hist.iloc[-1]
             prev_close = hist.iloc[-2]['Close'] if len(hist) > 1 else latest_data['Open']
             
@@ -304,9 +353,9 @@ class StockAnalysisService:
             
             # FUNDAMENTAL
             try:
-                revenue_ttm = financials.loc['Total Revenue'].iloc[0] if 'Total Revenue' in financials.index else 'N/A'
-                net_income_ttm = financials.loc['Net Income'].iloc[0] if 'Net Income' in financials.index else 'N/A'
-                shareholder_equity = balance_sheet.loc['Total Equity Gross Minority Interest'].iloc[0] if 'Total Equity Gross Minority Interest' in balance_sheet.index else None
+                revenue_ttm = figures['revenue']
+                net_income_ttm = figures['net_income']
+                shareholder_equity = fundamentals.get('total_equity')
                 
                 if net_income_ttm != 'N/A' and shareholder_equity and shareholder_equity != 0:
                     roe = round((net_income_ttm / shareholder_equity) * 100, 2)
@@ -328,10 +377,10 @@ class StockAnalysisService:
             
             # FINANCIAL
             try:
-                total_debt = balance_sheet.loc['Total Debt'].iloc[0] if 'Total Debt' in balance_sheet.index else 'N/A'
-                total_equity = balance_sheet.loc['Total Equity Gross Minority Interest'].iloc[0] if 'Total Equity Gross Minority Interest' in balance_sheet.index else 'N/A'
-                current_assets = balance_sheet.loc['Current Assets'].iloc[0] if 'Current Assets' in balance_sheet.index else 'N/A'
-                current_liabilities = balance_sheet.loc['Current Liabilities'].iloc[0] if 'Current Liabilities' in balance_sheet.index else 'N/A'
+                total_debt = figures['total_debt']
+                total_equity = figures['total_equity']
+                current_assets = figures['current_assets']
+                current_liabilities = figures['current_liabilities']
                 
                 debt_equity = total_debt / total_equity if (total_debt != 'N/A' and total_equity != 'N/A' and total_equity != 0) else 'N/A'
                 current_ratio = current_assets / current_liabilities if (current_assets != 'N/A' and current_liabilities != 'N/A' and current_liabilities != 0) else 'N/A'
@@ -351,14 +400,16 @@ class StockAnalysisService:
             }
             
             # TECHNICAL INDICATORS
-            try:
-                latest_rsi = StockAnalysisService.calculate_rsi(hist)
-                macd_values = StockAnalysisService.calculate_macd(hist)
-                latest_macd = macd_values['macd_line']
-                latest_macd_signal = macd_values['signal_line']
-                latest_macd_hist = macd_values['histogram']
-            except:
-                latest_rsi, latest_macd, latest_macd_signal, latest_macd_hist = 'N/A', 'N/A', 'N/A', 'N/A'
+            with span("stock_report", "technical_indicators") as timer:
+                try:
+                    latest_rsi = StockAnalysisService.calculate_rsi(hist)
+                    macd_values = StockAnalysisService.calculate_macd(hist)
+                    latest_macd = macd_values['macd_line']
+                    latest_macd_signal = macd_values['signal_line']
+                    latest_macd_hist = macd_values['histogram']
+                except:
+                    timer.fail()
+                    latest_rsi, latest_macd, latest_macd_signal, latest_macd_hist = 'N/A', 'N/A', 'N/A', 'N/A'
             
             recent_high = hist['High'].max()
             recent_low = hist['Low'].min()
@@ -390,8 +441,16 @@ class StockAnalysisService:
                 }
             }
             
-            # Generate chart
-            chart_base64 = StockAnalysisService.generate_chart_base64(hist, symbol, heading['full_name'])
+            # Generate chart (rendered in the process pool, off this thread's GIL)
+            with span("stock_report", "render_chart") as timer:
+                chart_bars = PriceSeries.from_frame(hist[CHART_COLUMNS].tail(30), symbol)
+                try:
+                    chart_base64 = run_series(render_chart, chart_bars, heading['full_name']).result()
+                except Exception as e:
+                    logger.warning(f"Chart rendering failed for {symbol}: {str(e)}")
+                    chart_base64 = None
+                if chart_base64 is None:
+                    timer.fail()
             
             # Compile report
             report_data = {
@@ -406,13 +465,88 @@ class StockAnalysisService:
             
             # Save to database
             stock_analysis = StockAnalysis(symbol=symbol.upper(), data=report_data)
-            mongo.db.stock_analyses.insert_one(stock_analysis.to_dict())
+            with dependency("mongodb", "stock_analyses.insert"):
+                mongo.db.stock_analyses.insert_one(stock_analysis.to_dict())
             
             return StockAnalysisResponse(True, data=report_data)
             
         except Exception as e:
             return StockAnalysisResponse(False, error=str(e))
 
+    @staticmethod
+    def normalize_symbol(symbol):
+        """TCS -> TCS.NS; symbols with an exchange suffix are kept"""
+        symbol = symbol.strip().upper()
+        if symbol and not symbol.endswith((".NS", ".BO")):
+            symbol = f"{symbol}.NS"
+        return symbol
+
+    @staticmethod
+    def generate_within_budget(symbol, stop=None):
+        """
+        generate_stock_report() holding one of the shared generation slots;
+        skipped when ``stop`` is set by the time a slot frees up
+        """
+        with _generation_slots:
+            if stop is not None and stop.is_set():
+                return StockAnalysisResponse(False, error="Report generation cancelled")
+            return StockAnalysisService.generate_stock_report(symbol)
+
+    @staticmethod
+    def get_cached_analyses(symbols):
+        """Latest cached report per symbol, in one $in query; symbols without one are left out"""
+        cached = {}
+        try:
+            for doc in mongo.db.stock_analyses.find(
+                    {"symbol": {"$in": [symbol.upper() for symbol in symbols]}},
+                    {"symbol": 1, "data": 1}
+            ).sort("created_at", -1):
+                if doc["symbol"] not in cached:
+                    cached[doc["symbol"]] = StockAnalysisResponse(True, data=doc["data"])
+        except Exception as e:
+            logger.warning(f"Report cache lookup failed for batch: {str(e)}")
+        return cached
+
+    @staticmethod
+    def analyze_batch(symbols, app):
+        """
+        Yield (symbol, response, cached) for each symbol as soon as it is
+        ready: cache hits first, then generated reports in completion order.
+        Misses are generated REPORT_GENERATION_CONCURRENCY at a time, also
+        bounded by the shared generation slots; ``app`` provides the context
+        for the worker threads.
+        """
+        cached = StockAnalysisService.get_cached_analyses(symbols)
+        for symbol in symbols:
+            if symbol in cached:
+                yield symbol, cached[symbol], True
+
+        misses = [symbol for symbol in symbols if symbol not in cached]
+        if not misses:
+            return
+
+        stop = threading.Event()
+
+        def generate(symbol):
+            with app.app_context():
+                return StockAnalysisService.generate_within_budget(symbol, stop)
+
+        workers = min(len(misses), max(1, Config.REPORT_GENERATION_CONCURRENCY))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report-batch")
+        try:
+            futures = {executor.submit(generate, symbol): symbol for symbol in misses}
+            for future in as_completed(futures):
+                try:
+                    response = future.result()
+                except Exception as e:
+                    response = StockAnalysisResponse(False, error=str(e))
+                yield futures[future], response, False
+        finally:
+            # A client that goes away cancels the queued generations and the ones
+            # still waiting for a slot; those already generating run to the end
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
     @staticmethod
     def get_cached_analysis(symbol):
         """Get cached analysis from database"""
@@ -426,3 +560,8 @@ class StockAnalysisService:
             return None
         except Exception:
             return None
+
+
+def render_chart(bars, company_name):
+    """generate_chart_base64() for a PriceSeries; module level so process pool workers can run it"""
+    return StockAnalysisService.generate_chart_base64(bars.to_frame(), bars.symbol, company_name)
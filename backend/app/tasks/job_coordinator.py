@@ -0,0 +1,213 @@
+import os
+import socket
+import threading
+import time
+import uuid
+import logging
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.extensions import mongo_manager
+
+logger = logging.getLogger(__name__)
+
+JOB_LOCKS = "job_locks"
+JOB_RUNS = "job_runs"
+
+RUNNING = "running"
+SUCCESS = "success"
+FAILED = "failed"
+
+
+class JobCoordinator:
+    """
+    Makes scheduled jobs run once cluster-wide.
+
+    Every process runs its own APScheduler, so each firing is raced by all
+    workers. A worker must first take the job's lease in ``job_locks`` (a
+    document whose ``lease_expires_at`` is renewed by a heartbeat while the
+    job runs), then claim the firing's slot in ``job_runs`` (unique on
+    job_id + slot). Losing either step means another worker owns the run.
+    """
+
+    def __init__(self, lease_seconds=900):
+        self.lease_seconds = lease_seconds
+        self._owner = None
+        self._owner_pid = None
+        self._local = threading.local()
+
+    @property
+    def owner(self):
+        # Recomputed after fork so parent and children never share an identity
+        if self._owner_pid != os.getpid():
+            self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+            self._owner_pid = os.getpid()
+        return self._owner
+
+    def configure(self, config):
+        self.lease_seconds = int(config.get("JOB_LEASE_SECONDS", self.lease_seconds))
+
+    # ---- Leases ----
+
+    def acquire_lease(self, job_id):
+        """Take the job's lease; False if it is held, even by another thread here"""
+        now = datetime.utcnow()
+        try:
+            lock = mongo_manager.get_collection(JOB_LOCKS).find_one_and_update(
+                {"_id": job_id, "lease_expires_at": {"$lt": now}},
+                {"$set": {
+                    "owner": self.owner,
+                    "acquired_at": now,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds)
+                }},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return lock is not None and lock.get("owner") == self.owner
+        except DuplicateKeyError:
+            # The lock document exists and is held by someone else
+            return False
+
+    def renew_lease(self, job_id):
+        result = mongo_manager.get_collection(JOB_LOCKS).update_one(
+            {"_id": job_id, "owner": self.owner},
+            {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}}
+        )
+        return result.matched_count == 1
+
+    def release_lease(self, job_id):
+        mongo_manager.get_collection(JOB_LOCKS).update_one(
+            {"_id": job_id, "owner": self.owner},
+            {"$set": {"lease_expires_at": datetime(1970, 1, 1)}}
+        )
+
+    def _heartbeat(self, job_id, stop_event):
+        interval = max(1, self.lease_seconds // 3)
+        while not stop_event.wait(interval):
+            try:
+                if not self.renew_lease(job_id):
+                    logger.warning(f"Lost lease for job {job_id} while it was running")
+                    return
+            except Exception as e:
+                logger.error(f"Error renewing lease for job {job_id}: {str(e)}")
+
+    # ---- Run history ----
+
+    def claim_run(self, job_id, slot):
+        """Record the start of a run for a slot; None if the slot already ran"""
+        runs = mongo_manager.get_collection(JOB_RUNS)
+        now = datetime.utcnow()
+        try:
+            result = runs.insert_one({
+                "job_id": job_id,
+                "slot": slot,
+                "owner": self.owner,
+                "state": RUNNING,
+                "attempts": 1,
+                "started_at": now,
+                "finished_at": None,
+                "duration_ms": None,
+                "error": None
+            })
+            return result.inserted_id
+        except DuplicateKeyError:
+            # A run still marked RUNNING while we hold the lease was abandoned
+            # by a worker that died mid-job; take it over.
+            abandoned = runs.find_one_and_update(
+                {"job_id": job_id, "slot": slot, "state": RUNNING, "owner": {"$ne": self.owner}},
+                {"$set": {"owner": self.owner, "started_at": now}, "$inc": {"attempts": 1}},
+                return_document=ReturnDocument.AFTER
+            )
+            if abandoned:
+                logger.warning(f"Resuming abandoned run of {job_id} for slot {slot}")
+                return abandoned["_id"]
+            return None
+
+    def finish_run(self, run_id, state, duration_ms, error=None, result=None):
+        mongo_manager.get_collection(JOB_RUNS).update_one(
+            {"_id": run_id},
+            {"$set": {
+                "state": state,
+                "finished_at": datetime.utcnow(),
+                "duration_ms": duration_ms,
+                "error": error,
+                "result": result
+            }}
+        )
+
+    def last_success(self, job_id):
+        """Most recent successful run document for a job, or None"""
+        return mongo_manager.get_collection(JOB_RUNS).find_one(
+            {"job_id": job_id, "state": SUCCESS},
+            sort=[("started_at", -1)]
+        )
+
+    def recent_runs(self, job_id=None, limit=20):
+        query = {"job_id": job_id} if job_id else {}
+        return list(mongo_manager.get_collection(JOB_RUNS).find(query, {"_id": 0})
+                    .sort("started_at", -1).limit(limit))
+
+    # ---- Execution ----
+
+    def current_slot(self):
+        """Slot of the run_exclusive() call executing on this thread, or None"""
+        return getattr(self._local, "slot", None)
+
+    def run_exclusive(self, job_id, func, slot, skip_if=None):
+        """
+        Run ``func`` if this worker wins the lease and the slot has not run
+        yet. ``skip_if`` is re-evaluated under the lease (e.g. a staleness
+        check for catch-up runs). Returns the job result, or None if skipped.
+        """
+        try:
+            if not self.acquire_lease(job_id):
+                logger.info(f"Job {job_id} [{slot}] is running on another worker, skipping")
+                return None
+        except Exception as e:
+            logger.error(f"Cannot coordinate job {job_id}, skipping this run: {str(e)}")
+            return None
+
+        stop_event = threading.Event()
+        try:
+            if skip_if is not None and skip_if():
+                logger.info(f"Job {job_id} [{slot}] no longer needed, skipping")
+                return None
+
+            run_id = self.claim_run(job_id, slot)
+            if run_id is None:
+                logger.info(f"Job {job_id} [{slot}] already ran on another worker, skipping")
+                return None
+
+            heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, stop_event), daemon=True)
+            heartbeat.start()
+
+            started = time.perf_counter()
+            state, error, result = SUCCESS, None, None
+            self._local.slot = slot
+            try:
+                result = func()
+                if isinstance(result, dict) and result.get("success") is False:
+                    state, error = FAILED, result.get("message")
+            except Exception as e:
+                state, error = FAILED, str(e)
+                logger.error(f"Job {job_id} [{slot}] raised: {str(e)}")
+            finally:
+                self._local.slot = None
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+            self.finish_run(run_id, state, duration_ms, error,
+                            result if isinstance(result, dict) else None)
+            logger.info(f"Job {job_id} [{slot}] finished with {state} in {duration_ms} ms on {self.owner}")
+            return result
+        except Exception as e:
+            logger.error(f"Error coordinating job {job_id}: {str(e)}")
+            return None
+        finally:
+            stop_event.set()
+            try:
+                self.release_lease(job_id)
+            except Exception as e:
+                logger.error(f"Error releasing lease for job {job_id}: {str(e)}")
+
+
+job_coordinator = JobCoordinator()
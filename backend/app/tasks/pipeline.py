@@ -0,0 +1,195 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from app.extensions import mongo_manager
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_RUNS = "pipeline_runs"
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCESS = "success"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class Stage:
+    """One step of a pipeline; ``func`` returns a {'success', 'message'} dict"""
+
+    def __init__(self, name, func, depends_on=(), retries=0, retry_delay=30, require_success=True):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.retries = retries
+        self.retry_delay = retry_delay
+        # False: run once dependencies finished, even if some of them failed
+        self.require_success = require_success
+
+
+class Pipeline:
+    """
+    Minimal DAG runner. Stages start as soon as their dependencies finish,
+    independent stages run in parallel, and per-stage state is persisted in
+    ``pipeline_runs`` so re-running the same run_id resumes after the last
+    successful stage instead of starting over.
+    """
+
+    def __init__(self, name, stages, max_workers=2):
+        self.name = name
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_workers = max_workers
+        for stage in stages:
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dependency}")
+
+    def _collection(self):
+        return mongo_manager.get_collection(PIPELINE_RUNS)
+
+    def _load_state(self, run_id, resume):
+        doc_id = f"{self.name}:{run_id}"
+        existing = self._collection().find_one({"_id": doc_id}) if resume else None
+        previous = (existing or {}).get("stages", {})
+
+        # A finished stage is reused only if everything upstream is reused too;
+        # re-running a stage invalidates its dependents.
+        reusable = {}
+
+        def is_reusable(name):
+            if name not in reusable:
+                reusable[name] = (
+                    previous.get(name, {}).get("state") == SUCCESS
+                    and all(is_reusable(d) for d in self.stages[name].depends_on)
+                )
+            return reusable[name]
+
+        stages = {
+            name: previous[name] if is_reusable(name) else {"state": PENDING, "attempts": 0}
+            for name in self.stages
+        }
+        self._collection().update_one(
+            {"_id": doc_id},
+            {"$set": {
+                "pipeline": self.name,
+                "run_id": run_id,
+                "state": RUNNING,
+                "stages": stages,
+                "resumed": existing is not None,
+                "updated_at": datetime.utcnow()
+            }, "$setOnInsert": {"started_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return doc_id, stages
+
+    def _save_stage(self, doc_id, name, state):
+        self._collection().update_one(
+            {"_id": doc_id},
+            {"$set": {f"stages.{name}": state, "updated_at": datetime.utcnow()}}
+        )
+
+    def _run_stage(self, stage):
+        """Run a stage with retries; returns (state, attempts, duration_ms, message)"""
+        attempts = 0
+        started = time.perf_counter()
+        message = None
+        while attempts <= stage.retries:
+            attempts += 1
+            try:
+                result = stage.func()
+                message = result.get("message") if isinstance(result, dict) else None
+                if not (isinstance(result, dict) and result.get("success") is False):
+                    return SUCCESS, attempts, round((time.perf_counter() - started) * 1000, 1), message
+            except Exception as e:
+                message = str(e)
+            logger.warning(f"Stage {self.name}.{stage.name} attempt {attempts} failed: {message}")
+            if attempts <= stage.retries:
+                time.sleep(stage.retry_delay)
+        return FAILED, attempts, round((time.perf_counter() - started) * 1000, 1), message
+
+    def run(self, run_id, resume=True):
+        """Execute the DAG for ``run_id`` and return a summary dict"""
+        doc_id, states = self._load_state(run_id, resume)
+        pipeline_started = time.perf_counter()
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                for name, stage in self.stages.items():
+                    if states[name]["state"] != PENDING:
+                        continue
+                    dependency_states = [states[d]["state"] for d in stage.depends_on]
+                    if any(s in (PENDING, RUNNING) for s in dependency_states):
+                        continue
+                    if stage.require_success and any(s != SUCCESS for s in dependency_states):
+                        states[name] = {"state": SKIPPED, "attempts": 0,
+                                        "message": "Upstream stage did not succeed"}
+                        self._save_stage(doc_id, name, states[name])
+                        logger.info(f"Stage {self.name}.{name} skipped, upstream failed")
+                        continue
+                    states[name] = {"state": RUNNING, "attempts": 0, "started_at": datetime.utcnow()}
+                    self._save_stage(doc_id, name, states[name])
+                    logger.info(f"Stage {self.name}.{name} started")
+                    running[executor.submit(self._run_stage, stage)] = name
+
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    state, attempts, duration_ms, message = future.result()
+                    states[name].update({
+                        "state": state,
+                        "attempts": attempts,
+                        "duration_ms": duration_ms,
+                        "message": message,
+                        "finished_at": datetime.utcnow()
+                    })
+                    self._save_stage(doc_id, name, states[name])
+                    logger.info(f"Stage {self.name}.{name} finished with {state} in {duration_ms} ms")
+
+        success = all(s["state"] == SUCCESS for s in states.values())
+        duration_ms = round((time.perf_counter() - pipeline_started) * 1000, 1)
+        self._collection().update_one(
+            {"_id": doc_id},
+            {"$set": {
+                "state": SUCCESS if success else FAILED,
+                "finished_at": datetime.utcnow(),
+                "duration_ms": duration_ms
+            }}
+        )
+        logger.info(f"Pipeline {self.name} [{run_id}] finished in {duration_ms} ms")
+        return {
+            "success": success,
+            "message": f"Pipeline {self.name} [{run_id}] {'completed' if success else 'finished with failures'}",
+            "run_id": run_id,
+            "duration_ms": duration_ms,
+            "stages": {
+                name: {k: v for k, v in state.items() if k in ("state", "attempts", "duration_ms", "message")}
+                for name, state in states.items()
+            }
+        }
+
+
+def build_daily_pipeline(predict_service, config=None):
+    """refresh_price_store -> scrape_stocks -> (vcp_scan || ipo_scan) -> publish_predicted_stocks"""
+    config = config or {}
+    retries = int(config.get("PIPELINE_STAGE_RETRIES", 1))
+    retry_delay = int(config.get("PIPELINE_RETRY_DELAY_SECONDS", 60))
+
+    return Pipeline("daily_scan", [
+        Stage("refresh_price_store", predict_service.refresh_price_store,
+              retries=retries, retry_delay=retry_delay),
+        # Scraping runs even if the refresh failed; a stale store falls back to Chartink
+        Stage("scrape_stocks", predict_service.run_stock_scraping, depends_on=["refresh_price_store"],
+              require_success=False, retries=retries, retry_delay=retry_delay),
+        Stage("vcp_scan", predict_service.run_vcp_analysis, depends_on=["scrape_stocks"],
+              retries=retries, retry_delay=retry_delay),
+        Stage("ipo_scan", predict_service.run_ipo_analysis, depends_on=["scrape_stocks"],
+              retries=retries, retry_delay=retry_delay),
+        # Publish whatever the scans produced, even if one of them failed
+        Stage("publish_predicted_stocks", predict_service.publish_predicted_stocks_snapshot,
+              depends_on=["vcp_scan", "ipo_scan"], require_success=False),
+    ], max_workers=2)
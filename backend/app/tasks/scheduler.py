@@ -2,7 +2,13 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 from app.services.news_service import NewsService
-from app.services.predict_service import PredictService
+from app.services.predict_service import PredictService, is_market_open
+from app.services.report_warming_service import ReportWarmingService
+from app.models.news_model import NewsModel
+from app.tasks.startup import startup_runner, catch_up_runner, StartupTask
+from app.tasks.job_coordinator import job_coordinator
+from app.tasks.pipeline import build_daily_pipeline
+from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,6 +18,7 @@ predict_service = PredictService()
 
 def init_scheduler(app):
     """Initialize the scheduler with the Flask app context"""
+    job_coordinator.configure(app.config)
     
     def scheduled_news_scraping():
         with app.app_context():
@@ -22,74 +29,165 @@ def init_scheduler(app):
                     logger.info(f"Scheduled news scraping completed: {result['message']}")
                 else:
                     logger.error(f"Scheduled news scraping failed: {result['message']}")
+                return result
             except Exception as e:
                 logger.error(f"Error in scheduled news scraping: {str(e)}")
+                return {'success': False, 'message': str(e)}
     
-    def scheduled_stock_scraping():
+    def scheduled_daily_pipeline():
         with app.app_context():
             try:
-                logger.info("Starting scheduled stock scraping...")
-                result = predict_service.run_stock_scraping()
+                # One pipeline run per firing: a retry of the same firing resumes after
+                # the last finished stage, but an earlier run that day (a catch-up, a
+                # manual run) is never reused by the close-of-day firing
+                run_id = job_coordinator.current_slot() or datetime.now().strftime('%Y-%m-%dT%H:%M')
+                logger.info(f"Starting daily scan pipeline [{run_id}]...")
+                result = build_daily_pipeline(predict_service, app.config).run(run_id)
                 if result['success']:
-                    logger.info(f"Scheduled stock scraping completed: {result['message']}")
+                    logger.info(f"Daily scan pipeline completed: {result['stages']}")
                 else:
-                    logger.error(f"Scheduled stock scraping failed: {result['message']}")
+                    logger.error(f"Daily scan pipeline failed: {result['stages']}")
+                return result
             except Exception as e:
-                logger.error(f"Error in scheduled stock scraping: {str(e)}")
+                logger.error(f"Error in daily scan pipeline: {str(e)}")
+                return {'success': False, 'message': str(e)}
     
-    def scheduled_pattern_detection():
+    def scheduled_report_warming():
         with app.app_context():
             try:
-                logger.info("Starting scheduled pattern detection...")
-                
-                # Run VCP analysis
-                vcp_result = predict_service.run_vcp_analysis()
-                if vcp_result['success']:
-                    logger.info(f"VCP analysis completed: {vcp_result['message']}")
-                else:
-                    logger.error(f"VCP analysis failed: {vcp_result['message']}")
-                
-                # Run IPO analysis
-                ipo_result = predict_service.run_ipo_analysis()
-                if ipo_result['success']:
-                    logger.info(f"IPO analysis completed: {ipo_result['message']}")
-                else:
-                    logger.error(f"IPO analysis failed: {ipo_result['message']}")
-                    
+                logger.info("Starting report warming...")
+                result = ReportWarmingService.warm()
+                logger.info(f"Report warming completed: {result['message']}")
+                return result
             except Exception as e:
-                logger.error(f"Error in scheduled pattern detection: {str(e)}")
+                logger.error(f"Error in report warming: {str(e)}")
+                return {'success': False, 'message': str(e)}
     
+    # Interval jobs share a fixed start so every worker computes the same
+    # fire times, which is what makes the run slots comparable.
+    aligned_start = datetime(2024, 1, 1)
+
     # Schedule news scraping every 5 hours
-    scheduler.add_job(
+    add_coordinated_job(
+        app,
         func=scheduled_news_scraping,
-        trigger=IntervalTrigger(hours=5),
+        trigger=IntervalTrigger(hours=5, start_date=aligned_start),
         id='news_scraping_job',
         name='Scrape Economic Times news every 5 hours',
-        replace_existing=True
+        catch_up=False
     )
     
-    # Schedule stock scraping daily at 4:30 PM
-    scheduler.add_job(
-        func=scheduled_stock_scraping,
+    # Daily scrape -> detect -> publish pipeline at 4:30 PM. Detection starts
+    # as soon as scraping finishes instead of on its own fixed trigger.
+    add_coordinated_job(
+        app,
+        func=scheduled_daily_pipeline,
         trigger=CronTrigger(hour=16, minute=30),  # 4:30 PM
-        id='stock_scraping_job',
-        name='Scrape Chartink stock data daily at 4:30 PM',
-        replace_existing=True
+        id='daily_pipeline_job',
+        name='Run scrape, pattern detection and publish daily at 4:30 PM'
     )
     
-    # Schedule pattern detection daily at 5:30 PM
-    scheduler.add_job(
-        func=scheduled_pattern_detection,
-        trigger=CronTrigger(hour=17, minute=30),  # 5:30 PM
-        id='pattern_detection_job',
-        name='Run pattern detection daily at 5:30 PM',
-        replace_existing=True
-    )
+    # Warm the most wanted stock reports before the open and after the close.
+    # No catch-up: a missed warm is not worth holding up the startup queue.
+    for job_id, setting, label in (('report_warm_pre_open_job', 'REPORT_WARM_PRE_OPEN', 'before market open'),
+                                   ('report_warm_post_close_job', 'REPORT_WARM_POST_CLOSE', 'after market close')):
+        hour, minute = app.config[setting].split(':')
+        add_coordinated_job(
+            app,
+            func=scheduled_report_warming,
+            trigger=CronTrigger(day_of_week='mon-fri', hour=int(hour), minute=int(minute)),
+            id=job_id,
+            name=f'Warm popular and watchlist stock reports {label}',
+            catch_up=False
+        )
     
     # Start the scheduler
     if not scheduler.running:
         scheduler.start()
         logger.info("Scheduler started successfully")
     
-    # Also run immediately on startup
-    scheduled_news_scraping()
\ No newline at end of file
+    # Warm the news feed in the background, only if the stored copy is stale.
+    # It goes through the coordinator so only one worker scrapes.
+    def news_is_stale():
+        last_scraped_at = NewsModel.get_last_scraped_at()
+        if last_scraped_at is None:
+            return True
+        max_age = timedelta(hours=app.config.get("NEWS_STALE_AFTER_HOURS", 5))
+        return datetime.utcnow() - last_scraped_at > max_age
+
+    news_trigger = scheduler.get_job('news_scraping_job').trigger
+    startup_runner.register(StartupTask(
+        "news_warmup",
+        lambda: job_coordinator.run_exclusive(
+            'news_scraping_job',
+            scheduled_news_scraping,
+            slot=f"warmup-{previous_fire_slot(news_trigger)}",
+            skip_if=lambda: not news_is_stale()
+        ),
+        is_stale=news_is_stale,
+        description="Scrape news if the stored feed is older than NEWS_STALE_AFTER_HOURS"
+    ))
+
+
+def fire_slot(fire_time):
+    """Stable identifier for one firing of a trigger, shared by all workers"""
+    return fire_time.strftime("%Y-%m-%dT%H:%M%z")
+
+
+def current_fire_slot(trigger, grace_seconds):
+    """Slot of the firing being executed now (possibly late within the grace window)"""
+    now = datetime.now(trigger.timezone)
+    fire_time = trigger.get_next_fire_time(None, now - timedelta(seconds=grace_seconds))
+    return fire_slot(fire_time if fire_time and fire_time <= now else now)
+
+
+def previous_fire_slot(trigger, lookback=timedelta(days=2)):
+    """Slot of the most recent firing that should already have happened"""
+    now = datetime.now(trigger.timezone)
+    fire_time = trigger.get_next_fire_time(None, now - lookback)
+    previous = None
+    while fire_time is not None and fire_time <= now:
+        previous = fire_time
+        fire_time = trigger.get_next_fire_time(fire_time, fire_time + timedelta(seconds=1))
+    return fire_slot(previous) if previous else None
+
+
+def add_coordinated_job(app, func, trigger, id, name, catch_up=True):
+    """
+    Schedule ``func`` so each firing runs on exactly one worker cluster-wide.
+    Late firings within JOB_MISFIRE_GRACE_SECONDS still run (coalesced to
+    one); with ``catch_up`` a firing missed while no worker was up is run
+    on the catch-up thread, unless the market is open (the next firing
+    would then work on intraday bars; it runs after the close anyway).
+    """
+    grace_seconds = int(app.config.get("JOB_MISFIRE_GRACE_SECONDS", 600))
+
+    def coordinated_run():
+        return job_coordinator.run_exclusive(id, func, slot=current_fire_slot(trigger, grace_seconds))
+
+    scheduler.add_job(
+        func=coordinated_run,
+        trigger=trigger,
+        id=id,
+        name=name,
+        replace_existing=True,
+        misfire_grace_time=grace_seconds,
+        coalesce=True,
+        max_instances=1
+    )
+
+    if catch_up:
+        def run_missed_slot():
+            slot = previous_fire_slot(trigger)
+            if slot is None:
+                return {'success': True, 'message': 'No missed run'}
+            if is_market_open():
+                return {'success': True, 'message': f'Missed run {slot} skipped during market hours'}
+            # Claiming the missed slot is a no-op if any worker already ran it
+            return job_coordinator.run_exclusive(id, func, slot=slot)
+
+        catch_up_runner.register(StartupTask(
+            f"catch_up:{id}",
+            run_missed_slot,
+            description=f"Run the last missed firing of {name}"
+        ))
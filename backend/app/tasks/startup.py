@@ -0,0 +1,153 @@
+import queue
+import threading
+import time
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+SKIPPED = "skipped"
+FAILED = "failed"
+FINISHED_STATES = (DONE, SKIPPED, FAILED)
+
+
+class StartupTask:
+    """A warm-up job run once in the background after the app boots"""
+
+    def __init__(self, name, func, is_stale=None, required=False, description=""):
+        self.name = name
+        self.func = func
+        # Returns True when the warm-up is needed; None means always run
+        self.is_stale = is_stale
+        # Required tasks must finish before /api/ready reports ready
+        self.required = required
+        self.description = description
+
+
+class StartupTaskRunner:
+    """
+    Runs warm-up tasks on a single daemon thread so the boot path never
+    waits on third-party sites. Progress is exposed through status().
+    """
+
+    def __init__(self, thread_name="startup-tasks"):
+        self.thread_name = thread_name
+        self._queue = queue.Queue()
+        self._tasks = {}
+        self._status = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._app = None
+
+    def register(self, task):
+        """Queue a task; it runs as soon as the runner is started"""
+        with self._lock:
+            if task.name in self._tasks:
+                logger.warning(f"Startup task {task.name} already registered, ignoring")
+                return
+            self._tasks[task.name] = task
+            self._status[task.name] = {
+                "state": PENDING,
+                "required": task.required,
+                "description": task.description,
+                "started_at": None,
+                "finished_at": None,
+                "duration_ms": None,
+                "message": None
+            }
+        self._queue.put(task.name)
+
+    def start(self, app):
+        """Start the background worker (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._app = app
+            self._thread = threading.Thread(target=self._worker, name=self.thread_name, daemon=True)
+            self._thread.start()
+        logger.info(f"Task runner {self.thread_name} started with {len(self._tasks)} queued tasks")
+
+    def _worker(self):
+        while True:
+            name = self._queue.get()
+            try:
+                self._run_task(self._tasks[name])
+            finally:
+                self._queue.task_done()
+
+    def _run_task(self, task):
+        self._update(task.name, state=RUNNING, started_at=datetime.utcnow())
+        started = time.perf_counter()
+        try:
+            with self._app.app_context():
+                if task.is_stale is not None and not task.is_stale():
+                    self._finish(task.name, SKIPPED, started, "Data is fresh, warm-up not needed")
+                    return
+                result = task.func()
+            message = result.get("message") if isinstance(result, dict) else None
+            if isinstance(result, dict) and result.get("success") is False:
+                self._finish(task.name, FAILED, started, message)
+            else:
+                self._finish(task.name, DONE, started, message)
+        except Exception as e:
+            logger.error(f"Startup task {task.name} failed: {str(e)}")
+            self._finish(task.name, FAILED, started, str(e))
+
+    def _finish(self, name, state, started, message):
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        self._update(name, state=state, finished_at=datetime.utcnow(),
+                     duration_ms=duration_ms, message=message)
+        logger.info(f"Startup task {name} {state} in {duration_ms} ms")
+
+    def _update(self, name, **fields):
+        with self._lock:
+            self._status[name].update(fields)
+
+    def wait(self, timeout=None):
+        """Block until every queued task has finished (scripts and tests)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.status()["complete"]:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.1)
+
+    def status(self):
+        """Snapshot of warm-up progress for the readiness endpoint"""
+        with self._lock:
+            tasks = {name: dict(state) for name, state in self._status.items()}
+        finished = sum(1 for t in tasks.values() if t["state"] in FINISHED_STATES)
+        return {
+            "ready": all(t["state"] in FINISHED_STATES for t in tasks.values() if t["required"]),
+            "complete": finished == len(tasks),
+            "progress": f"{finished}/{len(tasks)}",
+            "tasks": tasks
+        }
+
+
+startup_runner = StartupTaskRunner()
+# Missed scheduled runs (minutes of scraping) get their own thread so they
+# never hold up the warm-ups above
+catch_up_runner = StartupTaskRunner(thread_name="catch-up-tasks")
+
+
+def init_startup_tasks(app):
+    """Register the built-in warm-up tasks and start the runner"""
+    if not app.config.get("STARTUP_WARMUP_ENABLED", True):
+        logger.info("Startup warm-up disabled by configuration")
+        return
+
+    if app.config.get("LAZY_IMPORTS", True):
+        from app.utils.lazy_import import preload_lazy_modules
+        startup_runner.register(StartupTask(
+            "preload_modules",
+            preload_lazy_modules,
+            description="Import deferred libraries before the first request needs them"
+        ))
+
+    startup_runner.start(app)
+    catch_up_runner.start(app)
@@ -31,4 +31,33 @@ def token_required(f):
         
         return f(current_user, *args, **kwargs)
     
-    return decorated
\ No newline at end of file
+    return decorated
+
+def admin_required(f):
+    """Require a valid access token whose user's email is listed in ADMIN_EMAILS"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        from bson import ObjectId
+        from bson.errors import InvalidId
+        from flask import current_app
+        from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+        from app.extensions import mongo
+
+        try:
+            verify_jwt_in_request()
+        except Exception as e:
+            return jsonify({'success': False, 'error': f'Authentication required: {str(e)}'}), 401
+
+        admins = {email.strip().lower() for email in current_app.config.get('ADMIN_EMAILS', []) if email.strip()}
+        try:
+            user = mongo.db.users.find_one({'_id': ObjectId(get_jwt_identity())}, {'email': 1})
+        except InvalidId:
+            user = None
+        except Exception as e:
+            return jsonify({'success': False, 'error': f'Could not verify admin access: {str(e)}'}), 503
+        if not user or user.get('email', '').lower() not in admins:
+            return jsonify({'success': False, 'error': 'Admin access required'}), 403
+
+        return f(*args, **kwargs)
+
+    return decorated
@@ -0,0 +1,80 @@
+import importlib
+import importlib.util
+import threading
+import types
+import logging
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Every lazy module handed out, so they can be preloaded off the request path
+_registry = {}
+_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module placeholder that performs the real import on first attribute
+    access. After loading, the real module's namespace is copied in so later
+    lookups are plain attribute hits.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__.update(module.__dict__)
+                    self.__dict__["_lazy_module"] = module
+                    logger.debug(f"Lazy-loaded module {self.__name__}")
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Return a module that is imported on first use when LAZY_IMPORTS is on,
+    or the imported module right away when it is off.
+    """
+    if not Config.LAZY_IMPORTS:
+        return importlib.import_module(name)
+    with _lock:
+        if name not in _registry:
+            _registry[name] = LazyModule(name)
+        return _registry[name]
+
+
+def module_available(name):
+    """Check whether an optional dependency is installed without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def preload_lazy_modules():
+    """Import every registered lazy module now (e.g. from a background warm-up)"""
+    loaded, failed = [], []
+    for name, module in list(_registry.items()):
+        try:
+            module._load()
+            loaded.append(name)
+        except Exception as e:
+            logger.error(f"Error preloading module {name}: {str(e)}")
+            failed.append(name)
+    return {"loaded": loaded, "failed": failed}
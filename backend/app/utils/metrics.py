@@ -0,0 +1,297 @@
+"""
+Lightweight in-process instrumentation.
+
+``span`` times a stage of our own code and ``dependency`` times a call to
+an external system (Yahoo Finance, Trendlyne, Chartink, MongoDB, ...).
+Both work as context managers or decorators and feed labelled histograms
+that /metrics renders in the Prometheus text format. Each process keeps
+its own registry (run.py uses a single gunicorn worker).
+"""
+
+import bisect
+import functools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds; external calls here range from milliseconds to the 20 s scraper timeout
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+class _Metric:
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            series = {key: self._copy(value) for key, value in self._series.items()}
+        for key, value in sorted(series.items()):
+            lines.extend(self._render_series(list(zip(self.labelnames, key)), value))
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    def _render_series(self, labels, value):
+        return [f"{self.name}_total{_format_labels(labels)} {value}"]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"buckets": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            series["buckets"][position] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    @staticmethod
+    def _copy(value):
+        return {"buckets": list(value["buckets"]), "sum": value["sum"], "count": value["count"]}
+
+    def _render_series(self, labels, value):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), value["buckets"]):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {value['sum']}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {value['count']}")
+        return lines
+
+    def summary(self):
+        """{label tuple: (count, sum seconds)} for logs and tests"""
+        with self._lock:
+            return {key: (value["count"], value["sum"]) for key, value in self._series.items()}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "stocksensor_stage_duration_seconds",
+    "Time spent in an instrumented stage of our own code",
+    ["component", "stage", "outcome"]
+)
+DEPENDENCY_SECONDS = registry.histogram(
+    "stocksensor_dependency_duration_seconds",
+    "Time spent waiting on an external dependency",
+    ["dependency", "operation", "outcome"]
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "stocksensor_http_request_duration_seconds",
+    "Flask request latency by route",
+    ["method", "endpoint", "status"]
+)
+
+_local = threading.local()
+
+
+class Trace:
+    """Per-thread list of finished spans, used to log one breakdown per operation"""
+
+    def __init__(self, name):
+        self.name = name
+        self.spans = []
+        self.started = time.perf_counter()
+
+    def add(self, label, seconds, outcome):
+        self.spans.append((label, seconds, outcome))
+
+    def breakdown(self):
+        parts = [f"{label}={seconds * 1000:.0f}ms" + ("" if outcome == "ok" else f"({outcome})")
+                 for label, seconds, outcome in self.spans]
+        total = (time.perf_counter() - self.started) * 1000
+        return f"{self.name} took {total:.0f}ms: " + " ".join(parts)
+
+
+class trace:
+    """Collect the spans finished on this thread and log their breakdown at the end"""
+
+    def __init__(self, name, log_level=logging.INFO):
+        self.trace = Trace(name)
+        self.log_level = log_level
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(_local, "trace", None)
+        _local.trace = self.trace
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb):
+        _local.trace = self._previous
+        logger.log(self.log_level, self.trace.breakdown())
+        return False
+
+
+class span:
+    """
+    Time a block or function into STAGE_SECONDS. The outcome label is
+    "error" when an exception escapes; code that swallows its own errors
+    can call ``fail()`` (or set ``outcome``) before leaving the block.
+    """
+
+    histogram = STAGE_SECONDS
+
+    def __init__(self, component, stage):
+        self.labels = {"component": component, "stage": stage}
+        self.outcome = "ok"
+        self._started = None
+
+    @property
+    def label(self):
+        return f"{self.labels['component']}.{self.labels['stage']}"
+
+    def fail(self, outcome="error"):
+        self.outcome = outcome
+
+    def __enter__(self):
+        self.outcome = "ok"
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._started
+        if exc_type is not None:
+            self.outcome = "error"
+        try:
+            self.histogram.observe(seconds, outcome=self.outcome, **self.labels)
+            current = getattr(_local, "trace", None)
+            if current is not None:
+                current.add(self.label, seconds, self.outcome)
+        except Exception as e:
+            logger.debug(f"Could not record {self.label}: {str(e)}")
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # A fresh instance per call keeps concurrent calls independent
+            with type(self)(*self._init_args()):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def _init_args(self):
+        return self.labels["component"], self.labels["stage"]
+
+
+class dependency(span):
+    """Time a call to an external system into DEPENDENCY_SECONDS"""
+
+    histogram = DEPENDENCY_SECONDS
+
+    def __init__(self, name, operation):
+        super().__init__(name, operation)
+        self.labels = {"dependency": name, "operation": operation}
+
+    @property
+    def label(self):
+        return f"{self.labels['dependency']}.{self.labels['operation']}"
+
+    def _init_args(self):
+        return self.labels["dependency"], self.labels["operation"]
+
+
+def init_metrics(app):
+    """Record request latency per route; /metrics itself is served by metrics_routes"""
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def start_request_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_latency(response):
+        started = getattr(g, "_metrics_started", None)
+        if started is not None:
+            endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=request.method, endpoint=endpoint, status=response.status_code
+            )
+        return response
@@ -0,0 +1,143 @@
+import os
+import threading
+import logging
+from urllib.parse import urlsplit
+from pymongo import MongoClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_NAME = "stocksensor"
+
+
+class MongoConnectionManager:
+    """
+    Owns the single MongoClient shared by Flask routes, services, scheduled
+    jobs and standalone scripts.
+
+    The client is created lazily (connect=False) so nothing touches the
+    network at import time. After a fork (gunicorn --preload, process pools)
+    the child drops the inherited client and builds a fresh one on first use,
+    since pymongo clients are not fork-safe.
+    """
+
+    def __init__(self, flask_mongo=None):
+        self.flask_mongo = flask_mongo
+        self._client = None
+        self._db_name = None
+        self._pid = None
+        self._settings = None
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def configure(self, config):
+        """Read pool and timeout settings from a Flask config or Config object"""
+        get = config.get if isinstance(config, dict) else (lambda key, default=None: getattr(config, key, default))
+        self._settings = {
+            "uri": get("MONGO_URI"),
+            "db_name": get("MONGO_DB_NAME"),
+            "maxPoolSize": int(get("MONGO_MAX_POOL_SIZE", 20)),
+            "minPoolSize": int(get("MONGO_MIN_POOL_SIZE", 0)),
+            "maxIdleTimeMS": int(get("MONGO_MAX_IDLE_TIME_MS", 300000)),
+            "connectTimeoutMS": int(get("MONGO_CONNECT_TIMEOUT_MS", 10000)),
+            "serverSelectionTimeoutMS": int(get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000)),
+            "socketTimeoutMS": int(get("MONGO_SOCKET_TIMEOUT_MS", 30000)),
+            "readPreference": get("MONGO_READ_PREFERENCE", "primary"),
+        }
+        return self._settings
+
+    def client_kwargs(self):
+        """Keyword arguments passed to every MongoClient this manager creates"""
+        settings = self._settings or self.configure(_default_config())
+        kwargs = {key: value for key, value in settings.items() if key not in ("uri", "db_name")}
+        kwargs["connect"] = False
+        return kwargs
+
+    def init_app(self, app):
+        """Configure from the app and share one client with Flask-PyMongo"""
+        self.configure(app.config)
+        self.flask_mongo.init_app(app, **self.client_kwargs())
+        with self._lock:
+            self._client = self.flask_mongo.cx
+            self._db_name = self._resolve_db_name(self._settings["uri"], self._settings["db_name"])
+            self._pid = os.getpid()
+            self._bind_flask_mongo()
+
+    def get_client(self):
+        """Return the process-wide client, creating it on first use"""
+        if self._client is not None and self._pid == os.getpid():
+            return self._client
+
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                settings = self._settings or self.configure(_default_config())
+                if not settings["uri"]:
+                    raise ValueError("MONGO_URI not found in environment variables")
+                self._client = MongoClient(settings["uri"], **self.client_kwargs())
+                self._db_name = self._resolve_db_name(settings["uri"], settings["db_name"])
+                self._pid = os.getpid()
+                self._bind_flask_mongo()
+                logger.info(f"MongoClient created for pid {self._pid} (maxPoolSize={settings['maxPoolSize']})")
+        return self._client
+
+    def get_db(self, name=None):
+        """Return a database handle on the shared client"""
+        return self.get_client()[name or self._db_name]
+
+    def get_collection(self, name):
+        """Return a collection handle on the default database"""
+        return self.get_db()[name]
+
+    def close(self):
+        """Close the shared client (scripts and shutdown hooks only)"""
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+
+    def _bind_flask_mongo(self):
+        if self.flask_mongo is None:
+            return
+        self.flask_mongo.cx = self._client
+        self.flask_mongo.db = self._client[self._db_name]
+
+    def _reset_after_fork(self):
+        # The inherited client's sockets belong to the parent; never close
+        # them from here. Just forget the client so get_client() rebuilds it
+        # on first use: children that never query (pool workers) never connect.
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if self.flask_mongo is not None and self._settings is not None:
+            # mongo.db users go through get_db() until the new client binds the real handle
+            self.flask_mongo.cx = None
+            self.flask_mongo.db = _LazyDatabase(self)
+
+    @staticmethod
+    def _resolve_db_name(uri, db_name=None):
+        if db_name:
+            return db_name
+        # Plain string parsing: pymongo's parse_uri resolves SRV records
+        try:
+            path = urlsplit(uri or "").path.lstrip("/")
+            return path.split("/")[0] or DEFAULT_DB_NAME
+        except Exception:
+            return DEFAULT_DB_NAME
+
+
+class _LazyDatabase:
+    """Stand-in for mongo.db in a forked child; the first access builds the client"""
+
+    def __init__(self, manager):
+        self._manager = manager
+
+    def __getattr__(self, name):
+        return getattr(self._manager.get_db(), name)
+
+    def __getitem__(self, name):
+        return self._manager.get_db()[name]
+
+
+def _default_config():
+    from app.config import Config
+    return Config
@@ -0,0 +1,242 @@
+"""
+News sources and the concurrent fetcher behind NewsService.
+
+Each source knows its URL, timeout and how to turn a response into
+{'headline', 'url', 'source'} items. fetch_sources() runs them all at once
+over one pooled requests.Session, so an ingestion run takes as long as
+the slowest source. canonical_url() and headline_simhash() are the keys
+NewsService deduplicates on.
+
+Fetches are conditional: the ETag / Last-Modified validators and a hash
+of the last body are kept per source (news_source_state), so an unchanged
+page costs one 304 or one download without a parse.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, urljoin
+from app.utils.lazy_import import lazy_import, module_available
+from app.utils.metrics import dependency
+
+logger = logging.getLogger(__name__)
+
+bs4 = lazy_import("bs4")
+requests = lazy_import("requests")
+
+# lxml parses several times faster than the stdlib html.parser; it is optional
+HTML_PARSER = "lxml" if module_available("lxml") else "html.parser"
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+)
+
+# Query parameters that only track the click, never change the article
+_TRACKING_PARAMS = re.compile(r'^(utm_\w+|fbclid|gclid|from|ref|source|cmp|_ga)$', re.IGNORECASE)
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+# Headlines whose 64-bit simhashes differ in at most this many bits are the same story
+SIMHASH_DISTANCE = 3
+
+
+def canonical_url(url):
+    """Scheme/host lowercased, no fragment, tracking params and trailing slash dropped"""
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query)
+                             if not _TRACKING_PARAMS.match(key)))
+    path = parts.path.rstrip('/') or '/'
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return urlunsplit(('https', host, path, query, ''))
+
+
+def url_key(url):
+    return hashlib.sha1(canonical_url(url).encode('utf-8')).hexdigest()
+
+
+def headline_simhash(headline, bits=64):
+    """Simhash over word unigrams and bigrams; reworded copies of a headline land a few bits apart"""
+    tokens = _TOKEN.findall(headline.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+    weights = [0] * bits
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(bits):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class NewsSource:
+    """A feed of market headlines; subclasses implement parse()"""
+
+    def __init__(self, name, label, url, timeout=10, max_items=20):
+        self.name = name
+        self.label = label
+        self.url = url
+        self.timeout = timeout
+        self.max_items = max_items
+
+    def parse(self, response):
+        raise NotImplementedError
+
+    def item(self, headline, url):
+        return {'headline': headline, 'url': urljoin(self.url, url), 'source': self.label}
+
+    def fetch(self, session, state=None):
+        """
+        Conditional GET using the validators in ``state`` (the previous result).
+        Returns {'items', 'unchanged', 'etag', 'last_modified', 'content_hash'};
+        ``unchanged`` results carry no items and were never parsed.
+        """
+        state = state or {}
+        headers = {}
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+
+        with dependency("news_source", self.name):
+            response = session.get(self.url, timeout=self.timeout, headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+
+        result = {
+            'items': [],
+            'unchanged': True,
+            'etag': response.headers.get('ETag') or state.get('etag'),
+            'last_modified': response.headers.get('Last-Modified') or state.get('last_modified'),
+            'content_hash': state.get('content_hash')
+        }
+        if response.status_code == 304:
+            return result
+
+        # Servers without validators (or that ignore them) still skip the parse on an identical body
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        result['content_hash'] = content_hash
+        if content_hash == state.get('content_hash'):
+            return result
+
+        result['items'] = self.parse(response)[:self.max_items]
+        result['unchanged'] = False
+        return result
+
+
+class HtmlAnchorSource(NewsSource):
+    """Headlines are anchors matching a CSS selector; the title attribute marks real stories"""
+
+    def __init__(self, name, label, url, selector, require_title=True, **kwargs):
+        super().__init__(name, label, url, **kwargs)
+        self.selector = selector
+        self.require_title = require_title
+        # Only build tags of the selector's type ("a.font_faus" -> <a>). Classes
+        # are left to select(): a class_ strainer drops multi-class anchors.
+        self._strain_tag = selector.partition('.')[0] or None
+
+    def parse(self, response):
+        strainer = bs4.SoupStrainer(self._strain_tag)
+        soup = bs4.BeautifulSoup(response.content, HTML_PARSER, parse_only=strainer)
+        items = []
+        for anchor in soup.select(self.selector):
+            href = anchor.get('href')
+            headline = anchor.get_text(strip=True)
+            if not href or not headline or (self.require_title and not anchor.get('title')):
+                continue
+            items.append(self.item(headline, href))
+        return items
+
+
+class RssSource(NewsSource):
+    """RSS 2.0 <item><title/><link/></item> feeds"""
+
+    def parse(self, response):
+        root = ET.fromstring(response.content)
+        items = []
+        for entry in root.iter('item'):
+            title = (entry.findtext('title') or '').strip()
+            link = (entry.findtext('link') or '').strip()
+            if title and link:
+                items.append(self.item(title, link))
+        return items
+
+
+def build_sources(names=None, timeout=10, max_items=20):
+    """Configured sources by name (NEWS_SOURCES); all known sources when ``names`` is empty"""
+    available = [
+        HtmlAnchorSource("economic_times", "Economic Times", "https://economictimes.indiatimes.com/markets",
+                         "a.font_faus", timeout=timeout, max_items=max_items),
+        RssSource("economic_times_rss", "Economic Times",
+                  "https://economictimes.indiatimes.com/markets/rssfeeds/1977021501.cms",
+                  timeout=timeout, max_items=max_items),
+        RssSource("moneycontrol", "Moneycontrol", "https://www.moneycontrol.com/rss/marketreports.xml",
+                  timeout=timeout, max_items=max_items),
+        RssSource("livemint", "Mint", "https://www.livemint.com/rss/markets",
+                  timeout=timeout, max_items=max_items),
+        RssSource("business_standard", "Business Standard", "https://www.business-standard.com/rss/markets-106.rss",
+                  timeout=timeout, max_items=max_items),
+    ]
+    if not names:
+        return available
+    by_name = {source.name: source for source in available}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        logger.warning(f"Unknown news sources ignored: {', '.join(unknown)}")
+    return [by_name[name] for name in names if name in by_name]
+
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_http_session(pool_size=10):
+    """Process-wide pooled session: keep-alive connections are reused across runs"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({'User-Agent': USER_AGENT})
+                _session = session
+    return _session
+
+
+def fetch_sources(sources, session=None, states=None):
+    """
+    Fetch every source concurrently, conditionally on ``states`` ({source
+    name: previous fetch result}). Returns {source name: fetch result plus
+    'error' and 'seconds'}; a failing or slow source only loses its own items.
+    """
+    session = session or get_http_session()
+    states = states or {}
+
+    def run(source):
+        started = time.perf_counter()
+        previous = states.get(source.name) or {}
+        try:
+            result = source.fetch(session, previous)
+            result['error'] = None
+        except Exception as e:
+            # Keep the old validators so the next run can still be conditional
+            result = {'items': [], 'unchanged': False, 'error': str(e),
+                      **{key: previous.get(key) for key in ('etag', 'last_modified', 'content_hash')}}
+            logger.warning(f"News source {source.name} failed: {result['error']}")
+        result['seconds'] = round(time.perf_counter() - started, 3)
+        return source.name, result
+
+    if not sources:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="news-fetch") as executor:
+        return dict(executor.map(run, sources))
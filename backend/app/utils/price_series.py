@@ -0,0 +1,108 @@
+from app.utils.lazy_import import lazy_import
+from datetime import date, timedelta
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+EPOCH = date(1970, 1, 1)
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+class PriceSeries:
+    """
+    Daily bars as contiguous arrays: int64 epoch days plus one float array
+    per column (OHLCV and any indicators added later). Slicing with
+    window() / tail() returns views on the same buffers, so detectors can
+    cut lookback windows without copying. Columns are read and written like
+    DataFrame columns (series['Close']), which lets code written for frames
+    run on either; from_frame() / to_frame() adapt to and from pandas.
+    """
+
+    __slots__ = ("symbol", "days", "_columns")
+
+    def __init__(self, days, columns, symbol=None):
+        self.symbol = symbol
+        self.days = days
+        self._columns = columns
+
+    @classmethod
+    def from_frame(cls, df, symbol=None, dtype="float64"):
+        """Numeric columns of ``df`` as ``dtype`` arrays; a tz-aware index keeps its local dates"""
+        index = df.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+        days = np.ascontiguousarray(index.values.astype("datetime64[D]").astype(np.int64))
+        columns = {
+            name: np.ascontiguousarray(df[name].to_numpy(dtype=dtype))
+            for name in df.columns if pd.api.types.is_numeric_dtype(df[name])
+        }
+        return cls(days, columns, symbol)
+
+    def to_frame(self):
+        """DataFrame with a naive DatetimeIndex, for code that still needs pandas"""
+        index = pd.DatetimeIndex(self.days.astype("datetime64[D]"), name="Date")
+        return pd.DataFrame(dict(self._columns), index=index)
+
+    def __len__(self):
+        return len(self.days)
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __setitem__(self, name, values):
+        values = np.ascontiguousarray(values)
+        if len(values) != len(self.days):
+            raise ValueError(f"Column {name} has {len(values)} rows, series has {len(self.days)}")
+        self._columns[name] = values
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def index(self):
+        """Bar dates as a datetime64[D] view (df.index stand-in)"""
+        return self.days.view("datetime64[D]")
+
+    def window(self, start=None, stop=None):
+        """Rows [start:stop] sharing this series' buffers"""
+        rows = slice(start, stop)
+        return PriceSeries(self.days[rows], {name: values[rows] for name, values in self._columns.items()},
+                           self.symbol)
+
+    def tail(self, n):
+        return self.window(max(len(self.days) - n, 0))
+
+    def last_date(self):
+        return EPOCH + timedelta(days=int(self.days[-1]))
+
+    @property
+    def nbytes(self):
+        return self.days.nbytes + sum(values.nbytes for values in self._columns.values())
+
+
+def as_price_series(bars, symbol=None):
+    """PriceSeries for a PriceSeries or a DataFrame (the pandas adapter)"""
+    if isinstance(bars, PriceSeries):
+        return bars
+    return PriceSeries.from_frame(bars, symbol)
+
+
+def epoch_day(value):
+    """Epoch day of a date, datetime or Timestamp"""
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+
+def rolling_mean(values, window):
+    """rolling(window).mean(): NaN until ``window`` non-NaN values are in the window"""
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    sums = np.cumsum(np.where(present, values, 0.0))
+    counts = np.cumsum(present)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts >= window, sums / window, np.nan)
@@ -0,0 +1,112 @@
+from app.utils.lazy_import import lazy_import
+import os
+import logging
+
+yf = lazy_import("yfinance")
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_PRICE_STORE_DIR = os.path.join(BACKEND_DIR, "data", "prices")
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def normalize_symbol(symbol):
+    """Store files by bare NSE symbol (TCS.NS and TCS.BO both map to TCS)"""
+    return symbol.replace('.NS', '').replace('.BO', '').upper()
+
+
+class LocalPriceStore:
+    """
+    Daily OHLCV bars kept on disk as one CSV per symbol
+    (Date,Open,High,Low,Close,Volume), so backtests and benchmarks can run
+    without network access. Fixture directories use the same layout.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv("PRICE_STORE_DIR") or DEFAULT_PRICE_STORE_DIR
+
+    def path(self, symbol):
+        return os.path.join(self.root, f"{normalize_symbol(symbol)}.csv")
+
+    def symbols(self):
+        """Every symbol with a file in the store"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[:-4] for name in os.listdir(self.root) if name.endswith(".csv"))
+
+    def load(self, symbol, start=None, end=None):
+        """Bars for a symbol indexed by (naive) date, oldest first; None if not stored"""
+        path = self.path(symbol)
+        if not os.path.exists(path):
+            return None
+        df = pd.read_csv(path, index_col=0, parse_dates=True)
+        df = df[[column for column in PRICE_COLUMNS if column in df.columns]]
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index <= pd.Timestamp(end)]
+        return df
+
+    def save(self, symbol, df):
+        os.makedirs(self.root, exist_ok=True)
+        df = df[[column for column in PRICE_COLUMNS if column in df.columns]]
+        df.to_csv(self.path(symbol), index_label="Date")
+
+    def update_from_yahoo(self, symbol, period="5y"):
+        """Download bars from Yahoo Finance and merge them into the stored file"""
+        symbol = normalize_symbol(symbol)
+        for suffix in (".NS", ".BO"):
+            history = yf.Ticker(symbol + suffix).history(period=period)
+            if not history.empty:
+                break
+        else:
+            logger.warning(f"No Yahoo Finance history for {symbol}")
+            return 0
+
+        return self.merge(symbol, history)
+
+    def merge(self, symbol, history):
+        """Merge downloaded bars into the stored file (new bars win); returns the stored bar count"""
+        history = history[[column for column in PRICE_COLUMNS if column in history.columns]].dropna(how="all")
+        if getattr(history.index, "tz", None) is not None:
+            history.index = history.index.tz_localize(None)
+        history.index = history.index.normalize()
+        existing = self.load(symbol)
+        if existing is not None:
+            history = pd.concat([existing, history])
+            history = history[~history.index.duplicated(keep='last')].sort_index()
+        self.save(symbol, history)
+        return len(history)
+
+    def refresh(self, symbols=None, period="1mo", batch_size=100):
+        """
+        Append recent bars to every stored symbol (or ``symbols``) with one
+        Yahoo Finance download per batch. Returns the updated and failed
+        symbols; new symbols need update_from_yahoo() for their history.
+        """
+        symbols = [normalize_symbol(symbol) for symbol in (symbols or self.symbols())]
+        updated, failed = [], []
+        for start in range(0, len(symbols), batch_size):
+            batch = symbols[start:start + batch_size]
+            try:
+                data = yf.download([f"{symbol}.NS" for symbol in batch], period=period, group_by="ticker",
+                                   auto_adjust=True, threads=True, progress=False)
+            except Exception as e:
+                logger.warning(f"Price download failed for {len(batch)} symbols: {str(e)}")
+                failed.extend(batch)
+                continue
+            for symbol in batch:
+                ticker = f"{symbol}.NS"
+                if isinstance(data.columns, pd.MultiIndex):
+                    history = data[ticker] if ticker in data.columns.get_level_values(0) else None
+                else:
+                    history = data if len(batch) == 1 else None
+                if history is None or history.dropna(how="all").empty:
+                    failed.append(symbol)
+                    continue
+                self.merge(symbol, history)
+                updated.append(symbol)
+        return {"updated": updated, "failed": failed}
@@ -0,0 +1,166 @@
+"""
+Process pool for CPU-bound work on price series (detector features, chart
+rendering), which would otherwise hold the GIL on a single core.
+
+Bars are not pickled: run_series() copies a PriceSeries into one
+multiprocessing.shared_memory block (epoch days, then each column) and
+sends only its descriptor. The worker maps the block back into a
+PriceSeries of views, runs the task, and the block is unlinked once the
+result is back. With PROCESS_POOL_WORKERS=0 tasks run inline and the
+returned future is already done, so callers never branch on the mode.
+A worker that dies (OOM, a native crash) breaks the whole executor; the
+pool is then replaced and the task resubmitted once.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from app.config import Config
+from app.utils.lazy_import import lazy_import
+from app.utils.price_series import PriceSeries
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+_exit_hook_registered = False
+
+
+def get_process_pool():
+    """Process-wide pool, or None when PROCESS_POOL_WORKERS is 0"""
+    global _pool, _exit_hook_registered
+    if Config.PROCESS_POOL_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # forkserver/spawn children do not inherit the server's threads, sockets or Mongo client
+                method = Config.PROCESS_POOL_START_METHOD
+                if method not in multiprocessing.get_all_start_methods():
+                    method = "spawn"
+                context = multiprocessing.get_context(method)
+                _pool = ProcessPoolExecutor(max_workers=Config.PROCESS_POOL_WORKERS, mp_context=context)
+                if not _exit_hook_registered:
+                    atexit.register(shutdown_process_pool)
+                    _exit_hook_registered = True
+                logger.info(f"Started process pool with {Config.PROCESS_POOL_WORKERS} workers ({method})")
+    return _pool
+
+
+def shutdown_process_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def replace_broken_pool(broken):
+    """Drop ``broken`` (unless another thread already did) and return a working pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            logger.error("Process pool is broken (a worker died), starting a new one")
+            broken.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+    return get_process_pool()
+
+
+def share_series(series):
+    """Copy ``series`` into a new shared memory block; returns (block, descriptor)"""
+    n = len(series)
+    names = series.columns
+    block = shared_memory.SharedMemory(create=True, size=max(8 * n * (len(names) + 1), 1))
+    days = np.ndarray((n,), dtype=np.int64, buffer=block.buf)
+    days[:] = series.days
+    for position, name in enumerate(names, start=1):
+        column = np.ndarray((n,), dtype=np.float64, buffer=block.buf, offset=8 * n * position)
+        column[:] = series[name]
+    return block, {"name": block.name, "rows": n, "columns": names, "symbol": series.symbol}
+
+
+def attach_series(descriptor):
+    """PriceSeries of views on a shared block; returns (block, series). Close the block when done."""
+    block = shared_memory.SharedMemory(name=descriptor["name"])
+    n = descriptor["rows"]
+    days = np.ndarray((n,), dtype=np.int64, buffer=block.buf)
+    columns = {
+        name: np.ndarray((n,), dtype=np.float64, buffer=block.buf, offset=8 * n * position)
+        for position, name in enumerate(descriptor["columns"], start=1)
+    }
+    return block, PriceSeries(days, columns, descriptor["symbol"])
+
+
+def _run_shared(func, descriptor, args):
+    """Worker side of run_series()"""
+    block, series = attach_series(descriptor)
+    try:
+        return func(series, *args)
+    finally:
+        # Results must not keep views on the block alive past this point
+        del series
+        block.close()
+
+
+def run_series(func, series, *args):
+    """
+    Future for func(series, *args), run in the process pool. ``func`` must
+    be picklable (a module-level function or a method of a picklable object)
+    and must return plain data, not views on ``series``.
+    """
+    pool = get_process_pool()
+    if pool is None:
+        future = Future()
+        try:
+            future.set_result(func(series, *args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    block, descriptor = share_series(series)
+    result = Future()
+    result.set_running_or_notify_cancel()
+
+    def release():
+        block.close()
+        block.unlink()
+
+    def submit(pool, retry):
+        try:
+            task = pool.submit(_run_shared, func, descriptor, args)
+        except BrokenProcessPool:
+            if not retry:
+                raise
+            return submit(replace_broken_pool(pool), False)
+
+        def done(task):
+            if task.cancelled():
+                error = RuntimeError("Process pool shut down before the task ran")
+            else:
+                error = task.exception()
+            if isinstance(error, BrokenProcessPool) and retry:
+                try:
+                    submit(replace_broken_pool(pool), False)
+                    return
+                except Exception as e:
+                    error = e
+            release()
+            if error is not None:
+                result.set_exception(error)
+            else:
+                result.set_result(task.result())
+
+        task.add_done_callback(done)
+
+    try:
+        submit(pool, True)
+    except Exception:
+        release()
+        raise
+    return result
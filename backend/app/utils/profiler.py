@@ -0,0 +1,281 @@
+"""
+Opt-in, in-process sampling profiler.
+
+A daemon thread snapshots every thread's Python stack with
+sys._current_frames() at a fixed interval and counts identical stacks.
+Nothing is traced or hooked per call, so overhead is bounded by the
+sampling rate and stops entirely when the session ends. Sessions always
+end on their own: after ``seconds`` in duration mode, after ``count``
+matching requests in request mode, and never later than max_seconds.
+
+Output is the collapsed-stack format ("outer;inner;leaf 42") read by
+flamegraph.pl, speedscope and inferno.
+"""
+
+import os
+import sys
+import threading
+import time
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DURATION = "duration"
+REQUESTS = "requests"
+
+IDLE = "idle"
+RUNNING = "running"
+FINISHED = "finished"
+
+# Leaf frames in these modules are threads parked on a lock, queue or socket
+_IDLE_MODULES = ("threading.py", "queue.py", "selectors.py", "socketserver.py", "sched.py")
+_TRUNCATED = "[truncated: stack limit reached]"
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        filename = filename.split(marker, 1)[1]
+    elif os.sep + "app" + os.sep in filename:
+        filename = "app" + os.sep + filename.split(os.sep + "app" + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class ProfileSession:
+    """One profiling run: its settings, the stacks collected and why it ended"""
+
+    def __init__(self, mode, seconds=None, route=None, count=None, interval_ms=10,
+                 max_seconds=60, max_stacks=5000, max_depth=96, include_idle=False, started_by=None):
+        self.mode = mode
+        self.seconds = seconds
+        self.route = route
+        self.count = count
+        self.interval = interval_ms / 1000.0
+        self.max_seconds = max_seconds
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self.include_idle = include_idle
+        self.started_by = started_by
+
+        self.stacks = {}
+        self.samples = 0
+        self.idle_samples = 0
+        self.requests_started = 0
+        self.requests_finished = 0
+        self.started_at = None
+        self.finished_at = None
+        self.stop_reason = None
+        self.sampler_seconds = 0.0
+
+    @property
+    def deadline_seconds(self):
+        if self.mode == DURATION:
+            return min(self.seconds, self.max_seconds)
+        return self.max_seconds
+
+    def matches(self, path):
+        return self.mode == REQUESTS and (path == self.route or path.startswith(self.route.rstrip("/") + "/"))
+
+    def collapsed(self):
+        return "\n".join(f"{stack} {count}" for stack, count in
+                         sorted(self.snapshot().items(), key=lambda item: item[1], reverse=True))
+
+    def snapshot(self):
+        # The sampler keeps adding stacks while a session runs; copying a dict is atomic under the GIL
+        return dict(self.stacks)
+
+    def summary(self, top=20):
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0
+        stacks = self.snapshot()
+        leaves = {}
+        for stack, count in stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            leaves[leaf] = leaves.get(leaf, 0) + count
+        return {
+            "mode": self.mode,
+            "seconds": self.seconds,
+            "route": self.route,
+            "count": self.count,
+            "interval_ms": round(self.interval * 1000, 2),
+            "max_seconds": self.max_seconds,
+            "started_by": self.started_by,
+            "started_at": datetime.utcfromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            "finished_at": datetime.utcfromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            "elapsed_seconds": round(elapsed, 2),
+            "stop_reason": self.stop_reason,
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "unique_stacks": len(stacks),
+            "requests_profiled": self.requests_finished,
+            # Share of wall time the sampler thread itself spent collecting
+            "overhead_pct": round(self.sampler_seconds / elapsed * 100, 2) if elapsed else None,
+            "top_frames": [
+                {"frame": frame, "samples": count}
+                for frame, count in sorted(leaves.items(), key=lambda item: item[1], reverse=True)[:top]
+            ]
+        }
+
+
+class SamplingProfiler:
+    """
+    Process-wide profiler with at most one session at a time. The last
+    finished session is kept so its result can be fetched afterwards.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._session = None
+        self._thread = None
+        self._stop = threading.Event()
+        # Threads serving requests while a session runs: {thread id: matches route}
+        self._request_threads = {}
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._session is None:
+                return IDLE
+            return RUNNING if self._session.finished_at is None else FINISHED
+
+    @property
+    def session(self):
+        return self._session
+
+    def start(self, session):
+        """Begin sampling; raises RuntimeError when a session is already running"""
+        with self._lock:
+            if self._session is not None and self._session.finished_at is None:
+                raise RuntimeError("A profiling session is already running")
+            self._session = session
+            self._request_threads = {}
+            self._stop.clear()
+            session.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, args=(session,), name="sampling-profiler", daemon=True)
+            self._thread.start()
+        logger.info(f"Sampling profiler started: {session.mode} (max {session.deadline_seconds}s, by {session.started_by})")
+        return session
+
+    def stop(self, reason="stopped"):
+        """End the running session, if any, and wait for the sampler to exit"""
+        with self._lock:
+            session = self._session
+            if session is None or session.finished_at is not None:
+                return session
+            session.stop_reason = session.stop_reason or reason
+            self._stop.set()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        return session
+
+    # ---- request mode hooks ----
+
+    def request_started(self, path):
+        session = self._session
+        if session is None or session.finished_at is not None:
+            return
+        ident = threading.get_ident()
+        with self._lock:
+            matched = session.matches(path) and session.requests_started < (session.count or 0)
+            if matched:
+                session.requests_started += 1
+            self._request_threads[ident] = matched
+
+    def request_finished(self):
+        session = self._session
+        if session is None:
+            return
+        ident = threading.get_ident()
+        with self._lock:
+            matched = self._request_threads.pop(ident, None)
+            if not matched:
+                return
+            session.requests_finished += 1
+            done = session.requests_finished >= session.count
+        if done:
+            session.stop_reason = "request_count_reached"
+            self._stop.set()
+
+    # ---- sampling ----
+
+    def _should_sample(self, session, ident):
+        if session.mode == DURATION:
+            return True
+        # Matching requests, plus helper threads they start (e.g. Trendlyne scraping);
+        # threads serving unrelated requests are left out
+        with self._lock:
+            in_flight = any(self._request_threads.values())
+            serving = self._request_threads.get(ident)
+        return in_flight and serving is not False
+
+    def _collapse(self, frame, max_depth):
+        labels = []
+        while frame is not None and len(labels) < max_depth:
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return ";".join(labels)
+
+    def _sample(self, session):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own or not self._should_sample(session, ident):
+                continue
+            if not session.include_idle and os.path.basename(frame.f_code.co_filename) in _IDLE_MODULES:
+                session.idle_samples += 1
+                continue
+            stack = f"{names.get(ident, ident)};{self._collapse(frame, session.max_depth)}"
+            if stack not in session.stacks and len(session.stacks) >= session.max_stacks:
+                stack = _TRUNCATED
+            session.stacks[stack] = session.stacks.get(stack, 0) + 1
+            session.samples += 1
+
+    def _run(self, session):
+        deadline = session.started_at + session.deadline_seconds
+        try:
+            while not self._stop.is_set():
+                if time.time() >= deadline:
+                    session.stop_reason = session.stop_reason or (
+                        "duration_elapsed" if session.mode == DURATION else "max_seconds_reached")
+                    break
+                started = time.perf_counter()
+                self._sample(session)
+                spent = time.perf_counter() - started
+                session.sampler_seconds += spent
+                # Never sample back to back, however slow a snapshot was
+                self._stop.wait(max(session.interval - spent, session.interval / 2))
+        except Exception as e:
+            session.stop_reason = f"error: {str(e)}"
+            logger.error(f"Sampling profiler failed: {str(e)}")
+        finally:
+            with self._lock:
+                session.finished_at = time.time()
+                self._request_threads = {}
+            logger.info(f"Sampling profiler finished ({session.stop_reason}): {session.samples} samples, "
+                        f"{len(session.stacks)} stacks")
+
+
+profiler = SamplingProfiler()
+
+
+def init_profiler(app):
+    """Request hooks for the next-N-requests mode; they return at once when no session runs"""
+    if not app.config.get("PROFILER_ENABLED", True):
+        return
+
+    from flask import request
+
+    @app.before_request
+    def profiler_request_started():
+        if profiler.state == RUNNING:
+            profiler.request_started(request.path)
+
+    @app.teardown_request
+    def profiler_request_finished(exc):
+        if profiler.state == RUNNING:
+            profiler.request_finished()
@@ -1,85 +1,28 @@
 import requests
-from bs4 import BeautifulSoup
 import logging
 from typing import List, Dict
 import os
 import time
 import re
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-import os
-from pymongo import MongoClient
 from dotenv import load_dotenv
+from app.extensions import mongo_manager
+from app.utils.lazy_import import lazy_import
+from app.utils.metrics import span, dependency
 
 logger = logging.getLogger(__name__)
 
+bs4 = lazy_import("bs4")
+
 def scrape_economic_times_news() -> List[Dict]:
     """
     Scrape news headlines and URLs from Economic Times markets page
     Returns list of dictionaries with headline, url, and source
+    (NewsService ingests every configured source, see app.utils.news_sources)
     """
-    url = "https://economictimes.indiatimes.com/markets"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
+    from app.utils.news_sources import build_sources, get_http_session
+
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        news_items = []
-        
-        # Find news elements - targeting the specific structure you mentioned
-        news_elements = soup.find_all('p')
-        
-        for element in news_elements:
-            # Find anchor tags within paragraph elements
-            anchor = element.find('a', class_='font_faus')
-            if anchor and anchor.get('href') and anchor.get('title'):
-                headline = anchor.get_text(strip=True)
-                news_url = anchor.get('href')
-                
-                # Ensure URL is absolute
-                if not news_url.startswith('http'):
-                    news_url = f"https://economictimes.indiatimes.com{news_url}"
-                
-                news_items.append({
-                    'headline': headline,
-                    'url': news_url,
-                    'source': 'Economic Times'
-                })
-                
-                # Limit to 5 news items as requested
-                if len(news_items) >= 5:
-                    break
-        
-        # If the above method doesn't work, try alternative selectors
-        if len(news_items) < 5:
-            alternative_anchors = soup.find_all('a', class_='font_faus')
-            for anchor in alternative_anchors:
-                if anchor.get('href') and anchor.get('title'):
-                    headline = anchor.get_text(strip=True)
-                    news_url = anchor.get('href')
-                    
-                    if not news_url.startswith('http'):
-                        news_url = f"https://economictimes.indiatimes.com{news_url}"
-                    
-                    # Avoid duplicates
-                    if not any(item['url'] == news_url for item in news_items):
-                        news_items.append({
-                            'headline': headline,
-                            'url': news_url,
-                            'source': 'Economic Times'
-                        })
-                    
-                    if len(news_items) >= 5:
-                        break
-        
+        news_items = build_sources(["economic_times"])[0].fetch(get_http_session())['items']
         logger.info(f"Successfully scraped {len(news_items)} news items")
         return news_items
         
@@ -91,17 +34,61 @@ def scrape_economic_times_news() -> List[Dict]:
         raise Exception(f"Scraping error: {str(e)}")
 
 
+# (field, header text) of the Chartink result table columns we read
+CHARTINK_COLUMNS = (
+    ("stock_name", "Stock Name"),
+    ("symbol", "Symbol"),
+    ("percent_change", "% Chg"),
+    ("price", "Price"),
+)
+
+_NON_PERCENT = re.compile(r"[^\d.-]")
+_NON_PRICE = re.compile(r"[^\d.]")
+
+def parse_percent(text):
+    """'+4.25%' -> 4.25; raises ValueError on empty cells"""
+    return float(_NON_PERCENT.sub("", text))
+
+def parse_price(text):
+    """'1,234.50' -> 1234.5; raises ValueError on empty cells"""
+    return float(_NON_PRICE.sub("", text))
+
+# Every tbody row's cell texts in one execute_script call; headers only when asked for
+TABLE_ROWS_SCRIPT = """
+const table = document.querySelector('table#DataTables_Table_0');
+if (!table) { return null; }
+return {
+    headers: arguments[0] ? Array.from(table.querySelectorAll('thead th'), th => th.textContent.trim()) : null,
+    rows: Array.from(table.querySelectorAll('tbody tr'), tr => Array.from(tr.cells, td => td.textContent.trim()))
+};
+"""
+
+# First data row; DataTables shows a single-cell row while loading or when empty
+FIRST_ROW_SCRIPT = """
+const row = document.querySelector('table#DataTables_Table_0 tbody tr');
+const processing = document.querySelector('.dataTables_processing');
+return row ? {
+    text: row.textContent,
+    cells: row.cells.length,
+    // DataTables' single-cell "No data" row once a scan has no results
+    empty: row.cells.length === 1 && row.cells[0].classList.contains('dataTables_empty'),
+    processing: !!processing && processing.offsetParent !== null
+} : null;
+"""
+
 class ChartinkScraper:
     """Scraper for Chartink stock data"""
     
     def __init__(self):
-        load_dotenv()
-        self.mongo_uri = os.getenv("MONGO_URI")
-        if not self.mongo_uri:
-            raise ValueError("MONGO_URI not found in environment variables")
+        # Selenium is only needed by this scraper; keep it off the app import path
+        from selenium import webdriver
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
 
-        self.client = MongoClient(self.mongo_uri)
-        self.db = self.client["stocksensor"]
+        load_dotenv()
+        # Shared client: the scraper borrows it and never closes it
+        self.db = mongo_manager.get_db()
 
         # Setup Chrome options
         chrome_options = Options()
@@ -139,163 +126,152 @@ class ChartinkScraper:
         chromedriver_path = os.getenv("CHROMEDRIVER_PATH")
         self.driver = None
         if not disable_selenium:
-            try:
-                if chromedriver_path and os.path.exists(chromedriver_path):
-                    service = Service(chromedriver_path)
-                    self.driver = webdriver.Chrome(service=service, options=chrome_options)
-                else:
-                    # Fallback: hope chromedriver is on PATH
-                    self.driver = webdriver.Chrome(options=chrome_options)
-            except Exception as e:
-                logger.warning(f"Selenium not available; falling back to requests-based scraping. Reason: {e}")
-                self.driver = None
+            with dependency("chrome", "start") as timer:
+                try:
+                    if chromedriver_path and os.path.exists(chromedriver_path):
+                        service = Service(chromedriver_path)
+                        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+                    else:
+                        # Fallback: hope chromedriver is on PATH
+                        self.driver = webdriver.Chrome(options=chrome_options)
+                except Exception as e:
+                    timer.fail()
+                    logger.warning(f"Selenium not available; falling back to requests-based scraping. Reason: {e}")
+                    self.driver = None
 
         self.wait = WebDriverWait(self.driver, 30) if self.driver is not None else None
 
+    @staticmethod
+    def map_columns(header_texts):
+        """Column index per field from the header texts, or None if a field is missing"""
+        column_indices = {field: -1 for field, _ in CHARTINK_COLUMNS}
+        for idx, header_text in enumerate(header_texts):
+            for field, label in CHARTINK_COLUMNS:
+                if label in header_text:
+                    column_indices[field] = idx
+                    break
+        missing = [field for field, idx in column_indices.items() if idx < 0]
+        if missing:
+            logger.error(f"Chartink table is missing columns: {', '.join(missing)}")
+            return None
+        return column_indices
+
     def get_column_indices(self, soup):
         """Get the correct column indices based on table headers"""
         table = soup.find("table", {"id": "DataTables_Table_0"})
         if not table:
             return None
-
-        headers = table.find("thead").find_all("th")
-        column_indices = {
-            "stock_name": -1,
-            "symbol": -1,
-            "percent_change": -1,
-            "price": -1,
-        }
-
-        for idx, header in enumerate(headers):
-            header_text = header.get_text(strip=True)
-            if "Stock Name" in header_text:
-                column_indices["stock_name"] = idx
-            elif "Symbol" in header_text:
-                column_indices["symbol"] = idx
-            elif "% Chg" in header_text:
-                column_indices["percent_change"] = idx
-            elif "Price" in header_text:
-                column_indices["price"] = idx
-
-        return column_indices
+        return self.map_columns([header.get_text(strip=True) for header in table.find("thead").find_all("th")])
+
+    @staticmethod
+    def rows_to_records(rows, column_indices, source_name):
+        """
+        Records for rows of cell texts, in table order. The table is sorted by
+        % Chg, so the first negative row ends the scrape: returns (records, stop).
+        """
+        records = []
+        width = max(column_indices.values()) + 1
+        scraped_at = time.time()
+        for cells in rows:
+            if len(cells) < width:
+                continue
+            try:
+                percent_change = parse_percent(cells[column_indices["percent_change"]])
+                if percent_change < 0:
+                    return records, True
+                if percent_change > 0:
+                    records.append({
+                        "stock_name": cells[column_indices["stock_name"]],
+                        "symbol": cells[column_indices["symbol"]],
+                        "percent_change": percent_change,
+                        "price": parse_price(cells[column_indices["price"]]),
+                        "scraped_at": scraped_at,
+                        "source": source_name,
+                    })
+            except ValueError as e:
+                logger.warning(f"Error parsing row: {e}")
+        return records, False
+
+    def _wait_for_rows(self, previous_first_row=None):
+        """
+        Wait until the table shows data rows that differ from the previous
+        page's, or its empty-results row once loading has finished
+        """
+        def ready(driver):
+            first_row = driver.execute_script(FIRST_ROW_SCRIPT)
+            if not first_row or first_row.get("processing"):
+                return False
+            if first_row.get("empty"):
+                return first_row
+            if first_row["cells"] < 2 or first_row["text"] == previous_first_row:
+                return False
+            return first_row
+        return self.wait.until(ready)
 
     def scrape_table_data(self, url, source_name):
         """Generic scraper with pagination (up to 8 pages, stop if % Chg < 0)"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+
         logger.info(f"Starting {source_name} data scraping...")
         scraped_data = []
         try:
             if self.driver is None:
                 # Fallback: requests-based fetch of first page only
-                resp = requests.get(url, timeout=20, headers={
-                    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
-                })
-                resp.raise_for_status()
-                soup = BeautifulSoup(resp.text, "html.parser")
+                with dependency("chartink", "page_fetch"):
+                    resp = requests.get(url, timeout=20, headers={
+                        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+                    })
+                    resp.raise_for_status()
+                soup = bs4.BeautifulSoup(resp.text, "html.parser",
+                                         parse_only=bs4.SoupStrainer("table", id="DataTables_Table_0"))
                 column_indices = self.get_column_indices(soup)
                 if not column_indices:
                     logger.error("Could not determine column indices (fallback)")
                     return scraped_data
-                table = soup.find("table", {"id": "DataTables_Table_0"})
-                if not table:
-                    logger.error("Data table not found (fallback)")
-                    return scraped_data
-                rows = table.find("tbody").find_all("tr")
-                for row in rows:
-                    columns = row.find_all("td")
-                    if len(columns) >= max(column_indices.values()) + 1:
-                        try:
-                            stock_name = columns[column_indices["stock_name"]].get_text(strip=True)
-                            symbol = columns[column_indices["symbol"]].get_text(strip=True)
-                            percent_text = columns[column_indices["percent_change"]].get_text(strip=True)
-                            percent_change = float(re.sub(r"[^\d.-]", "", percent_text.replace("%", "")))
-                            price_text = columns[column_indices["price"]].get_text(strip=True)
-                            price = float(re.sub(r"[^\d.]", "", price_text.replace(",", "")))
-                            if percent_change < 0:
-                                break
-                            if percent_change > 0:
-                                data = {
-                                    "stock_name": stock_name,
-                                    "symbol": symbol,
-                                    "percent_change": percent_change,
-                                    "price": price,
-                                    "scraped_at": time.time(),
-                                    "source": source_name,
-                                }
-                                scraped_data.append(data)
-                        except Exception as e:
-                            logger.warning(f"Error parsing row (fallback): {e}")
-                            continue
+                rows = [[cell.get_text(strip=True) for cell in row.find_all("td")]
+                        for row in soup.find("tbody").find_all("tr")]
+                scraped_data, _ = self.rows_to_records(rows, column_indices, source_name)
                 return scraped_data
 
             # Selenium path
-            self.driver.get(url)
-
-            # Wait for and click Run Scan button
-            run_scan_button = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button.run_scan_button"))
-            )
-            run_scan_button.click()
+            with dependency("chartink", "open_screener"):
+                self.driver.get(url)
 
-            # Loop through up to 8 pages
-            for page in range(1, 9):
-                self.wait.until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "table#DataTables_Table_0 tbody tr")
-                    )
+                # Wait for and click Run Scan button
+                run_scan_button = self.wait.until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, "button.run_scan_button"))
                 )
-                time.sleep(3)
+                run_scan_button.click()
 
-                soup = BeautifulSoup(self.driver.page_source, "html.parser")
-                column_indices = self.get_column_indices(soup)
-                if not column_indices:
-                    logger.error("Could not determine column indices")
+            # Loop through up to 8 pages; the column mapping is read once per screener
+            column_indices = None
+            first_row = None
+            for page in range(1, 9):
+                with dependency("chartink", "page_load"):
+                    first_row = self._wait_for_rows(first_row["text"] if first_row else None)
+                if first_row.get("empty"):
+                    logger.info(f"No {source_name} results on page {page}")
                     break
+                    # Cell texts of every tbody row in one round trip (headers on the first page only)
+                    table = self.driver.execute_script(TABLE_ROWS_SCRIPT, column_indices is None)
 
-                table = soup.find("table", {"id": "DataTables_Table_0"})
-                rows = table.find("tbody").find_all("tr")
-
-                stop_scraping = False
-
-                for row in rows:
-                    columns = row.find_all("td")
-                    if len(columns) >= max(column_indices.values()) + 1:
-                        try:
-                            stock_name = columns[column_indices["stock_name"]].get_text(strip=True)
-                            symbol = columns[column_indices["symbol"]].get_text(strip=True)
-
-                            # % change
-                            percent_text = columns[column_indices["percent_change"]].get_text(strip=True)
-                            percent_change = float(re.sub(r"[^\d.-]", "", percent_text.replace("%", "")))
-
-                            # Price
-                            price_text = columns[column_indices["price"]].get_text(strip=True)
-                            price = float(re.sub(r"[^\d.]", "", price_text.replace(",", "")))
-
-                            # Stop scraping if %Chg < 0
-                            if percent_change < 0:
-                                logger.info("Found % Chg < 0. Stopping further scraping.")
-                                stop_scraping = True
-                                break
-
-                            # Save only positive % Chg
-                            if percent_change > 0:
-                                data = {
-                                    "stock_name": stock_name,
-                                    "symbol": symbol,
-                                    "percent_change": percent_change,
-                                    "price": price,
-                                    "scraped_at": time.time(),
-                                    "source": source_name,
-                                }
-                                scraped_data.append(data)
-
-                        except Exception as e:
-                            logger.warning(f"Error parsing row: {e}")
-                            continue
+                with span("chartink", "parse_page"):
+                    if not table:
+                        logger.error("Data table not found")
+                        break
+                    if column_indices is None:
+                        column_indices = self.map_columns(table["headers"])
+                        if not column_indices:
+                            logger.error("Could not determine column indices")
+                            break
+                    records, stop_scraping = self.rows_to_records(table["rows"], column_indices, source_name)
+                    scraped_data.extend(records)
 
                 logger.info(f"Page {page}: Scraped {len(scraped_data)} {source_name} records so far")
 
                 if stop_scraping:
+                    logger.info("Found % Chg < 0. Stopping further scraping.")
                     break
 
                 # Try next page
@@ -307,7 +283,6 @@ class ChartinkScraper:
                         logger.info("No more pages available.")
                         break
                     next_button.click()
-                    time.sleep(2)
                 except Exception:
                     logger.info("Next button not clickable or no more pages.")
                     break
@@ -333,11 +308,12 @@ class ChartinkScraper:
         try:
             collection = self.db[collection_name]
 
-            # Clear existing data before inserting new data
-            collection.delete_many({})
+            with dependency("mongodb", f"{collection_name}.replace"):
+                # Clear existing data before inserting new data
+                collection.delete_many({})
 
-            # Insert new data
-            result = collection.insert_many(data)
+                # Insert new data
+                result = collection.insert_many(data)
             logger.info(f"Inserted {len(result.inserted_ids)} records into {collection_name}")
 
         except Exception as e:
@@ -346,10 +322,12 @@ class ChartinkScraper:
     def run_scraping(self):
         """Run both scraping tasks"""
         try:
-            vcp_data = self.scrape_vcp_data()
+            with span("chartink", "scrape_vcp"):
+                vcp_data = self.scrape_vcp_data()
             self.store_data("VCP_sample", vcp_data)
 
-            ipo_data = self.scrape_ipo_base_data()
+            with span("chartink", "scrape_ipo_base"):
+                ipo_data = self.scrape_ipo_base_data()
             self.store_data("IPO_Base_sample", ipo_data)
 
         finally:
@@ -360,6 +338,5 @@ class ChartinkScraper:
         try:
             if self.driver is not None:
                 self.driver.quit()
-            self.client.close()
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+Self-contained finance headline scorer.
+
+Headlines are cleaned by sentiment_utils.clean_text (lowercase letters and
+single spaces), split into tokens and matched against a market-news lexicon
+with plain dict lookups: two-word phrases first, then single words. A
+negator up to NEGATION_WINDOW tokens before a match flips and damps it,
+and intensifiers scale it. The summed score is squashed into [-1, 1] so the
+usual polarity thresholds apply. No third-party imports, so it is cheap to
+load and scores thousands of headlines in a few milliseconds.
+"""
+
+import math
+
+# Bump when the lexicon or the scoring changes; it is part of the cache key
+LEXICON_VERSION = 2
+
+# Word scores in [-1, 1]
+FINANCE_LEXICON = {
+    # Price action / market direction
+    "rally": 0.7, "rallies": 0.7, "rallied": 0.7, "surge": 0.8, "surges": 0.8, "surged": 0.8,
+    "soar": 0.8, "soars": 0.8, "soared": 0.8, "jump": 0.6, "jumps": 0.6, "jumped": 0.6,
+    "gain": 0.5, "gains": 0.5, "gained": 0.5, "rise": 0.4, "rises": 0.4, "rose": 0.4, "rising": 0.4,
+    "climb": 0.4, "climbs": 0.4, "climbed": 0.4, "advance": 0.4, "advances": 0.4, "up": 0.2,
+    "higher": 0.3, "high": 0.2, "highs": 0.3, "rebound": 0.5, "rebounds": 0.5, "rebounded": 0.5,
+    "recover": 0.4, "recovers": 0.4, "recovery": 0.4, "bounce": 0.4, "bounces": 0.4,
+    "breakout": 0.6, "bullish": 0.7, "bull": 0.5, "bulls": 0.5, "outperform": 0.6,
+    "outperforms": 0.6, "zoom": 0.6, "zooms": 0.6, "skyrocket": 0.9, "skyrockets": 0.9,
+    "fall": -0.4, "falls": -0.4, "fell": -0.4, "falling": -0.4, "drop": -0.4, "drops": -0.4,
+    "dropped": -0.4, "decline": -0.4, "declines": -0.4, "declined": -0.4, "slip": -0.3,
+    "slips": -0.3, "slipped": -0.3, "slide": -0.4, "slides": -0.4, "slump": -0.7, "slumps": -0.7,
+    "plunge": -0.8, "plunges": -0.8, "plunged": -0.8, "crash": -0.9, "crashes": -0.9,
+    "crashed": -0.9, "tumble": -0.7, "tumbles": -0.7, "tumbled": -0.7, "sink": -0.6, "sinks": -0.6,
+    "sank": -0.6, "tank": -0.7, "tanks": -0.7, "down": -0.2, "lower": -0.3, "low": -0.2, "lows": -0.3,
+    "bearish": -0.7, "bear": -0.5, "bears": -0.5, "selloff": -0.7, "underperform": -0.6,
+    "underperforms": -0.6, "correction": -0.4, "volatile": -0.3, "volatility": -0.3,
+    "crumble": -0.7, "crumbles": -0.7, "bleed": -0.6, "bleeds": -0.6, "wipe": -0.5, "wiped": -0.5,
+
+    # Results and fundamentals
+    "profit": 0.5, "profits": 0.5, "profitable": 0.6, "beat": 0.5, "beats": 0.5, "record": 0.4,
+    "growth": 0.5, "grow": 0.4, "grows": 0.4, "strong": 0.5, "robust": 0.6, "upgrade": 0.6,
+    "upgrades": 0.6, "upgraded": 0.6, "dividend": 0.3, "bonus": 0.4, "buyback": 0.4,
+    "expansion": 0.4, "expands": 0.4, "win": 0.5, "wins": 0.5, "bags": 0.5, "order": 0.2,
+    "orders": 0.2, "approval": 0.4, "approves": 0.3, "approved": 0.3, "boost": 0.5, "boosts": 0.5,
+    "optimism": 0.6, "optimistic": 0.6, "upbeat": 0.6, "positive": 0.5, "improve": 0.4,
+    "improves": 0.4, "improved": 0.4, "inflows": 0.4, "buy": 0.4, "accumulate": 0.4,
+    "loss": -0.6, "losses": -0.6, "miss": -0.5, "misses": -0.5, "missed": -0.5, "weak": -0.5,
+    "weaker": -0.5, "downgrade": -0.6, "downgrades": -0.6, "downgraded": -0.6, "cut": -0.3,
+    "cuts": -0.3, "default": -0.8, "defaults": -0.8, "debt": -0.2, "fraud": -0.9, "scam": -0.9,
+    "probe": -0.5, "penalty": -0.5, "fine": -0.3, "fined": -0.5, "ban": -0.5, "bans": -0.5,
+    "raid": -0.6, "raids": -0.6, "slowdown": -0.5, "recession": -0.8, "inflation": -0.3,
+    "outflows": -0.4, "sell": -0.4, "exit": -0.2, "resigns": -0.4, "layoffs": -0.6,
+    "pessimism": -0.6, "concern": -0.4, "concerns": -0.4, "worry": -0.5, "worries": -0.5,
+    "fear": -0.5, "fears": -0.5, "risk": -0.3, "risks": -0.3, "warning": -0.5, "warns": -0.5,
+    "pressure": -0.3, "negative": -0.5, "uncertainty": -0.4, "crisis": -0.8, "bankruptcy": -0.9,
+    "insolvency": -0.8, "halt": -0.4, "halts": -0.4, "pledge": -0.3, "tepid": -0.3, "dismal": -0.7,
+}
+
+# Two-word phrases checked before single words; they replace both tokens
+FINANCE_PHRASES = {
+    ("all", "time"): 0.3,
+    ("record", "high"): 0.8,
+    ("fresh", "high"): 0.6,
+    ("upper", "circuit"): 0.8,
+    ("lower", "circuit"): -0.8,
+    ("profit", "booking"): -0.4,
+    ("profit", "warning"): -0.8,
+    ("net", "loss"): -0.6,
+    ("short", "covering"): 0.3,
+    ("rate", "cut"): 0.4,
+    ("rate", "hike"): -0.4,
+    ("target", "price"): 0.1,
+    ("sell", "off"): -0.7,
+    ("fii", "selling"): -0.5,
+    ("fii", "buying"): 0.5,
+    ("week", "high"): 0.5,
+    ("week", "low"): -0.5,
+    ("margin", "expansion"): 0.6,
+    ("margin", "pressure"): -0.5,
+}
+
+NEGATIONS = frozenset({
+    "not", "no", "never", "without", "nor", "cannot", "cant", "wont", "dont", "doesnt", "didnt",
+    "isnt", "arent", "wasnt", "fails", "failed", "unable", "hardly", "barely",
+})
+NEGATION_WINDOW = 3
+# A negated word counts this much, with the opposite sign
+NEGATION_SCALE = 0.75
+
+INTENSIFIERS = {
+    "sharply": 1.4, "sharp": 1.4, "massive": 1.5, "huge": 1.4, "big": 1.2, "steep": 1.4,
+    "strongly": 1.3, "significantly": 1.3, "biggest": 1.5, "very": 1.2,
+    "marginally": 0.6, "slightly": 0.6, "mildly": 0.7, "flat": 0.3, "modest": 0.7, "modestly": 0.7,
+}
+
+# Larger values squash less: a lone 0.5 word stays 0.45 with 1.0
+NORMALIZATION_ALPHA = 1.0
+
+
+class LexiconScorer:
+    """Scores cleaned headlines (see sentiment_utils.clean_text) against the finance lexicon"""
+
+    name = f"lexicon-v{LEXICON_VERSION}"
+
+    def __init__(self, lexicon=None, phrases=None, negations=NEGATIONS, intensifiers=None):
+        self.lexicon = FINANCE_LEXICON if lexicon is None else lexicon
+        self.phrases = FINANCE_PHRASES if phrases is None else phrases
+        self.negations = negations
+        self.intensifiers = INTENSIFIERS if intensifiers is None else intensifiers
+        # Only tokens that can start a phrase need the two-token lookup
+        self._phrase_starts = frozenset(first for first, _ in self.phrases)
+
+    def score(self, cleaned):
+        """Polarity of one cleaned headline, in [-1, 1]"""
+        tokens = cleaned.split()
+        total = 0.0
+        last_negation = -NEGATION_WINDOW - 1
+        multiplier = 1.0
+        i = 0
+        n = len(tokens)
+        while i < n:
+            token = tokens[i]
+            value = None
+            width = 1
+            if token in self._phrase_starts and i + 1 < n:
+                value = self.phrases.get((token, tokens[i + 1]))
+                if value is not None:
+                    width = 2
+            if value is None:
+                value = self.lexicon.get(token)
+
+            if value is not None:
+                value *= multiplier
+                if i - last_negation <= NEGATION_WINDOW:
+                    # A negator flips only the first match after it
+                    value *= -NEGATION_SCALE
+                    last_negation = -NEGATION_WINDOW - 1
+                total += value
+                multiplier = 1.0
+            elif token in self.negations:
+                last_negation = i
+            elif token in self.intensifiers:
+                multiplier = self.intensifiers[token]
+            i += width
+
+        if total == 0.0:
+            return 0.0
+        return max(-1.0, min(1.0, total / math.sqrt(total * total + NORMALIZATION_ALPHA)))
+
+    def polarities(self, cleaned_texts):
+        score = self.score
+        return [score(text) for text in cleaned_texts]
@@ -1,45 +1,214 @@
-try:
-    from textblob import TextBlob
-    TEXTBLOB_AVAILABLE = True
-except ImportError:
-    TEXTBLOB_AVAILABLE = False
-    print("Warning: TextBlob not available. Sentiment analysis will be disabled.")
 import re
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from app.config import Config
+from app.extensions import mongo_manager
+from app.utils.lazy_import import lazy_import, module_available
+from app.utils.sentiment_lexicon import LexiconScorer
+
+logger = logging.getLogger(__name__)
+
+TEXTBLOB_AVAILABLE = module_available("textblob")
+if TEXTBLOB_AVAILABLE:
+    textblob_sentiments = lazy_import("textblob.sentiments")
+
+# Polarity above / below these is positive / negative, neutral in between
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+# Scored headlines, keyed by backend + normalized text; evicted by a TTL index on last_used_at
+SENTIMENT_CACHE = "sentiment_cache"
+# Hits refresh last_used_at at most this often, so re-scrapes stay read-only
+CACHE_TOUCH_INTERVAL = timedelta(days=1)
+
+_NON_ALPHA = re.compile(r'[^a-zA-Z\s]')
+_WHITESPACE = re.compile(r'\s+')
 
 def clean_text(text):
     """Clean and preprocess text for sentiment analysis"""
     # Remove special characters and digits
-    text = re.sub(r'[^a-zA-Z\s]', '', text)
+    text = _NON_ALPHA.sub('', text)
     # Convert to lowercase
     text = text.lower()
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WHITESPACE.sub(' ', text).strip()
     return text
 
+def classify(polarity):
+    """Map a polarity score in [-1, 1] to 'positive', 'negative' or 'neutral'"""
+    if polarity > POSITIVE_THRESHOLD:
+        return 'positive'
+    elif polarity < NEGATIVE_THRESHOLD:
+        return 'negative'
+    return 'neutral'
+
+
+class TextBlobScorer:
+    """TextBlob's pattern lexicon; the analyzer (and its lexicon) is built once"""
+
+    name = "textblob"
+
+    def __init__(self):
+        self._analyzer = None
+
+    def polarities(self, cleaned_texts):
+        if self._analyzer is None:
+            # PatternAnalyzer is what TextBlob(text).sentiment uses; sharing one
+            # instance avoids building a blob per headline
+            self._analyzer = textblob_sentiments.PatternAnalyzer()
+        scores = []
+        for text in cleaned_texts:
+            try:
+                scores.append(self._analyzer.analyze(text).polarity)
+            except Exception:
+                scores.append(0.0)
+        return scores
+
+
+SENTIMENT_BACKENDS = {
+    "textblob": TextBlobScorer,
+    "lexicon": LexiconScorer,
+}
+
+def create_scorer(backend=None):
+    """
+    Scorer for SENTIMENT_BACKEND ('textblob' or 'lexicon'). When TextBlob is
+    requested but not installed the finance lexicon is used instead of
+    scoring everything neutral.
+    """
+    backend = (backend or Config.SENTIMENT_BACKEND).lower()
+    if backend not in SENTIMENT_BACKENDS:
+        logger.warning(f"Unknown sentiment backend '{backend}', using lexicon")
+        backend = "lexicon"
+    if backend == "textblob" and not TEXTBLOB_AVAILABLE:
+        logger.warning("TextBlob not available; using the finance lexicon for sentiment")
+        backend = "lexicon"
+    return SENTIMENT_BACKENDS[backend]()
+
+
+class SentimentEngine:
+    """
+    Scores batches of headlines with a scorer (see create_scorer). Results
+    are memoized per scorer and normalized text, first in a bounded
+    in-process LRU and then in the SENTIMENT_CACHE collection, so headlines
+    seen on an earlier scrape cost no NLP work.
+    """
+
+    def __init__(self, scorer=None, memory_size=5000, persist=True):
+        self.scorer = scorer or create_scorer()
+        self.memory_size = memory_size
+        self.persist = persist
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return self.scorer.name
+
+    def cache_key(self, cleaned):
+        return hashlib.sha1(f"{self.backend}:{cleaned}".encode("utf-8")).hexdigest()
+
+    def polarities(self, cleaned_texts):
+        """Polarity per cleaned text; only called for texts not in the cache"""
+        return self.scorer.polarities(cleaned_texts)
+
+    def _remember(self, key, sentiment):
+        with self._lock:
+            self._memory[key] = sentiment
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _load_persisted(self, keys):
+        collection = mongo_manager.get_collection(SENTIMENT_CACHE)
+        found = {doc["_id"]: doc["sentiment"]
+                 for doc in collection.find({"_id": {"$in": keys}}, {"sentiment": 1})}
+        if found:
+            now = datetime.utcnow()
+            collection.update_many(
+                {"_id": {"$in": list(found)}, "last_used_at": {"$lt": now - CACHE_TOUCH_INTERVAL}},
+                {"$set": {"last_used_at": now}}
+            )
+        return found
+
+    def _persist(self, scored):
+        now = datetime.utcnow()
+        mongo_manager.get_collection(SENTIMENT_CACHE).bulk_write([
+            UpdateOne(
+                {"_id": key},
+                {"$set": {"sentiment": sentiment, "polarity": polarity, "last_used_at": now},
+                 "$setOnInsert": {"backend": self.backend, "created_at": now}},
+                upsert=True
+            )
+            for key, (sentiment, polarity) in scored.items()
+        ], ordered=False)
+
+    def analyze_batch(self, texts):
+        """'positive' / 'negative' / 'neutral' for each text, in order"""
+        cleaned_texts = [clean_text(text or '') for text in texts]
+        keys = [self.cache_key(cleaned) for cleaned in cleaned_texts]
+        cleaned = dict(zip(keys, cleaned_texts))
+        results = {}
+
+        with self._lock:
+            for key in cleaned:
+                if key in self._memory:
+                    results[key] = self._memory[key]
+                    self._memory.move_to_end(key)
+
+        missing = [key for key in cleaned if key not in results]
+        if missing and self.persist:
+            try:
+                for key, sentiment in self._load_persisted(missing).items():
+                    results[key] = sentiment
+                    self._remember(key, sentiment)
+            except Exception as e:
+                logger.warning(f"Sentiment cache unavailable, scoring without it: {str(e)}")
+            missing = [key for key in missing if key not in results]
+
+        if missing:
+            scored = {}
+            for key, polarity in zip(missing, self.polarities([cleaned[key] for key in missing])):
+                sentiment = classify(polarity)
+                scored[key] = (sentiment, polarity)
+                results[key] = sentiment
+                self._remember(key, sentiment)
+            if self.persist:
+                try:
+                    self._persist(scored)
+                except Exception as e:
+                    logger.warning(f"Could not store {len(scored)} sentiment scores: {str(e)}")
+            logger.info(f"Scored {len(missing)} new headlines, {len(cleaned) - len(missing)} from cache")
+
+        return [results[key] for key in keys]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_sentiment_engine():
+    """Process-wide engine (shared memo cache and analyzer)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SentimentEngine()
+    return _engine
+
+def analyze_sentiment_batch(texts):
+    """Sentiment for many headlines in one call; see SentimentEngine"""
+    return get_sentiment_engine().analyze_batch(list(texts))
+
 def analyze_sentiment(text):
     """
     Analyze sentiment of text and return 'positive', 'negative', or 'neutral'
     """
     try:
-        if not TEXTBLOB_AVAILABLE:
-            # Fallback to neutral if TextBlob is not available
-            return 'neutral'
-            
-        # Clean the text
-        cleaned_text = clean_text(text)
-        
-        # Analyze sentiment using TextBlob
-        analysis = TextBlob(cleaned_text)
-        polarity = analysis.sentiment.polarity
-        
-        # Classify sentiment based on polarity score
-        if polarity > 0.1:
-            return 'positive'
-        elif polarity < -0.1:
-            return 'negative'
-        else:
-            return 'neutral'
-            
+        return analyze_sentiment_batch([text])[0]
     except Exception:
         # Fallback to neutral if analysis fails
-        return 'neutral'
\ No newline at end of file
+        return 'neutral'
@@ -1,6 +1,8 @@
 import re
 from typing import Dict, Any, Optional
-import yfinance as yf
+from app.utils.lazy_import import lazy_import
+
+yf = lazy_import("yfinance")
 
 def validate_stock_symbol(symbol: str) -> bool:
     """Validate if the stock symbol is valid"""
@@ -0,0 +1 @@
+"""Offline benchmarks for the analysis and pattern detection hot paths (see run_benchmarks.py)"""
@@ -0,0 +1,101 @@
+"""The functions benchmarked by run_benchmarks.py and how their inputs are built"""
+
+from app.services.predict_service import PredictService, VCPDetector, IPOPatternDetector
+from app.services.stock_analysis_service import StockAnalysisService
+from benchmarks.synthetic import synthetic_pattern_results
+
+
+class BenchmarkCase:
+    """
+    ``prepare(universe)`` turns {symbol: bars} into a list of argument tuples;
+    ``func`` is timed once per tuple. ``max_calls`` caps slow cases (charts)
+    so large universes stay practical.
+    """
+
+    def __init__(self, name, func, prepare, max_calls=None, description=""):
+        self.name = name
+        self.func = func
+        self.prepare = prepare
+        self.max_calls = max_calls
+        self.description = description
+
+    def build_calls(self, universe):
+        calls = self.prepare(universe)
+        return calls[:self.max_calls] if self.max_calls else calls
+
+
+def _predicted_stocks_service(size):
+    """PredictService whose result readers return ``size`` synthetic rows instead of querying MongoDB"""
+    service = PredictService()
+    vcp_rows = synthetic_pattern_results(size, seed=1)
+    ipo_rows = synthetic_pattern_results(max(1, size // 4), seed=2)
+    service.get_vcp_results = lambda: {"success": True, "data": vcp_rows}
+    service.get_ipo_results = lambda: {"success": True, "data": ipo_rows}
+    return service
+
+
+def build_cases():
+    vcp = VCPDetector()
+    # Synthetic symbols "list" on their first bar; prepare() registers them
+    ipo = IPOPatternDetector(listing_dates={})
+
+    def ipo_listed(universe):
+        ipo.listing_dates.update({symbol: bars.index[0] for symbol, bars in universe.items()})
+        return universe
+
+    def vcp_frames(universe):
+        return [(vcp.add_indicators(bars.copy()),) for bars in universe.values()]
+
+    return [
+        BenchmarkCase(
+            "find_swing_highs_lows", vcp.find_swing_highs_lows,
+            lambda universe: [(bars.tail(90),) for bars in universe.values()],
+            description="VCPDetector swing scan over the 90-bar detection window"
+        ),
+        BenchmarkCase(
+            "detect_vcp_pattern", vcp.detect_vcp_pattern, vcp_frames,
+            description="VCPDetector features + default thresholds for one symbol"
+        ),
+        BenchmarkCase(
+            "vcp_feature_series", vcp.compute_feature_series, vcp_frames,
+            description="Vectorized VCP features for every date of one symbol (backtests)"
+        ),
+        BenchmarkCase(
+            "calculate_technical_indicators", ipo.calculate_technical_indicators,
+            lambda universe: [(bars,) for bars in universe.values()],
+            description="IPOPatternDetector indicator columns for one symbol"
+        ),
+        BenchmarkCase(
+            "detect_ipo_base_pattern", ipo.detect_ipo_base_pattern,
+            lambda universe: [(bars, symbol) for symbol, bars in ipo_listed(universe).items()],
+            description="IPOPatternDetector NumPy features + default thresholds for one symbol"
+        ),
+        BenchmarkCase(
+            "ipo_features_batch",
+            lambda frames: ipo.evaluate_arrays(ipo.compute_features_batch(frames)[1]),
+            lambda universe: [(ipo_listed(universe),)],
+            description="IPO Base features and thresholds for the whole universe in one call"
+        ),
+        BenchmarkCase(
+            "calculate_rsi", StockAnalysisService.calculate_rsi,
+            lambda universe: [(bars,) for bars in universe.values()],
+            description="Report RSI(14)"
+        ),
+        BenchmarkCase(
+            "calculate_macd", StockAnalysisService.calculate_macd,
+            lambda universe: [(bars,) for bars in universe.values()],
+            description="Report MACD(12, 26, 9)"
+        ),
+        BenchmarkCase(
+            "generate_chart_base64", StockAnalysisService.generate_chart_base64,
+            lambda universe: [(bars, symbol, f"{symbol} Ltd") for symbol, bars in universe.items()],
+            max_calls=5,
+            description="30-day candlestick + volume PNG, base64 encoded"
+        ),
+        BenchmarkCase(
+            "get_predicted_stocks_transform",
+            lambda service: service.build_predicted_stocks(),
+            lambda universe: [(_predicted_stocks_service(len(universe)),)],
+            description="Combine, shape and sort VCP + IPO Base results (one call per universe)"
+        ),
+    ]
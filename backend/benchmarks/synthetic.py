@@ -0,0 +1,51 @@
+"""Deterministic OHLCV generators so benchmark inputs never depend on the network"""
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_ohlcv(n_bars=250, seed=0, start="2023-01-02", base_price=None):
+    """
+    Daily bars from a geometric random walk with slowly cycling volatility
+    and volume, so swing points, contractions and breakouts all occur.
+    The same seed always produces the same frame.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(start, periods=n_bars)
+    days = np.arange(n_bars)
+
+    volatility = 0.012 + 0.008 * (1 + np.sin(days / rng.uniform(15, 35)))
+    close = (base_price or rng.uniform(50, 3000)) * np.exp(np.cumsum(rng.normal(0.0004, volatility)))
+    open_ = close * (1 + rng.normal(0, volatility / 3))
+    spread = close * volatility * rng.uniform(0.5, 1.5, n_bars)
+    high = np.maximum(open_, close) + spread * rng.random(n_bars)
+    low = np.minimum(open_, close) - spread * rng.random(n_bars)
+    volume = rng.uniform(0.3, 1.0, n_bars) * 1e6 * (1.5 + np.sin(days / rng.uniform(10, 25)))
+
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume.round()},
+        index=index
+    )
+
+
+def synthetic_universe(size, n_bars=250, seed=0):
+    """{symbol: bars} for ``size`` synthetic symbols"""
+    return {f"SYN{i:04d}": synthetic_ohlcv(n_bars, seed=seed * 100003 + i) for i in range(size)}
+
+
+def synthetic_pattern_results(size, seed=0):
+    """Documents shaped like VCP_results / IPO_Base_results rows"""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "_id": f"{i:024x}",
+            "symbol": f"SYN{i:04d}",
+            "stock_name": f"Synthetic {i} Ltd",
+            "sector": ["Technology", "Financial Services", "Healthcare", "Energy"][i % 4],
+            "confidence": f"{int(rng.integers(40, 100))}%",
+            "current_price": round(float(rng.uniform(50, 3000)), 2),
+            "is_detected": "Yes",
+            "timestamp": pd.Timestamp("2024-01-01") + pd.Timedelta(minutes=int(i))
+        }
+        for i in range(size)
+    ]
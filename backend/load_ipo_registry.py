@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Script to bulk load IPO listing dates into the ipo_registry collection
+Accepts our CSV (symbol,listing_date[,name,issue_price]) or NSE's EQUITY_L.csv
+
+  python load_ipo_registry.py data/ipo_listings.csv
+  python load_ipo_registry.py EQUITY_L.csv --since=2024-01-01   # only recent listings
+"""
+
+import sys
+import os
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.models.ipo_registry_model import IPORegistryModel, read_listing_csv, parse_listing_date
+
+def load_ipo_registry(path, since=None):
+    """Upsert every listing in ``path`` (listed on or after ``since``) into the registry"""
+
+    records = read_listing_csv(path)
+    if since:
+        since = parse_listing_date(since)
+        records = [record for record in records if record["listing_date"] >= since]
+
+    # Create Flask app context
+    app = create_app()
+
+    with app.app_context():
+        print("🔧 Loading IPO Registry")
+        print("=" * 60)
+        print(f"\n📄 {len(records)} listings in {path}")
+        result = IPORegistryModel.bulk_load(records, source=os.path.basename(path))
+        print(f"   ✅ {result['upserted']} added, {result['modified']} updated")
+        print("\n" + "=" * 60)
+        return result
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    since = next((arg.split("=", 1)[1] for arg in sys.argv[1:] if arg.startswith("--since=")), None)
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    try:
+        load_ipo_registry(args[0], since)
+    except Exception as e:
+        print(f"❌ Error loading IPO registry: {str(e)}")
+        print("Make sure MongoDB is running and the backend is properly configured")
+        sys.exit(1)
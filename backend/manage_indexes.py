@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Script to apply the MongoDB index registry and verify hot query plans
+Run with --check to report queries that still use a collection scan
+"""
+
+import sys
+import os
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.extensions import mongo
+from app.models.indexes import build_index_registry, ensure_indexes, check_query_plans
+
+def manage_indexes(check_only=False):
+    """Apply registered indexes and/or report collection scans from explain()"""
+
+    # Create Flask app context
+    app = create_app()
+
+    with app.app_context():
+        db = mongo.db
+
+        print("🔧 MongoDB Index Management")
+        print("=" * 60)
+
+        if not check_only:
+            print("\n📊 Applying index registry...")
+            summary = ensure_indexes(db, build_index_registry(app.config))
+            for name in summary["created"]:
+                print(f"   ✅ {name}")
+            for name in summary["failed"]:
+                print(f"   ❌ {name}")
+
+        print("\n🔍 Checking query plans...")
+        report = check_query_plans(db)
+        collscans = 0
+        for entry in report:
+            if entry.get("error"):
+                print(f"   ❌ {entry['collection']} ({entry['query']}): {entry['error']}")
+            elif entry["collscan"]:
+                collscans += 1
+                print(f"   ⚠️  {entry['collection']} ({entry['query']}): COLLSCAN")
+            else:
+                print(f"   ✅ {entry['collection']} ({entry['query']}): {' <- '.join(entry['stages'])}")
+
+        print("\n" + "=" * 60)
+        if collscans:
+            print(f"🎯 {collscans} hot queries still scan their collection")
+        else:
+            print("🎯 All hot queries are served by an index")
+
+        return collscans
+
+if __name__ == "__main__":
+    try:
+        collscans = manage_indexes(check_only="--check" in sys.argv)
+        sys.exit(1 if collscans else 0)
+    except Exception as e:
+        print(f"❌ Error managing indexes: {str(e)}")
+        print("Make sure MongoDB is running and the backend is properly configured")
+        sys.exit(1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Script to report where application startup time goes
+Runs `python -X importtime` on create_app() and prints the slowest top-level imports
+Use --compare to measure with LAZY_IMPORTS on and off
+"""
+
+import sys
+import os
+import subprocess
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+STARTUP_SNIPPET = "from app import create_app; create_app()"
+
+
+def run_import_profile(lazy=True):
+    """Run create_app() in a fresh interpreter and parse -X importtime output"""
+    env = dict(os.environ)
+    env["LAZY_IMPORTS"] = "True" if lazy else "False"
+    # Index creation talks to MongoDB; keep it out of the import measurement
+    env["MONGO_AUTO_INDEX"] = "False"
+
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SNIPPET],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            # One separator space, then two spaces per nesting level
+            indent = len(name) - len(name.lstrip()) - 1
+            modules.append({
+                "name": name.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": indent // 2
+            })
+        except ValueError:
+            continue
+
+    return {"wall_ms": wall_ms, "modules": modules, "returncode": proc.returncode}
+
+
+def top_level_report(profile, limit=15):
+    """Top-level packages sorted by cumulative import time"""
+    # A package's own entry already includes the submodules it pulled in
+    totals = {
+        module["name"]: module["cumulative_ms"]
+        for module in profile["modules"]
+        if "." not in module["name"]
+    }
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def print_profile(label, profile, limit):
+    total_import_ms = sum(m["cumulative_ms"] for m in profile["modules"] if m["depth"] == 0)
+    print(f"\n📊 {label}")
+    print(f"   Wall time: {profile['wall_ms']:.0f} ms | Import time: {total_import_ms:.0f} ms | Modules: {len(profile['modules'])}")
+    for package, cumulative_ms in top_level_report(profile, limit):
+        print(f"   {cumulative_ms:9.1f} ms  {package}")
+
+
+if __name__ == "__main__":
+    limit = 15
+    for arg in sys.argv[1:]:
+        if arg.startswith("--top="):
+            limit = int(arg.split("=", 1)[1])
+
+    print("⏱️  Application Import Profile")
+    print("=" * 60)
+
+    lazy_profile = run_import_profile(lazy=True)
+    print_profile("LAZY_IMPORTS=True", lazy_profile, limit)
+
+    if "--compare" in sys.argv:
+        eager_profile = run_import_profile(lazy=False)
+        print_profile("LAZY_IMPORTS=False", eager_profile, limit)
+        saved = eager_profile["wall_ms"] - lazy_profile["wall_ms"]
+        print(f"\n🎯 Lazy mode saves {saved:.0f} ms of startup wall time")
+
+    if lazy_profile["returncode"] != 0:
+        print("\n❌ create_app() exited with an error; run it directly to see the traceback")
+        sys.exit(1)
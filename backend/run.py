@@ -22,6 +22,13 @@ except ImportError as e:
 except Exception as e:
     logger.error(f"Error initializing scheduler: {str(e)}. Running without scheduled tasks.")
 
+# Warm-up tasks run on a background thread; serving starts immediately
+try:
+    from app.tasks.startup import init_startup_tasks
+    init_startup_tasks(app)
+except Exception as e:
+    logger.error(f"Error starting warm-up tasks: {str(e)}")
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     logger.info(f"Starting Stock Sensor Backend on port {port}...")
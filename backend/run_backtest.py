@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Script to backtest the VCP and IPO Base detectors against locally stored prices
+Runs offline: bars come from PRICE_STORE_DIR (one CSV per symbol) or --store=DIR
+
+  python run_backtest.py --download --symbols=TCS,INFY      # fill the store from Yahoo once
+  python run_backtest.py --start=2023-01-01 --horizons=5,10,20
+  python run_backtest.py --config-file=configs.json          # extra threshold sets side by side
+  python run_backtest.py --configs-from-db                   # active detector_configs from MongoDB
+"""
+
+import sys
+import os
+import json
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.detector_config_model import DetectorConfig
+from app.services.backtest_service import BacktestService, DEFAULT_HORIZONS, PATTERNS
+from app.utils.price_store import LocalPriceStore
+
+
+def parse_args(argv):
+    options = {}
+    for arg in argv:
+        if arg.startswith("--"):
+            key, _, value = arg[2:].partition("=")
+            options[key] = value if value else True
+    return options
+
+
+def load_configs(options):
+    """Built-in thresholds plus any configs from a JSON file or MongoDB"""
+    if options.get("configs-from-db"):
+        from app import create_app
+        from app.models.detector_config_model import DetectorConfigModel
+        app = create_app()
+        with app.app_context():
+            return {pattern: DetectorConfigModel.get_active(pattern) for pattern in PATTERNS}
+
+    configs = {pattern: [DetectorConfig.builtin(pattern)] for pattern in PATTERNS}
+    if options.get("config-file"):
+        # [{"pattern": "vcp", "name": "aggressive", "params": {"min_contraction_percentage": 10}}]
+        with open(options["config-file"]) as f:
+            for entry in json.load(f):
+                configs[entry["pattern"]].append(
+                    DetectorConfig(entry["pattern"], entry["name"], entry.get("params", {}),
+                                   version=entry.get("version", 0)))
+    return configs
+
+
+def print_report(report):
+    print(f"\n📊 {report['symbols']} symbols | window {report['start'] or 'start'} → {report['end'] or 'end'}"
+          f" | load {report['load_seconds']}s")
+    for pattern, pattern_report in report["patterns"].items():
+        throughput = pattern_report["throughput"]
+        print(f"\n🔍 {pattern}: {throughput['symbol_days']} symbol·days in {throughput['seconds']}s"
+              f" = {throughput['symbol_days_per_sec']} symbol·days/sec")
+        for key, config_report in pattern_report["configs"].items():
+            print(f"   {key}: {config_report['signals']} signals")
+            for horizon, stats in config_report["returns"].items():
+                if not stats["count"]:
+                    continue
+                print(f"      +{horizon:>3}d  mean {stats['mean_pct']:6.2f}%  median {stats['median_pct']:6.2f}%"
+                      f"  hit {stats['hit_rate_pct']:5.1f}%  (baseline {stats['baseline_mean_pct']}%, n={stats['count']})")
+
+
+if __name__ == "__main__":
+    options = parse_args(sys.argv[1:])
+    store = LocalPriceStore(options.get("store") if isinstance(options.get("store"), str) else None)
+    symbols = options["symbols"].split(",") if isinstance(options.get("symbols"), str) else None
+
+    print("📈 Pattern Detector Backtest")
+    print("=" * 60)
+    print(f"Price store: {store.root}")
+
+    if options.get("download"):
+        if not symbols:
+            print("❌ --download needs --symbols=A,B,...")
+            sys.exit(1)
+        for symbol in symbols:
+            print(f"   ⬇️  {symbol}: {store.update_from_yahoo(symbol)} bars stored")
+
+    service = BacktestService(
+        store,
+        horizons=[int(h) for h in options["horizons"].split(",")] if isinstance(options.get("horizons"), str) else DEFAULT_HORIZONS,
+        onset_only=not options.get("all-signals")
+    )
+    patterns = options["patterns"].split(",") if isinstance(options.get("patterns"), str) else PATTERNS
+    report = service.run(
+        symbols=symbols,
+        patterns=patterns,
+        configs=load_configs(options),
+        start=options.get("start") if isinstance(options.get("start"), str) else None,
+        end=options.get("end") if isinstance(options.get("end"), str) else None
+    )
+
+    if not report["symbols"]:
+        print("❌ No stored bars found; run with --download --symbols=... first")
+        sys.exit(1)
+
+    print_report(report)
+    if isinstance(options.get("json"), str):
+        with open(options["json"], "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\n💾 Report written to {options['json']}")
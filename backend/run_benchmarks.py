@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Script to benchmark the analysis and pattern detection hot paths offline
+Inputs are deterministic synthetic universes (plus recorded fixtures, if any);
+results are compared against benchmarks/baseline.json
+
+  python run_benchmarks.py                          # sizes 10,100 vs the stored baseline
+  python run_benchmarks.py --sizes=10,100,500 --only=detect_vcp_pattern
+  python run_benchmarks.py --save-baseline          # re-record the baseline on this machine
+  python run_benchmarks.py --record=TCS,INFY        # capture real bars into benchmarks/fixtures once
+  python run_benchmarks.py --fail-on-regression     # exit 1 if p50 or peak memory regressed
+  Options: --bars=250 --repeat=3 --min-time=0.5 --tolerance=0.25 --json=report.json
+"""
+
+import sys
+import os
+import json
+import time
+import platform
+import gc
+import tracemalloc
+
+# Add the backend directory to Python path
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BACKEND_DIR)
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.cases import build_cases
+from benchmarks.synthetic import synthetic_universe
+from app.utils.price_store import LocalPriceStore
+
+FIXTURES_DIR = os.path.join(BACKEND_DIR, "benchmarks", "fixtures")
+BASELINE_PATH = os.path.join(BACKEND_DIR, "benchmarks", "baseline.json")
+
+
+def parse_args(argv):
+    options = {}
+    for arg in argv:
+        if arg.startswith("--"):
+            key, _, value = arg[2:].partition("=")
+            options[key] = value if value else True
+    return options
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "system": platform.system()
+    }
+
+
+def calibrate(rounds=7):
+    """
+    Best-of-N time (ms) of a fixed numpy + pure-Python workload. Timings are
+    compared relative to it, so a machine that is uniformly slower (shared
+    CI runners, thermal throttling) does not show up as a regression.
+    """
+    values = np.random.default_rng(0).random(200_000)
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        np.sort(values)
+        total = 0
+        for value in range(200_000):
+            total += value
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 3)
+
+
+def build_universes(sizes, n_bars):
+    universes = {f"n={size}": synthetic_universe(size, n_bars=n_bars, seed=size) for size in sizes}
+    store = LocalPriceStore(FIXTURES_DIR)
+    fixtures = {symbol: store.load(symbol) for symbol in store.symbols()}
+    if fixtures:
+        universes["fixtures"] = fixtures
+    return universes
+
+
+def measure(case, universe, repeat, min_time=0.5):
+    """
+    Per-call latencies over at least ``repeat`` passes (more for fast cases,
+    until ``min_time`` seconds were spent), then one traced pass for per-call
+    peak memory. GC is paused while timing, as timeit does.
+    """
+    calls = case.build_calls(universe)
+    if not calls:
+        return None
+
+    # Warm-up pass: lazy imports and first-call caches stay out of the numbers
+    case.func(*calls[0])
+
+    latencies = []
+    passes = 0
+    gc.collect()
+    gc.disable()
+    try:
+        while passes < repeat or sum(latencies) < min_time * 1e9:
+            for args in calls:
+                started = time.perf_counter_ns()
+                case.func(*args)
+                latencies.append(time.perf_counter_ns() - started)
+            passes += 1
+    finally:
+        gc.enable()
+
+    # Peak allocated during a single call, over and above what was live before it
+    peak_bytes = 0
+    tracemalloc.start()
+    for args in calls:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        case.func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_bytes = max(peak_bytes, peak - before)
+    tracemalloc.stop()
+
+    latencies_ms = np.array(latencies) / 1e6
+    return {
+        "calls": len(latencies),
+        "ops_per_sec": round(len(latencies) / (latencies_ms.sum() / 1000), 1),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 4),
+        "peak_kib": round(peak_bytes / 1024, 1)
+    }
+
+
+def compare(results, baseline, tolerance, calibration_ms):
+    """
+    Annotate results with the change vs baseline (timings scaled by the
+    calibration ratio); returns the regressed keys
+    """
+    regressions = []
+    speed_ratio = baseline.get("calibration_ms", calibration_ms) / calibration_ms
+    for key, result in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if not previous:
+            continue
+        result["p50_change_pct"] = round((result["p50_ms"] * speed_ratio / previous["p50_ms"] - 1) * 100, 1) if previous["p50_ms"] else None
+        result["peak_change_pct"] = round((result["peak_kib"] / previous["peak_kib"] - 1) * 100, 1) if previous["peak_kib"] else None
+        if (result["p50_change_pct"] or 0) > tolerance * 100 or (result["peak_change_pct"] or 0) > tolerance * 100:
+            regressions.append(key)
+    return regressions
+
+
+def format_change(value):
+    return "   new" if value is None else f"{value:+6.1f}%"
+
+
+if __name__ == "__main__":
+    options = parse_args(sys.argv[1:])
+    sizes = [int(size) for size in options["sizes"].split(",")] if isinstance(options.get("sizes"), str) else [10, 100]
+    n_bars = int(options.get("bars", 250))
+    repeat = int(options.get("repeat", 3))
+    min_time = float(options.get("min-time", 0.5))
+    tolerance = float(options.get("tolerance", 0.25))
+    only = set(options["only"].split(",")) if isinstance(options.get("only"), str) else None
+
+    print("⏱️  Hot Path Benchmarks")
+    print("=" * 60)
+
+    if isinstance(options.get("record"), str):
+        store = LocalPriceStore(FIXTURES_DIR)
+        for symbol in options["record"].split(","):
+            print(f"   ⬇️  {symbol}: {store.update_from_yahoo(symbol, period='2y')} bars recorded")
+
+    cases = [case for case in build_cases() if only is None or case.name in only]
+    universes = build_universes(sizes, n_bars)
+    print(f"Universes: {', '.join(f'{label} ({len(u)} symbols)' for label, u in universes.items())} | {n_bars} bars | repeat {repeat}")
+
+    calibration_ms = calibrate()
+    print(f"Calibration workload: {calibration_ms} ms")
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != environment():
+            print(f"⚠️  Baseline was recorded on {baseline.get('environment')}; timings may not be comparable")
+
+    results = {}
+    regressions = []
+    for case in cases:
+        print(f"\n📊 {case.name} — {case.description}")
+        print(f"   {'universe':<12}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak KiB':>10}{'Δp50':>9}{'Δpeak':>9}")
+        for label, universe in universes.items():
+            result = measure(case, universe, repeat, min_time)
+            if result is None:
+                continue
+            key = f"{case.name}@{label}"
+            results[key] = result
+            regressed = compare({key: result}, baseline, tolerance, calibration_ms)
+            regressions.extend(regressed)
+            print(f"   {label:<12}{result['ops_per_sec']:>10}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+                  f"{result['peak_kib']:>10}{format_change(result.get('p50_change_pct')):>9}"
+                  f"{format_change(result.get('peak_change_pct')):>9}{'  ❌' if regressed else ''}")
+
+    if options.get("save-baseline"):
+        recorded = {key: {k: v for k, v in result.items() if not k.endswith("_change_pct")}
+                    for key, result in results.items()}
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({"environment": environment(), "calibration_ms": calibration_ms, "n_bars": n_bars, "results": recorded}, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline written to {BASELINE_PATH}")
+
+    if isinstance(options.get("json"), str):
+        with open(options["json"], "w") as f:
+            json.dump({"environment": environment(), "results": results, "regressions": regressions}, f, indent=2)
+
+    print("\n" + "=" * 60)
+    if regressions:
+        print(f"🎯 {len(regressions)} regressions beyond {tolerance:.0%}: {', '.join(regressions)}")
+        if options.get("fail-on-regression"):
+            sys.exit(1)
+    elif baseline:
+        print("🎯 No regressions against the baseline")
+    elif not options.get("save-baseline"):
+        print("🎯 No baseline yet; run with --save-baseline")